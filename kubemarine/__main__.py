@@ -52,6 +52,9 @@ for ir in ruamel.yaml.resolver.implicit_resolvers:
         # Globally change behaviour of yaml.safe_load and yaml.dump
         yaml.Dumper.add_implicit_resolver(*float_patched_resolver)  # type: ignore[no-untyped-call]
         yaml.SafeLoader.add_implicit_resolver(*float_patched_resolver)  # type: ignore[no-untyped-call]
+        # C-accelerated loader used by kubemarine.core.utils.yaml_safe_load
+        if hasattr(yaml, 'CSafeLoader'):
+            yaml.CSafeLoader.add_implicit_resolver(*float_patched_resolver)  # type: ignore[no-untyped-call]
         break
 
 
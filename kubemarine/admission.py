@@ -16,7 +16,6 @@ import io
 import re
 from typing import Dict, List, Optional, Union
 
-import ruamel.yaml
 from jinja2 import Template
 
 from kubemarine.core import utils
@@ -101,7 +100,7 @@ def restart_pods_task(cluster: KubernetesCluster) -> None:
         first_control_plane.sudo("kubectl uncordon %s" % node.get_node_name(), hide=False)
 
     cluster.log.debug("Restarting daemon-sets...")
-    daemon_sets = ruamel.yaml.YAML().load(list(first_control_plane.sudo("kubectl get ds -A -o yaml").values())[0].stdout)
+    daemon_sets = utils.yaml_safe_load(list(first_control_plane.sudo("kubectl get ds -A -o yaml").values())[0].stdout)
     for ds in daemon_sets["items"]:
         first_control_plane.sudo("kubectl rollout restart ds %s -n %s" % (ds["metadata"]["name"], ds["metadata"]["namespace"]))
 
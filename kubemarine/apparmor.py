@@ -19,9 +19,14 @@ from kubemarine.core import log
 from kubemarine.core.group import NodeGroup, RunnersGroupResult
 
 
-def get_status(group: NodeGroup) -> Dict[str, Dict[str, List[str]]]:
+def get_status_cmd() -> str:
+    return "apparmor_status --json"
+
+
+def get_status(group: NodeGroup, result: RunnersGroupResult = None) -> Dict[str, Dict[str, List[str]]]:
     log = group.cluster.log
-    result = group.sudo("apparmor_status --json")
+    if result is None:
+        result = group.sudo(get_status_cmd())
     parsed_result = {}
     for host, node_result in result.items():
         log.verbose('Parsing status for %s...' % host)
@@ -57,12 +62,13 @@ def print_status(logger: log.EnhancedLogger, parsed_result: dict) -> None:
     logger.verbose(res)
 
 
-def is_state_valid(group: NodeGroup, expected_profiles: Dict[str, List[str]]) -> bool:
+def is_state_valid(group: NodeGroup, expected_profiles: Dict[str, List[str]],
+                   result: RunnersGroupResult = None) -> bool:
     log = group.cluster.log
 
     log.verbose('Verifying Apparmor modes...')
 
-    parsed_result = get_status(group)
+    parsed_result = get_status(group, result)
     valid = True
 
     for host, status in parsed_result.items():
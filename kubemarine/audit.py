@@ -120,22 +120,38 @@ def apply_audit_rules(group: NodeGroup) -> RunnersGroupResult:
     return auditctl_results
 
 
-def audit_rules_valid(group: NodeGroup, silent: bool = False) -> Tuple[bool, RunnersGroupResult]:
+def get_audit_rules_cmd(cluster: KubernetesCluster, host: str) -> str:
+    executable = cluster.get_package_association_for_node(host, 'audit', 'executable_name')
+    return f'{executable} -l'
+
+
+def audit_rules_valid(group: NodeGroup, silent: bool = False, result: RunnersGroupResult = None) \
+        -> Tuple[bool, RunnersGroupResult]:
+    """
+    Check that all the configured Audit rules are loaded on the nodes.
+
+    :param group: group of nodes to check
+    :param silent: do not log the missing rules
+    :param result: already fetched result of `get_audit_rules_cmd()`. If not specified, it is fetched.
+    :return: pair of the check result and the result of the command
+    """
     cluster: KubernetesCluster = group.cluster
     logger = cluster.log
 
     rules_content = make_config(cluster)
 
-    collector = CollectorCallback(cluster)
-    with group.new_executor() as exe:
-        for node in exe.group.get_ordered_members_list():
-            executable = cluster.get_package_association_for_node(node.get_host(), 'audit', 'executable_name')
-            node.sudo(f'{executable} -l', callback=collector)
+    if result is None:
+        collector = CollectorCallback(cluster)
+        with group.new_executor() as exe:
+            for node in exe.group.get_ordered_members_list():
+                node.sudo(get_audit_rules_cmd(cluster, node.get_host()), callback=collector)
+
+        result = collector.result
 
-    verify_results = collector.result
+    verify_results = result
     rules_valid = True
-    for host, result in verify_results.items():
-        tokens: List[Set[str]] = [set(shlex.split(line)) for line in result.stdout.rstrip('\n').split('\n')]
+    for host, node_result in verify_results.items():
+        tokens: List[Set[str]] = [set(shlex.split(line)) for line in node_result.stdout.rstrip('\n').split('\n')]
         for rule in rules_content.split('\n'):
             if not any(set(shlex.split(rule)).issubset(token) for token in tokens):
                 if not silent:
@@ -25,7 +25,7 @@ from kubemarine.core import utils, static
 from kubemarine.core.connections import ConnectionPool
 from kubemarine.core.environment import Environment
 from kubemarine.core.errors import KME0006
-from kubemarine.core.group import NodeGroup, NodeConfig
+from kubemarine.core.group import NodeGroup, NodeConfig, RunnersGroupResult
 
 _AnyConnectionTypes = Union[str, NodeGroup]
 
@@ -174,6 +174,8 @@ class KubernetesCluster(Environment):
 
         self._connection_pool: Optional[ConnectionPool] = connection_pool
         self._nodes_context: Optional[Dict[str, Any]] = nodes_context
+        self._installed_packages: Dict[str, Dict[str, List[str]]] = {}
+        self._system_snapshot: Dict[str, RunnersGroupResult] = {}
 
     def enrich(self, stage: EnrichmentStage,
                *,
@@ -412,6 +414,23 @@ class KubernetesCluster(Environment):
 
         return self._nodes_context
 
+    @property
+    def installed_packages(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Packages detected as installed on the nodes during the lifetime of the cluster object.
+        Each host points to the package names with the list of their installed versions.
+        The hosts are invalidated as soon as the packages are installed, removed, or upgraded on them.
+        """
+        return self._installed_packages
+
+    @property
+    def system_snapshot(self) -> Dict[str, RunnersGroupResult]:
+        """
+        Raw system state of the nodes collected during the lifetime of the cluster object.
+        See `kubemarine.procedures.check_paas.get_system_snapshot`.
+        """
+        return self._system_snapshot
+
     @property
     def connection_pool(self) -> ConnectionPool:
         if self._connection_pool is None:
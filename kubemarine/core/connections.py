@@ -22,7 +22,8 @@ import fabric.transfer  # type: ignore[import-untyped]
 import invoke
 import paramiko
 
-from kubemarine.core import static
+from kubemarine.core import static, tracing
+from kubemarine.core.host_statistics import HostStatistics
 
 input_sleep = fabric.Remote.input_sleep
 
@@ -144,13 +145,31 @@ class Connection(fabric.Connection):  # type: ignore[misc]
         super().__init__(host, **kwargs)
         self._sftp: Optional[SFTPClient] = None
         self.KM_interrupt_queue = threading.Semaphore(0)
+        self.KM_connect_time = 0.0
 
     def __setattr__(self, key: str, value: Any) -> None:
         # fabric Connection has special handling of this method. Call default behaviour for custom attributes.
-        if key in ('_sftp', 'KM_interrupt_queue'):
+        if key in ('_sftp', 'KM_interrupt_queue', 'KM_connect_time'):
             return object.__setattr__(self, key, value)
         super().__setattr__(key, value)
 
+    def open(self) -> Any:
+        if self.is_connected:
+            return None
+
+        time_start = time.perf_counter()
+        try:
+            return super().open()
+        finally:
+            self.KM_connect_time += time.perf_counter() - time_start
+
+    def KM_pop_connect_time(self) -> float:
+        """
+        :return: time in seconds spent to open the connection since the previous call of the method
+        """
+        connect_time, self.KM_connect_time = self.KM_connect_time, 0.0
+        return connect_time
+
     @fabric.connection.opens  # type: ignore[misc]
     def sftp(self) -> SFTPClient:
         if self._sftp is None:
@@ -159,11 +178,13 @@ class Connection(fabric.Connection):  # type: ignore[misc]
         return self._sftp
 
     def get(self, *args: Any, **kwargs: Any) -> fabric.transfer.Result:
-        with self.KM_transfer():
+        with tracing.span('sftp get', 'transfer', host=self.host, remote=str(args[0]) if args else ''), \
+                self.KM_transfer():
             return super().get(*args, **kwargs)
 
     def put(self, *args: Any, **kwargs: Any) -> fabric.transfer.Result:
-        with self.KM_transfer():
+        with tracing.span('sftp put', 'transfer', host=self.host, remote=str(args[1]) if len(args) > 1 else ''), \
+                self.KM_transfer():
             return super().put(*args, **kwargs)
 
     @contextmanager
@@ -187,6 +208,7 @@ class ConnectionPool:
         self._nodes = nodes
         self._gateway_nodes = gateway_nodes
         self._connections = {ip: self._create_connection(ip) for ip in hosts}
+        self.statistics = HostStatistics()
 
     def get_node(self, ip: str) -> dict:
         node = self._nodes.get(ip)
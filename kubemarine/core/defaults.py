@@ -438,8 +438,8 @@ def merge_defaults(cluster: KubernetesCluster) -> dict:
 
 
 def _merge_inventory(cluster: KubernetesCluster, base: dict) -> dict:
-    base_inventory = utils.deepcopy_yaml(base)
-    inventory: dict = default_merger.merge(base_inventory, cluster.inventory)
+    # The defaults are not changed, and only their parts that are not overridden by the inventory are copied.
+    inventory: dict = default_merger.merge_copy(base, cluster.inventory)
     return inventory
 
 
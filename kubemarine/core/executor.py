@@ -14,17 +14,17 @@
 import collections
 import concurrent
 import io
+import os
 import random
 import re
 import threading
 import time
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
 from types import TracebackType
 from typing import (
     Tuple, List, Dict, Callable, Any, Optional, Union, OrderedDict, TypeVar, Type, Mapping,
-    Sequence, Generic, Generator
+    Sequence, Generic, Generator, Deque
 )
 
 import fabric  # type: ignore[import-untyped]
@@ -32,7 +32,7 @@ import fabric.transfer  # type: ignore[import-untyped]
 
 import invoke
 
-from kubemarine.core import log, static, errors, connections
+from kubemarine.core import log, static, errors, connections, tracing, retry
 from kubemarine.core.connections import ConnectionPool
 from kubemarine.core.environment import Environment
 
@@ -224,7 +224,8 @@ class Callback(ABC):
     def accept(self, host: str, token: Token, result: RunnersResult) -> None:
         """
         The method is called after the run / sudo command is exited.
-        Calling of the method happens sequentially in one thread after some batch of commands is executed on all nodes.
+        Calling of the method happens sequentially in one thread after some batch of commands is executed on all nodes,
+        or on the particular node if the executor has independent `BatchPolicy`.
 
         For the particular host, the order of results with which the method is called
         corresponds to the order of queued commands, for which the given callback was requested.
@@ -236,6 +237,33 @@ class Callback(ABC):
         pass
 
 
+class BatchPolicy:
+    """
+    Policy of completion of the batches of the queued actions.
+
+    By default, the executor runs the queued actions in lockstep.
+    Each next batch of actions starts only after the previous batch is finished on all nodes.
+
+    If `independent`, each node proceeds to its next actions as soon as its previous actions are finished.
+    This is suitable for the work where the nodes do not depend on each other, and allows the fast nodes
+    not to wait for the slow node. The order of actions on each particular node is preserved.
+
+    If `soft_deadline` is specified for the independent policy, the node whose action does not finish in time
+    is marked as a straggler. Remaining actions of the straggler are deferred to the tail phase
+    that starts after all other nodes finish their actions.
+    """
+
+    def __init__(self, *, independent: bool = False, soft_deadline: float = None):
+        if soft_deadline is not None and not independent:
+            raise ValueError("Soft deadline is supported only for independent policy")
+
+        self.independent = independent
+        self.soft_deadline = soft_deadline
+
+
+LOCKSTEP = BatchPolicy()
+
+
 _RawHostToResult = Dict[str, Union[BaseException, fabric.runners.Result, fabric.transfer.Result]]
 
 _Action = Tuple[str, tuple, dict]
@@ -246,8 +274,23 @@ _T = TypeVar('_T', bound='RawExecutor')
 
 class RawExecutor:
 
-    def __init__(self, cluster: Environment, connection_pool: ConnectionPool = None) -> None:
+    def __init__(self, cluster: Environment, connection_pool: ConnectionPool = None,
+                 policy: BatchPolicy = LOCKSTEP, retry_policy: retry.RetryPolicy = None,
+                 clock: retry.Clock = retry.SYSTEM_CLOCK) -> None:
+        """
+        :param cluster: environment of the executor
+        :param connection_pool: connections to the hosts. By default, connection pool of the `cluster`.
+        :param policy: policy of completion of the batches of the queued actions
+        :param retry_policy: delays between retries of the actions failed with the known temporary errors.
+                             By default, it is configured by the `workaround` section of globals.
+        :param clock: source of the time for the delays between retries
+        """
         self.logger = cluster.log
+        self.policy = policy
+        if retry_policy is None:
+            retry_policy = retry.RetryPolicy.from_config(static.GLOBALS['workaround'])
+        self.retry_policy = retry_policy
+        self.clock = clock
         if connection_pool is not None:
             self.connection_pool = connection_pool
         else:
@@ -259,6 +302,7 @@ class RawExecutor:
         self._supported_args = {'hide', 'warn', 'pty', 'timeout', 'env', 'out_stream', 'err_stream'}
         self._interrupt_queue = threading.Semaphore(0)
         self._closed = False
+        self._stragglers: List[str] = []
 
     def __enter__(self: _T) -> _T:
         self._check_closed()
@@ -489,6 +533,12 @@ class RawExecutor:
     def get_flat_result(self) -> Mapping[str, Sequence[GenericResult]]:
         return get_flat_result(self._last_results)
 
+    def get_stragglers(self) -> List[str]:
+        """
+        :return: hosts that were marked as stragglers during the last flush according to the `BatchPolicy`.
+        """
+        return list(self._stragglers)
+
     def flush(self) -> None:
         """
         Flushes the connections' queue and returns grouped result
@@ -497,36 +547,19 @@ class RawExecutor:
         """
         self._check_closed()
         self._last_results.clear()
+        self._stragglers.clear()
 
         if not self._connections_queue:
             self.logger.verbose('Queue is empty, nothing to perform')
             return
 
-        callable_batches: List[Dict[str, List[_PayloadItem]]] = self._get_callables()
-
         max_workers = len(self._connections_queue)
 
         with ThreadPoolExecutor(max_workers=max_workers) as TPE:
-            for batch in callable_batches:
-                # filter out hosts with failed commands
-                batch = {host: payloads for host, payloads in batch.items()
-                         # failed command is always last if present
-                         if host not in self._last_results
-                         or not isinstance(list(self._last_results[host].values())[-1], BaseException)}
-
-                retry = 0
-                while True:
-                    retry += 1
-
-                    self._do_batch(batch, TPE, self._last_results)
-                    batch = self._get_remained_batch(batch)
-
-                    if (not batch or retry >= static.GLOBALS['workaround']['retries']
-                            or not self._try_workaround(batch, TPE)):
-                        break
-
-                    self.logger.verbose('Retrying #%s...' % retry)
-                    time.sleep(static.GLOBALS['workaround']['delay_period'])
+            if self.policy.independent:
+                self._flush_independently(TPE)
+            else:
+                self._flush_lockstep(TPE)
 
         self._connections_queue = {}
 
@@ -534,6 +567,39 @@ class RawExecutor:
             if any(isinstance(result, BaseException) for result in results.values()):
                 raise GroupException(self.get_flat_result())
 
+    def _flush_lockstep(self, tpe: ThreadPoolExecutor) -> None:
+        callable_batches: List[Dict[str, List[_PayloadItem]]] = self._get_callables()
+        for batch in callable_batches:
+            # filter out hosts with failed commands
+            batch = {host: payloads for host, payloads in batch.items()
+                     # failed command is always last if present
+                     if host not in self._last_results
+                     or not isinstance(list(self._last_results[host].values())[-1], BaseException)}
+
+            # Each failed host is retried on its own timer, but the next batch starts only after all retries.
+            attempts: Dict[str, int] = {}
+            backoff = retry.Backoff(self.retry_policy, self.clock)
+            waiting: Dict[str, List[_PayloadItem]] = {}
+            while True:
+                if batch:
+                    self._do_batch(batch, tpe, self._last_results)
+                    remained_batch = self._get_remained_batch(batch)
+                    for host in remained_batch:
+                        attempts[host] = attempts.get(host, 0) + 1
+
+                    remained_batch = {host: payloads for host, payloads in remained_batch.items()
+                                      if attempts[host] < static.GLOBALS['workaround']['retries']}
+                    for host in self._try_workaround(remained_batch, tpe):
+                        delay = backoff.schedule(host)
+                        self.logger.verbose('Retrying #%s at %s in %.1f seconds...' % (attempts[host], host, delay))
+                        waiting[host] = remained_batch[host]
+
+                if not waiting:
+                    break
+
+                backoff.wait(waiting)
+                batch = {host: waiting.pop(host) for host in backoff.ready(list(waiting))}
+
     def interrupt(self) -> None:
         self._interrupt_queue.release()
 
@@ -575,6 +641,13 @@ class RawExecutor:
 
         return args
 
+    def _repr_payloads(self, payloads: List[_PayloadItem]) -> str:
+        reprs = []
+        for (do_type, args, _), _, _ in payloads:
+            repr_args = self._repr_args(do_type, args)
+            reprs.append(str(repr_args[0]) if do_type in ('run', 'sudo') else str(repr_args))
+        return '\n'.join(reprs)
+
     def _flush_logger_writers(self, batch: Dict[str, List[_PayloadItem]]) -> None:
         for payloads in batch.values():
             # Actions are merged only if there are no out_stream/err_stream or if they are the same instance.
@@ -589,8 +662,14 @@ class RawExecutor:
 
     def _do_batch(self, batch: Dict[str, List[_PayloadItem]], tpe: ThreadPoolExecutor,
                   capture_results: Dict[str, TokenizedResult]) -> None:
+        with tracing.span('batch', 'executor', hosts=len(batch)) as batch_span:
+            self._do_traced_batch(batch, tpe, capture_results, batch_span)
+
+    def _do_traced_batch(self, batch: Dict[str, List[_PayloadItem]], tpe: ThreadPoolExecutor,
+                         capture_results: Dict[str, TokenizedResult], batch_span: tracing.Span) -> None:
         results: _RawHostToResult = {}
         futures: Dict[str, concurrent.futures.Future] = {}
+        durations: Dict[str, float] = {}
 
         def safe_exec(result_map: Dict[str, Any], host: str, call: Callable[[], Any]) -> None:
             try:
@@ -604,12 +683,8 @@ class RawExecutor:
                 try:
                     if not interrupted:
                         for host, payloads in batch.items():
-                            cxn = self.connection_pool.get_connection(host)
-                            cxn.KM_start()
-
-                            do_type, args, kwargs = self._prepare_merged_action(host, payloads)
                             # pylint: disable-next=cell-var-from-loop
-                            safe_exec(futures, host, lambda: tpe.submit(getattr(cxn, do_type), *args, **kwargs))
+                            safe_exec(futures, host, lambda: self._submit(host, payloads, tpe, durations, batch_span))
 
                     # Timeout is implemented through timeout for run/sudo that finishes the future eventually.
                     # For put/get fabric & paramiko do not offer timeout, so transfer can be stopped only using SIGINT.
@@ -634,32 +709,188 @@ class RawExecutor:
                 # pylint: disable-next=cell-var-from-loop
                 safe_exec(results, host, lambda: future.result(timeout=None))
 
+        self._collect_results(batch, results, durations, capture_results)
+
+        if interrupted:
+            self._check_interrupted(capture_results)
+
+    def _submit(self, host: str, payloads: List[_PayloadItem], tpe: ThreadPoolExecutor,
+                durations: Dict[str, float], batch_span: tracing.Span) -> concurrent.futures.Future:
+        cxn = self.connection_pool.get_connection(host)
+        cxn.KM_start()
+
+        do_type, args, kwargs = self._prepare_merged_action(host, payloads)
+        call = getattr(cxn, do_type)
+        if tracing.enabled():
+            call = tracing.wrap(call, do_type, 'remote', parent=batch_span,
+                                host=host, actions=self._repr_payloads(payloads))
+        call = self._measure(call, host, durations)
+        return tpe.submit(call, *args, **kwargs)
+
+    def _collect_results(self, batch: Dict[str, List[_PayloadItem]], results: _RawHostToResult,
+                         durations: Dict[str, float], capture_results: Dict[str, TokenizedResult]) -> None:
+        self._record_statistics(batch, durations)
         self._flush_logger_writers(batch)
 
         parsed_results = self._reparse_results(results, batch)
         for host, tokenized_results in parsed_results.items():
             capture_results.setdefault(host, collections.OrderedDict()).update(tokenized_results)
 
-        if interrupted:
-            flat_results = get_flat_result(capture_results)
-            timed_out = False
-            # Check if at least one command was really interrupted.
-            # See also `connections.RemoteRunner.wait()`.
-            for flat_result in flat_results.values():
-                for result in flat_result:
-                    if isinstance(result, KeyboardInterrupt):
-                        raise GroupInterrupt(flat_results)
-
-                    timed_out = timed_out or isinstance(result, CommandTimedOut)
-
-            # No command was interrupted using real SIGINT character sent, but some command was timed out.
-            # This case will be processed later.
-            if timed_out:
+    def _check_interrupted(self, capture_results: Dict[str, TokenizedResult]) -> None:
+        flat_results = get_flat_result(capture_results)
+        timed_out = False
+        # Check if at least one command was really interrupted.
+        # See also `connections.RemoteRunner.wait()`.
+        for flat_result in flat_results.values():
+            for result in flat_result:
+                if isinstance(result, KeyboardInterrupt):
+                    raise GroupInterrupt(flat_results)
+
+                timed_out = timed_out or isinstance(result, CommandTimedOut)
+
+        # No command was interrupted using real SIGINT character sent, but some command was timed out.
+        # This case will be processed later.
+        if timed_out:
+            return
+
+        # The commands were really finished, but we still need to stop execution of main thread.
+        # It seems that no need to print the output.
+        raise KeyboardInterrupt()
+
+    def _flush_independently(self, tpe: ThreadPoolExecutor) -> None:
+        pending: Dict[str, Deque[List[_PayloadItem]]] = {
+            host: collections.deque(self._merge_actions(payload_items))
+            for host, payload_items in self._connections_queue.items()
+        }
+        # Currently executed actions and the time when they are started for each host
+        running: Dict[str, Tuple[concurrent.futures.Future, float]] = {}
+        durations: Dict[str, float] = {}
+        retries: Dict[str, int] = {}
+        backoff = retry.Backoff(self.retry_policy, self.clock)
+        soft_deadline = self.policy.soft_deadline
+
+        def collect(host: str, retry_allowed: bool = True) -> None:
+            future, _ = running.pop(host)
+            payloads = pending[host].popleft()
+            results: _RawHostToResult = {}
+            try:
+                results[host] = future.result(timeout=None)
+            except BaseException as e:  # including KeyboardInterrupt
+                results[host] = e
+
+            self._collect_results({host: payloads}, results, durations, self._last_results)
+
+            remained_batch = self._get_remained_batch({host: payloads})
+            if not remained_batch:
+                retries.pop(host, None)
+                backoff.reset(host)
                 return
 
-            # The commands were really finished, but we still need to stop execution of main thread.
-            # It seems that no need to print the output.
-            raise KeyboardInterrupt()
+            attempt = retries[host] = retries.get(host, 0) + 1
+            if (retry_allowed and attempt < static.GLOBALS['workaround']['retries']
+                    and self._try_workaround(remained_batch, tpe)):
+                delay = backoff.schedule(host)
+                self.logger.verbose('Retrying #%s at %s in %.1f seconds...' % (attempt, host, delay))
+                pending[host].appendleft(remained_batch[host])
+            else:
+                # Do not execute further actions on the failed host
+                pending[host].clear()
+
+        with tracing.span('independent batches', 'executor', hosts=len(pending)) as batch_span:
+            try:
+                while True:
+                    for host in [host for host, batches in pending.items() if not batches]:
+                        del pending[host]
+                    if not pending:
+                        break
+
+                    now = self.clock.monotonic()
+                    tail = all(host in self._stragglers for host in pending)
+                    for host, batches in pending.items():
+                        if (host in running or backoff.remaining(host) > 0
+                                or (host in self._stragglers and not tail)):
+                            continue
+
+                        try:
+                            running[host] = self._submit(host, batches[0], tpe, durations, batch_span), now
+                        except BaseException as e:  # pylint: disable=broad-exception-caught
+                            self._collect_results({host: batches[0]}, {host: e}, durations, self._last_results)
+                            batches.clear()
+
+                    if not running:
+                        # Wait for the delay before retry
+                        backoff.wait(pending)
+                        continue
+
+                    # See _do_traced_batch for the reasons of short-time waits.
+                    futures = [future for future, _ in running.values()]
+                    done = concurrent.futures.wait(futures, timeout=connections.input_sleep,
+                                                   return_when=concurrent.futures.FIRST_COMPLETED).done
+                    if self._interrupt_queue.acquire(blocking=False):  # pylint: disable=consider-using-with
+                        raise KeyboardInterrupt()
+
+                    for host in [host for host, (future, _) in running.items() if future in done]:
+                        collect(host)
+
+                    if soft_deadline is not None:
+                        now = self.clock.monotonic()
+                        for host, (_, started) in running.items():
+                            if host not in self._stragglers and now - started > soft_deadline:
+                                self.logger.verbose("Host %s did not finish its action in %s seconds, "
+                                                    "deferring its remaining actions to the tail phase"
+                                                    % (host, soft_deadline))
+                                self._stragglers.append(host)
+
+            except KeyboardInterrupt:
+                for host in running:
+                    self.connection_pool.get_connection(host).KM_interrupt()
+
+                concurrent.futures.wait([future for future, _ in running.values()])
+                for host in list(running):
+                    collect(host, retry_allowed=False)
+
+                self._check_interrupted(self._last_results)
+
+    @staticmethod
+    def _measure(call: Callable[..., Any], host: str, durations: Dict[str, float]) -> Callable[..., Any]:
+        def measured(*args: Any, **kwargs: Any) -> Any:
+            time_start = time.perf_counter()
+            result = call(*args, **kwargs)
+            durations[host] = time.perf_counter() - time_start
+            return result
+
+        return measured
+
+    def _record_statistics(self, batch: Dict[str, List[_PayloadItem]], durations: Dict[str, float]) -> None:
+        # Durations can be shared with the actions that are still running on other hosts
+        batch_durations: Dict[str, float] = {}
+        connect_times: Dict[str, float] = {}
+        transferred_bytes: Dict[str, int] = {}
+        for host, payloads in batch.items():
+            connect_times[host] = self.connection_pool.get_connection(host).KM_pop_connect_time()
+            if host not in durations:
+                continue
+
+            batch_durations[host] = durations.pop(host)
+            do_type, args, _ = payloads[-1][0]
+            if do_type in ('put', 'get'):
+                size = self._get_transfer_size(do_type, args)
+                if size is not None:
+                    transferred_bytes[host] = size
+
+        self.connection_pool.statistics.record_batch(batch_durations, connect_times, transferred_bytes)
+
+    @staticmethod
+    def _get_transfer_size(do_type: str, args: tuple) -> Optional[int]:
+        local = args[0] if do_type == 'put' else args[1]
+        if isinstance(local, bytes):
+            return len(local)
+        if isinstance(local, io.BytesIO):
+            return local.getbuffer().nbytes
+        if isinstance(local, str) and os.path.isfile(local):
+            return os.path.getsize(local)
+
+        return None
 
     def _get_remained_batch(self, batch: Dict[str, List[_PayloadItem]]) -> Dict[str, List[_PayloadItem]]:
         remained_batch = {}
@@ -678,7 +909,13 @@ class RawExecutor:
 
         return remained_batch
 
-    def _try_workaround(self, batch: Dict[str, List[_PayloadItem]], tpe: ThreadPoolExecutor) -> bool:
+    def _try_workaround(self, batch: Dict[str, List[_PayloadItem]], tpe: ThreadPoolExecutor) -> List[str]:
+        """
+        Detect temporary errors of the failed actions, and wait for boot of the hosts with the connection errors.
+
+        :return: hosts whose failed actions can be retried
+        """
+        retriable = []
         not_booted = []
 
         for host in batch:
@@ -686,8 +923,8 @@ class RawExecutor:
             exception = list(self._last_results[host].values())[-1]
             if isinstance(exception, CommandTimedOut):
                 self.logger.verbose("Command timed out at %s: %s" % (host, str(exception.result)))
-                return False
-            elif isinstance(exception, UnexpectedExit):
+                continue
+            if isinstance(exception, UnexpectedExit):
                 # Do not str(exception) because it discards output in case of hide=False
                 exception_message = str(exception.result)
             else:
@@ -695,8 +932,10 @@ class RawExecutor:
 
             if self._is_allowed_etcd_exception(exception_message):
                 self.logger.verbose("Detected ETCD problem at %s, need retry: %s" % (host, exception_message))
+                retriable.append(host)
             elif self._is_allowed_kubernetes_exception(exception_message):
                 self.logger.verbose("Detected kubernetes problem at %s, need retry: %s" % (host, exception_message))
+                retriable.append(host)
             elif self._is_allowed_connection_exception(exception_message):
                 self.logger.verbose("Detected connection exception at %s, will try to reconnect to node. Exception: %s"
                                     % (host, exception_message))
@@ -704,16 +943,13 @@ class RawExecutor:
             else:
                 self.logger.verbose("Detected unavoidable exception at %s, trying to solve automatically: %s"
                                          % (host, exception_message))
-                return False
 
         if not_booted:
             results = self._wait_for_boot_with_executor(not_booted, tpe)
-            # if there are not booted nodes, but we succeeded to wait for at least one is booted,
-            # we can continue execution
-            if all(isinstance(result, BaseException) for result in results.values()):
-                return False
+            # retry only the nodes that are succeeded to boot
+            retriable.extend(host for host, result in results.items() if not isinstance(result, BaseException))
 
-        return True
+        return [host for host in batch if host in retriable]
 
     def wait_for_boot(self, left_nodes: List[str], timeout: int = None,
                       initial_boot_history: Mapping[str, RunnersResult] = None) -> HostToResult:
@@ -725,35 +961,42 @@ class RawExecutor:
                                      initial_boot_history: Mapping[str, RunnersResult] = None) -> HostToResult:
 
         timeout = self._resolve_boot_timeout(left_nodes, overridden_timeout)
-        delay_period = static.GLOBALS['nodes']['boot']['defaults']['delay_period']
+        # Each node is polled on its own timer, so that the nodes that are already booted are not waited for.
+        backoff = retry.Backoff(retry.RetryPolicy.from_config(static.GLOBALS['nodes']['boot']['defaults']),
+                                self.clock)
 
         if initial_boot_history is None:
             initial_boot_history = {}
 
         results: HostToResult = {}
-        time_start = datetime.now()
+        time_start = self.clock.monotonic()
 
         self.logger.verbose("Trying to connect to nodes, timeout is %s seconds..." % timeout)
 
         # each connection has timeout, so the only we need is to repeat connecting attempts
         # during specified number of seconds
         while True:
-            attempt_time_start = datetime.now()
-            self._disconnect(left_nodes)
-
-            self.logger.verbose("Attempting to connect to nodes...")
-            # this should be invoked without explicit timeout, and relied on fabric Connection timeout instead.
-            results.update(self._do_nopasswd(left_nodes, tpe, "last reboot"))
-            left_nodes = [host for host, result in results.items()
-                          if (isinstance(result, BaseException)
-                              # Something is wrong with sudo access. Node is active.
-                              and not self.is_require_nopasswd_exception(result)
-                              # If not a connection-related exception, do not try to connect further
-                              and self._is_allowed_connection_exception(str(result)))
-                          or (isinstance(result, RunnersResult)
-                              and result == initial_boot_history.get(host))]
-
-            waited = (datetime.now() - time_start).total_seconds()
+            ready_nodes = backoff.ready(left_nodes)
+            if ready_nodes:
+                self._disconnect(ready_nodes)
+
+                self.logger.verbose("Attempting to connect to nodes %s..." % ready_nodes)
+                # this should be invoked without explicit timeout, and relied on fabric Connection timeout instead.
+                results.update(self._do_nopasswd(ready_nodes, tpe, "last reboot"))
+                for host in ready_nodes:
+                    result = results[host]
+                    if ((isinstance(result, BaseException)
+                         # Something is wrong with sudo access. Node is active.
+                         and not self.is_require_nopasswd_exception(result)
+                         # If not a connection-related exception, do not try to connect further
+                         and self._is_allowed_connection_exception(str(result)))
+                            or (isinstance(result, RunnersResult)
+                                and result == initial_boot_history.get(host))):
+                        backoff.schedule(host)
+                    else:
+                        left_nodes = [node for node in left_nodes if node != host]
+
+            waited = self.clock.monotonic() - time_start
             if left_nodes:
                 timeout = self._resolve_boot_timeout(left_nodes, overridden_timeout)
 
@@ -763,9 +1006,7 @@ class RawExecutor:
             self.logger.verbose("Nodes %s are not ready yet, remaining time to wait %i"
                                 % (left_nodes, timeout - waited))
 
-            attempt_time = (datetime.now() - attempt_time_start).total_seconds()
-            if attempt_time < delay_period:
-                time.sleep(delay_period - attempt_time)
+            backoff.wait(left_nodes, timeout - waited)
 
         if left_nodes:
             self.logger.verbose("Failed to wait for boot of nodes %s" % left_nodes)
@@ -13,15 +13,19 @@
 # limitations under the License.
 
 import argparse
+import hashlib
+import json
 import os
 import shlex
 import sys
 import time
 from abc import abstractmethod, ABC
 from copy import deepcopy
-from typing import Optional, List, Union, Sequence, Tuple, Dict, Any
+from typing import Optional, List, Union, Sequence, Tuple, Dict, Any, Callable
 
-from kubemarine.core import utils, cluster as c, action, resources as res, errors, summary, log, defaults
+from kubemarine.core import utils, cluster as c, action, resources as res, errors, summary, log, defaults, tracing
+from kubemarine.core.executor import GroupException, RunnersResult
+from kubemarine.core.group import NodeGroup
 
 ERROR_UNRECOGNIZED_CUMULATIVE_POINT_EXCLUDE = "Unrecognized cumulative point to exclude: {point}"
 ERROR_UNRECOGNIZED_TASKS_FILTER = "Unrecognized tasks filter: {tasks}"
@@ -33,6 +37,8 @@ tasks list:
 
 END_OF_TASKS = object()
 
+CHECKPOINTS_FILENAME = 'checkpoints.json'
+
 
 class FlowResult:
     def __init__(self, context: dict, logger: log.EnhancedLogger):
@@ -51,10 +57,15 @@ class Flow(ABC):
 
         context = resources.context
 
+        args = context['execution_arguments']
+        if args.get('trace', False) and not args['disable_dump']:
+            tracing.start()
+
         try:
             utils.prepare_dump_directory(context)
             resources.logger()
-            self._run(resources)
+            with tracing.span(context['initial_procedure'] or 'undefined', 'procedure'):
+                self._run(resources)
         except (Exception, KeyboardInterrupt) as exc:
             logger = resources.logger_if_initialized()
             if isinstance(exc, errors.FailException):
@@ -63,6 +74,14 @@ class Flow(ABC):
             else:
                 utils.do_fail(f"'{context['initial_procedure'] or 'undefined'}' procedure failed.", exc,
                               logger=logger)
+        finally:
+            tracer = tracing.stop()
+            if tracer is not None:
+                self._dump_safely(resources, 'trace', lambda: tracing.dump(context, tracer))
+            self._dump_safely(resources, 'host statistics', lambda: self._dump_host_statistics(resources))
+            logger = resources.logger_if_initialized()
+            if logger is not None:
+                log.flush_handlers(logger)
 
         time_end = time.time()
         logger = resources.logger()
@@ -75,6 +94,35 @@ class Flow(ABC):
 
         return FlowResult(resources.result_context, logger)
 
+    def _dump_safely(self, resources: res.DynamicResources, name: str, dump: Callable[[], None]) -> None:
+        """
+        Failure to dump the diagnostic data should not hide the result or the original error of the procedure.
+        """
+        try:
+            dump()
+        except Exception as exc:  # pylint: disable=broad-except
+            logger = resources.logger_if_initialized()
+            if logger is not None:
+                logger.warning(f"Failed to dump {name}: {exc}")
+
+    def _dump_host_statistics(self, resources: res.DynamicResources) -> None:
+        connection_pool = resources.connection_pool_if_initialized()
+        if connection_pool is None or connection_pool.statistics.is_empty() \
+                or resources.context['execution_arguments']['disable_dump']:
+            return
+
+        host_names: Dict[str, str] = {}
+        cluster = resources.cluster_if_initialized()
+        if cluster is not None:
+            host_names = {node['connect_to']: node['name'] for node in cluster.inventory['nodes']
+                          if 'connect_to' in node}
+
+        connection_pool.statistics.dump(resources.context, host_names)
+        logger = resources.logger_if_initialized()
+        stragglers = connection_pool.statistics.get_stragglers()
+        if logger is not None and stragglers:
+            logger.debug(f"Top stragglers: {', '.join(host_names.get(host, host) for host in stragglers)}")
+
     @abstractmethod
     def _run(self, resources: res.DynamicResources) -> None:
         pass
@@ -119,7 +167,8 @@ def run_actions(resources: res.DynamicResources, actions: Sequence[action.Action
 
         try:
             logger.info(f"Running action '{act.identifier}'")
-            act.run(resources)
+            with tracing.span(act.identifier, 'action'):
+                act.run(resources)
             resources.collect_action_result()
             successfully_performed.append(act.identifier)
         except (Exception, KeyboardInterrupt):  # even on KeyboardInterrupt we have to preserve what we have done
@@ -378,14 +427,20 @@ def run_tasks_recursive(tasks: dict, final_task_names: List[str], cluster: c.Kub
             if not run:
                 continue
             cluster.log.info("*** TASK %s ***" % __task_name)
+            cluster.context['running_task'] = __task_name
             try:
-                task(cluster)
+                with tracing.span(__task_name, 'task'):
+                    task(cluster)
                 add_task_to_proceeded_list(cluster, __task_name)
             except (Exception, KeyboardInterrupt) as exc:
                 raise errors.FailException(
                     "TASK FAILED %s" % __task_name, exc,
                     hint=cluster.globals['error_handling']['failure_message'] % (sys.argv[0], __task_name)
                 )
+            finally:
+                del cluster.context['running_task']
+                # Output of the task should be written before the next task starts, if the logging is queued.
+                log.flush_handlers(cluster.log)
         else:
             run_tasks_recursive(task, final_task_names, cluster, cumulative_points, __task_path)
 
@@ -415,6 +470,16 @@ def new_common_parser(cli_help: str) -> argparse.ArgumentParser:
                         action='store_true',
                         help='prevent dump directory cleaning on process launch')
 
+    parser.add_argument('--trace',
+                        action='store_true',
+                        help='record timings of tasks, remote commands and waits, '
+                             'and save them in the dump directory in Chrome trace and OTLP JSON formats')
+
+    parser.add_argument('--queued-log',
+                        action='store_true',
+                        help='write logs from the background thread, '
+                             'so that the parallel remote commands do not wait for the writes')
+
     parser.add_argument('--log',
                         action='append',
                         nargs='*',
@@ -455,6 +520,16 @@ def new_tasks_flow_parser(cli_help: str, tasks: dict = None) -> argparse.Argumen
                         default='',
                         help='comma-separated cumulative points methods names to be excluded from execution')
 
+    parser.add_argument('--resume',
+                        action='store_true',
+                        help='keep the dump directory, and skip the nodes that completed the tasks '
+                             'according to the checkpoints of the previous run')
+
+    parser.add_argument('--ignore-journal',
+                        action='store_true',
+                        help='run the journaled tasks on all nodes even if their inputs are not changed '
+                             'since the last run, and record the journal again')
+
     # Add tasks list to help section
     if tasks is not None:
         parser.epilog = TASK_DESCRIPTION_TEMPLATE % ('\n    '.join(get_task_list(tasks)))
@@ -505,7 +580,8 @@ def proceed_cumulative_point(cluster: c.KubernetesCluster, points_list: dict,
 
             cluster.log.info("*** CUMULATIVE POINT %s ***" % point_method_fullname)
 
-            call_result = point_method(cluster)
+            with tracing.span(point_method_fullname, 'cumulative point'):
+                call_result = point_method(cluster)
             if point_method in scheduled_methods:
                 scheduled_methods.remove(point_method)
             results[point_method_fullname] = call_result
@@ -516,6 +592,7 @@ def proceed_cumulative_point(cluster: c.KubernetesCluster, points_list: dict,
 def init_tasks_flow(cluster: c.KubernetesCluster) -> None:
     if 'proceeded_tasks' not in cluster.context:
         cluster.context['proceeded_tasks'] = []
+        cluster.context['nodes_checkpoints'] = _load_checkpoints(cluster)
 
 
 def add_task_to_proceeded_list(cluster: c.KubernetesCluster, task_path: str) -> None:
@@ -524,6 +601,92 @@ def add_task_to_proceeded_list(cluster: c.KubernetesCluster, task_path: str) ->
         utils.dump_file(cluster, "\n".join(cluster.context['proceeded_tasks'])+"\n", 'finished_tasks')
 
 
+def _get_inventory_hash(cluster: c.KubernetesCluster) -> str:
+    data = json.dumps(cluster.raw_inventory, sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _load_checkpoints(cluster: c.KubernetesCluster) -> Dict[str, List[str]]:
+    context = cluster.context
+    args = context['execution_arguments']
+    if not args.get('resume', False) or args['disable_dump']:
+        return {}
+
+    filepath = utils.get_dump_filepath(context, CHECKPOINTS_FILENAME)
+    if not os.path.isfile(filepath):
+        return {}
+
+    with utils.open_utf8(filepath) as stream:
+        data = json.load(stream)
+
+    if data.get('inventory_hash') != _get_inventory_hash(cluster):
+        cluster.log.warning("Checkpoints of the previous run are ignored because the inventory is changed.")
+        return {}
+
+    checkpoints: Dict[str, List[str]] = data['tasks']
+    return checkpoints
+
+
+def add_nodes_checkpoints(cluster: c.KubernetesCluster, task_path: str, group: NodeGroup) -> None:
+    """
+    Record that the nodes of the group completed the task, and save the checkpoints to the dump directory.
+    """
+    checkpoints: Dict[str, List[str]] = cluster.context['nodes_checkpoints']
+    completed = checkpoints.setdefault(task_path, [])
+    completed.extend(name for name in group.get_nodes_names() if name not in completed)
+    data = {'inventory_hash': _get_inventory_hash(cluster), 'tasks': checkpoints}
+    utils.dump_file(cluster, json.dumps(data, indent=2) + "\n", CHECKPOINTS_FILENAME, atomic=True)
+
+
+def run_with_nodes_checkpoints(group: NodeGroup, fn: Callable[[NodeGroup], None],
+                               *, single_batch: bool = False) -> None:
+    """
+    Run the task that is performed independently on each node of the group.
+
+    The nodes that completed the task are recorded to the checkpoints.
+    If the procedure is resumed, the nodes that completed the task in the previous run are skipped.
+
+    :param group: nodes to run the task on
+    :param fn: function that performs the task on the specified nodes
+    :param single_batch: the function performs all remote commands in a single batch.
+                         If the batch fails, the nodes that did not fail it have completed the task.
+                         Otherwise, no node is recorded if the task fails.
+    """
+    cluster: c.KubernetesCluster = group.cluster
+    task_path: Optional[str] = cluster.context.get('running_task')
+    if task_path is None:
+        # Called outside of the tasks flow
+        fn(group)
+        return
+
+    completed_names = cluster.context['nodes_checkpoints'].get(task_path, [])
+    completed = cluster.make_group(group.get_ordered_members_list(
+        apply_filter=lambda node: node['name'] in completed_names))
+    if not completed.is_empty():
+        cluster.log.debug(f"Skip nodes {completed.get_nodes_names()} that completed the task in the previous run.")
+
+    remaining = group.exclude_group(completed)
+    if remaining.is_empty():
+        return
+
+    try:
+        fn(remaining)
+    except GroupException as exc:
+        if single_batch:
+            succeeded = remaining.intersection_group(cluster.make_group(_get_succeeded_hosts(exc)))
+            if not succeeded.is_empty():
+                add_nodes_checkpoints(cluster, task_path, succeeded)
+        raise
+
+    add_nodes_checkpoints(cluster, task_path, remaining)
+
+
+def _get_succeeded_hosts(exc: GroupException) -> List[str]:
+    return [host for host, results in exc.results.items()
+            if results and not any(isinstance(result, Exception) or (isinstance(result, RunnersResult) and result.failed)
+                       for result in results)]
+
+
 def _check_within_flow(cluster: c.KubernetesCluster, check: bool = True) -> None:
     if check != ('proceeded_tasks' in cluster.context):
         raise NotImplementedError(f"The method is called {'not ' if check else ''}within tasks flow execution")
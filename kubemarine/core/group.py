@@ -29,7 +29,7 @@ from kubemarine.core import utils, log, executor as exe
 from kubemarine.core.connections import ConnectionPool
 from kubemarine.core.executor import (
     RawExecutor, Token, GenericResult, RunnersResult, HostToResult, Callback, UnexpectedExit,
-    RESULT, GroupResult,
+    RESULT, GroupResult, BatchPolicy, LOCKSTEP,
 )
 
 NodeConfig = Dict[str, Any]
@@ -672,11 +672,11 @@ class NodeGroup(AbstractGroup[RunnersGroupResult]):
     def _make_defer(self, executor: RemoteExecutor) -> DeferredGroup:
         return DeferredGroup(self.nodes, self.cluster, executor)
 
-    def new_defer(self) -> DeferredGroup:
-        return self.new_executor().group
+    def new_defer(self, policy: BatchPolicy = LOCKSTEP) -> DeferredGroup:
+        return self.new_executor(policy).group
 
-    def new_executor(self) -> RemoteExecutor:
-        return RemoteExecutor(self)
+    def new_executor(self, policy: BatchPolicy = LOCKSTEP) -> RemoteExecutor:
+        return RemoteExecutor(self, policy=policy)
 
     def get(self, remote_file: str, local_file: str) -> None:
         self._do_exec("get", remote_file, local_file)
@@ -859,8 +859,9 @@ class DeferredGroup(AbstractGroup[Token]):
 
 
 class RemoteExecutor(RawExecutor):
-    def __init__(self, group: NodeGroup, connection_pool: ConnectionPool = None) -> None:
-        super().__init__(group.cluster, connection_pool)
+    def __init__(self, group: NodeGroup, connection_pool: ConnectionPool = None,
+                 policy: BatchPolicy = LOCKSTEP) -> None:
+        super().__init__(group.cluster, connection_pool, policy)
         self.group: DeferredGroup = group._make_defer(self)
         self.cluster = group.cluster
 
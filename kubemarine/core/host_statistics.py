@@ -0,0 +1,129 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import threading
+from typing import Dict, List, Mapping, Optional
+
+from kubemarine.core import utils
+
+STATISTICS_FILENAME = 'host_statistics.txt'
+TOP_STRAGGLERS = 5
+
+
+class _HostSamples:
+    __slots__ = ('connect', 'command', 'throughput', 'gated_batches', 'gated_time')
+
+    def __init__(self) -> None:
+        self.connect: List[float] = []
+        self.command: List[float] = []
+        self.throughput: List[float] = []
+        self.gated_batches = 0
+        self.gated_time = 0.0
+
+
+class HostStatistics:
+    """
+    Per-host timings of the remote actions collected by the executor through the whole run of the procedure.
+
+    For each batch of actions executed on multiple hosts in lockstep, the slowest host gates the batch.
+    It is accounted as a straggler for the time it exceeded the median time of the batch.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._hosts: Dict[str, _HostSamples] = {}
+
+    def record_batch(self, durations: Mapping[str, float], connect_times: Mapping[str, float],
+                     transferred_bytes: Mapping[str, int]) -> None:
+        """
+        Record timings of the batch of actions.
+
+        :param durations: total time in seconds of the successful action on each host, including the connect time
+        :param connect_times: time in seconds spent to connect to the hosts, if the connection was opened
+        :param transferred_bytes: size of the transferred file for file transfer actions
+        """
+        if not durations:
+            return
+
+        with self._lock:
+            for host, duration in durations.items():
+                samples = self._hosts.get(host)
+                if samples is None:
+                    samples = self._hosts[host] = _HostSamples()
+
+                connect_time = connect_times.get(host, 0.0)
+                if connect_time:
+                    samples.connect.append(connect_time)
+
+                command_time = max(duration - connect_time, 0.0)
+                samples.command.append(command_time)
+                if host in transferred_bytes and command_time > 0:
+                    samples.throughput.append(transferred_bytes[host] / command_time)
+
+            if len(durations) > 1:
+                straggler = max(durations, key=lambda h: durations[h])
+                samples = self._hosts[straggler]
+                samples.gated_batches += 1
+                samples.gated_time += durations[straggler] - utils.percentile(list(durations.values()), 50)
+
+    def is_empty(self) -> bool:
+        return not self._hosts
+
+    def get_stragglers(self, top: int = TOP_STRAGGLERS) -> List[str]:
+        """
+        :return: hosts that most gated the batches, starting from the worst one
+        """
+        with self._lock:
+            stragglers = [host for host, samples in self._hosts.items() if samples.gated_time > 0]
+            stragglers.sort(key=lambda h: self._hosts[h].gated_time, reverse=True)
+            return stragglers[:top]
+
+    def summarize(self, host_names: Mapping[str, str] = None) -> str:
+        """
+        Summarize statistics as a table with p50/p95/max values for each host, and the list of top stragglers.
+
+        :param host_names: optional mapping of hosts to node names to show instead of hosts
+        """
+        def name(host: str) -> str:
+            return host_names.get(host, host) if host_names else host
+
+        def stats(values: List[float], scale: float) -> str:
+            if not values:
+                return '-'
+            return '/'.join(f"{utils.percentile(values, p) * scale:.0f}" for p in (50, 95, 100))
+
+        header = ['host', 'actions', 'connect p50/p95/max ms', 'command p50/p95/max ms',
+                  'transfer p50 KB/s', 'gated batches', 'gated time s']
+        rows = [header]
+        with self._lock:
+            for host, samples in self._hosts.items():
+                throughput = f"{utils.percentile(samples.throughput, 50) / 1024:.0f}" if samples.throughput else '-'
+                rows.append([name(host), str(len(samples.command)),
+                             stats(samples.connect, 1000), stats(samples.command, 1000),
+                             throughput, str(samples.gated_batches), f"{samples.gated_time:.1f}"])
+
+        widths = [max(len(row[i]) for row in rows) for i in range(len(header))]
+        lines = ['  '.join(cell.ljust(widths[i]) for i, cell in enumerate(row)).rstrip() for row in rows]
+
+        stragglers = self.get_stragglers()
+        lines.append('')
+        lines.append(f"Top stragglers: {', '.join(name(host) for host in stragglers) if stragglers else 'none'}")
+
+        return '\n'.join(lines) + '\n'
+
+    def dump(self, context: dict, host_names: Optional[Mapping[str, str]] = None) -> None:
+        """
+        Write the summary to the dump directory.
+        """
+        utils.dump_file(context, self.summarize(host_names), STATISTICS_FILENAME)
@@ -0,0 +1,153 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Journal of the tasks stored on each node.
+
+For each journaled task, the node keeps the fingerprint of the inputs that the task consumed for that node
+during the last successful run. If the fingerprint is not changed, the task is not run again on the node.
+The journal is enabled by `procedure_history.journal` section of the inventory,
+and can be ignored for the single run by `--ignore-journal` argument.
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, List, Optional, Sequence, TypeVar
+
+from kubemarine.core import utils
+from kubemarine.core.group import NodeGroup, RunnersGroupResult
+
+JOURNAL_DIR = '/etc/kubemarine/journal'
+
+_T = TypeVar('_T')
+_MISSING = object()
+INPUTS_CALLABLE = Callable[[NodeGroup], object]
+
+
+def is_enabled(group: NodeGroup) -> bool:
+    return bool(group.cluster.inventory['procedure_history']['journal'])
+
+
+def inventory_inputs(*paths: Sequence[str]) -> INPUTS_CALLABLE:
+    """
+    Create function that returns the sections of the inventory, that the task consumes.
+    The sections are taken from the resulting inventory of the node if the patches are supported for them,
+    or from the resulting inventory of the cluster otherwise.
+
+    :param paths: paths to the sections of the inventory, for example ['services', 'sysctl']
+    :return: function that accepts the group of single node
+    """
+    def get_inputs(node: NodeGroup) -> object:
+        cluster = node.cluster
+        inputs = {}
+        for path in paths:
+            section = _get_section(cluster.nodes_inventory.get(node.get_host(), {}), path)
+            if section is _MISSING:
+                section = _get_section(cluster.inventory, path)
+            inputs['.'.join(path)] = None if section is _MISSING else section
+
+        return inputs
+
+    return get_inputs
+
+
+def _get_section(inventory: dict, path: Sequence[str]) -> object:
+    section: object = inventory
+    for name in path:
+        if not isinstance(section, dict) or name not in section:
+            return _MISSING
+        section = section[name]
+
+    return section
+
+
+def fingerprint(node: NodeGroup, inputs: object) -> str:
+    """
+    Calculate fingerprint of the inputs of the task for the node.
+    The fingerprint also depends on the Kubemarine version, the node and its operating system,
+    so that the tasks are run again after upgrade of Kubemarine or operating system.
+    """
+    node_config = node.get_config()
+    os_details = node.cluster.nodes_context[node.get_host()]['os']
+    data = {
+        'version': utils.get_version(),
+        'node': {'name': node_config['name'], 'roles': node_config['roles']},
+        'os': {key: os_details.get(key) for key in ('family', 'name', 'version')},
+        'inputs': inputs,
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode('utf-8')).hexdigest()
+
+
+def get_journal_path(name: str) -> str:
+    return f"{JOURNAL_DIR}/{name}"
+
+
+def read(group: NodeGroup, name: str) -> Dict[str, str]:
+    """
+    Read fingerprints of the task from the journal of the nodes.
+
+    :param group: nodes to read the journal from
+    :param name: name of the journaled task
+    :return: fingerprints for the nodes that have the record of the task
+    """
+    results: RunnersGroupResult = group.sudo(f"cat {get_journal_path(name)}", warn=True)
+    return {host: result.stdout.strip() for host, result in results.items() if not result.failed}
+
+
+def write(group: NodeGroup, name: str, fingerprints: Dict[str, str]) -> None:
+    """
+    Record fingerprints of the task to the journal of the nodes.
+    """
+    path = get_journal_path(name)
+    with group.new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            node.sudo(f"sh -c \"mkdir -p {JOURNAL_DIR} && "
+                      f"echo '{fingerprints[node.get_host()]}' | tee {path} > /dev/null\"")
+
+
+def run_changed(group: NodeGroup, name: str, inputs: INPUTS_CALLABLE,
+                action: Callable[[NodeGroup], _T]) -> Optional[_T]:
+    """
+    Run the action only on the nodes whose inputs of the task are changed since the last successful run.
+    If the journal is disabled, the action is run on all nodes of the group, and the journal is not accessed.
+
+    :param group: nodes to run the action on
+    :param name: name of the journaled task
+    :param inputs: function that returns inputs of the task for the group of single node
+    :param action: function to run on the group of changed nodes
+    :return: result of the action, or None if nothing is changed
+    """
+    if not is_enabled(group):
+        return action(group)
+
+    cluster = group.cluster
+    fingerprints = {node.get_host(): fingerprint(node, inputs(node))
+                    for node in group.get_ordered_members_list()}
+
+    changed: List[str] = list(fingerprints)
+    if not cluster.context['execution_arguments']['ignore_journal']:
+        recorded = read(group, name)
+        changed = [host for host in changed if recorded.get(host) != fingerprints[host]]
+
+    unchanged_group = group.exclude_group(cluster.make_group(changed))
+    if not unchanged_group.is_empty():
+        cluster.log.debug(f"Skip {name!r} on nodes {unchanged_group.get_nodes_names()} "
+                          f"as the inputs are not changed since the last run.")
+    if not changed:
+        return None
+
+    changed_group = cluster.make_group(changed)
+    result = action(changed_group)
+    write(changed_group, name, fingerprints)
+    return result
@@ -14,7 +14,9 @@
 
 import logging
 import os
+import queue
 import sys
+import threading
 from abc import ABC, abstractmethod
 from typing import Any, List, Optional, cast, Dict, Union
 
@@ -25,6 +27,10 @@ gelf.LEVELS.update({VERBOSE: 8})
 
 DEFAULT_FORMAT = '%(asctime)s %(name)s %(levelname)s %(message)s'
 
+# Maximum number of records waiting to be written by the queued logging, and maximum number of records in one write.
+QUEUE_CAPACITY = 10000
+QUEUE_BATCH_SIZE = 500
+
 BLACK, RED, GREEN, YELLOW, BLUE, MAGENTA, CYAN, WHITE = range(8)
 
 RESET_SEQ = "\033[0m"
@@ -160,12 +166,12 @@ class StdoutHandler(logging.StreamHandler):
         super().__init__(sys.stdout)
         self.formatter: LogFormatter = formatter
 
-    def emit(self, record: logging.LogRecord) -> None:
-        if 'ignore_stdout' in record.__dict__:
-            return
-        super().emit(record)
-        # TODO: if output stuck, then add here self.flush()
+    def filter(self, record: logging.LogRecord) -> bool:
+        # TODO: if output stuck, then override emit() and add self.flush() there
         # More about, see at https://stackoverflow.com/questions/16633911
+        if 'ignore_stdout' in record.__dict__:
+            return False
+        return bool(super().filter(record))
 
 
 class FileHandlerWithHeader(logging.FileHandler):
@@ -188,6 +194,156 @@ class FileHandlerWithHeader(logging.FileHandler):
         logging.FileHandler.emit(self, record)
 
 
+class QueuedHandler(logging.Handler):
+    """
+    Handler that passes the records to the target handlers in the background writer thread.
+    The logging threads only put the records to the bounded queue, and wait only if the queue is full.
+    The writer thread takes all the available records at once,
+    and writes them to the files and to stdout by one write of the stream.
+    The output that is printed directly to stdout by `LoggerWriter` is passed through the same queue
+    to keep its order relative to the records.
+    """
+
+    def __init__(self, handlers: List[logging.Handler],
+                 capacity: int = QUEUE_CAPACITY, batch_size: int = QUEUE_BATCH_SIZE):
+        super().__init__()
+        self.handlers = handlers
+        self._batch_size = batch_size
+        self._queue: 'queue.Queue[Union[logging.LogRecord, str, threading.Event, None]]' = queue.Queue(capacity)
+        self._closed = False
+        self._thread = threading.Thread(target=self._write_loop, name='log-writer', daemon=True)
+        self._thread.start()
+
+    def handle(self, record: logging.LogRecord) -> bool:
+        # The queue is thread-safe, so the lock of the handler is not acquired.
+        rv = bool(self.filter(record))
+        if rv:
+            self.emit(record)
+        return rv
+
+    def emit(self, record: logging.LogRecord) -> None:
+        try:
+            record = self.prepare(record)
+            if self._closed:
+                self._write([record])
+            else:
+                self._queue.put(record)
+        except Exception:  # pylint: disable=broad-except
+            self.handleError(record)
+
+    def write_stdout(self, text: str) -> None:
+        """
+        Print the text directly to stdout in order with the logged records.
+        """
+        if self._closed:
+            self._write_stdout(text)
+        else:
+            self._queue.put(text)
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The message and the exception are formatted in the logging thread,
+        # because the arguments can be changed after the record is logged.
+        # The record is changed in place, as it is done by the formatters for the exception text.
+        # The prefix is still added by `EnhancedLogRecord.getMessage()` to each line of the message.
+        record.msg = logging.LogRecord.getMessage(record)
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+
+        return record
+
+    def flush(self) -> None:
+        """
+        Wait until all the records that are logged by this moment are written.
+        """
+        if self._closed or threading.current_thread() is self._thread:
+            return
+
+        written = threading.Event()
+        self._queue.put(written)
+        written.wait()
+
+    def close(self) -> None:
+        if not self._closed:
+            self._closed = True
+            self._queue.put(None)
+            self._thread.join()
+            for handler in self.handlers:
+                handler.close()
+
+        super().close()
+
+    def _write_loop(self) -> None:
+        stop = False
+        while not stop:
+            items: List[Union[logging.LogRecord, str]] = []
+            written: List[threading.Event] = []
+            item = self._queue.get()
+            while True:
+                if item is None:
+                    stop = True
+                elif isinstance(item, threading.Event):
+                    written.append(item)
+                else:
+                    items.append(item)
+
+                if stop or len(items) >= self._batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+
+            # The records between the direct stdout outputs are written at once.
+            records: List[logging.LogRecord] = []
+            for item in items:
+                if isinstance(item, str):
+                    self._write(records)
+                    records = []
+                    self._write_stdout(item)
+                else:
+                    records.append(item)
+            self._write(records)
+            for event in written:
+                event.set()
+
+    @staticmethod
+    def _write_stdout(text: str) -> None:
+        try:
+            sys.stdout.write(text)
+            sys.stdout.flush()
+        except Exception:  # pylint: disable=broad-except
+            # The writer thread should not stop on errors, like the handlers do not raise them.
+            pass
+
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        if not records:
+            return
+        for handler in self.handlers:
+            accepted = [record for record in records
+                        if record.levelno >= handler.level and handler.filter(record)]
+            if not accepted:
+                continue
+
+            if not isinstance(handler, logging.StreamHandler):
+                for record in accepted:
+                    handler.emit(record)
+                continue
+
+            try:
+                text = ''.join(handler.format(record) + handler.terminator for record in accepted)
+                handler.acquire()
+                try:
+                    handler.stream.write(text)
+                    handler.flush()
+                finally:
+                    handler.release()
+            except Exception:  # pylint: disable=broad-except
+                handler.handleError(accepted[0])
+
+
 class LogHandler:
 
     def __init__(self,
@@ -276,16 +432,27 @@ class LogHandler:
 
 class Log:
 
-    def __init__(self, name: str, handlers: List[LogHandler]):
+    def __init__(self, name: str, handlers: List[LogHandler], queued: bool = False):
+        """
+        :param name: name of the logger
+        :param handlers: handlers of the logger
+        :param queued: if True, the records are written by the background thread. See `QueuedHandler`.
+        """
         logger = logging.getLogger(name)
         self._logger = cast(EnhancedLogger, logger)
         self._logger.setLevel(VERBOSE)
 
         if self._logger.hasHandlers():
+            for handler_ in self._logger.handlers:
+                if isinstance(handler_, QueuedHandler):
+                    handler_.close()
             self._logger.handlers.clear()
 
-        for handler in handlers:
-            handler.append_to_logger(self._logger)
+        if queued:
+            self._logger.addHandler(QueuedHandler([handler.handler for handler in handlers]))
+        else:
+            for handler in handlers:
+                handler.append_to_logger(self._logger)
 
     @property
     def logger(self) -> EnhancedLogger:
@@ -299,36 +466,51 @@ class LoggerWriter:
         self.logger = logger
         self.caller = caller
         self.prefix = prefix
-        self.buf = ""
+        # If the logging is queued, the output to stdout is also queued to keep the order with the records.
+        self._queued_handler = next((handler for handler in logger.handlers if isinstance(handler, QueuedHandler)),
+                                    None)
+        # Parts of the incomplete last line
+        self._parts: List[str] = []
 
     def write(self, message: str) -> None:
         # Both remote stderr and stdout are printed to local stdout.
         # For a non-tty stdout, we should not stream the remote (potentially pty) output immediately.
         # The output should be buffered by lines with converted CRs. See `LoggerWriter._log()`.
         if LoggerWriter.stream:
-            sys.stdout.write(message)
+            self._write_stdout(message)
 
         lines = message.split('\n')
-        for line in lines[:-1]:
-            self.buf = self.buf + line
-            self._log()
-        self.buf = self.buf + lines[-1]
+        if len(lines) > 1:
+            self._parts.append(lines[0])
+            lines[0] = ''.join(self._parts)
+            self._parts = []
+            self._log(lines[:-1])
+        if lines[-1]:
+            self._parts.append(lines[-1])
 
     def flush(self, remainder: bool = False) -> None:
-        if remainder and self.buf:
-            self._log()
+        if remainder and self._parts:
+            line = ''.join(self._parts)
+            self._parts = []
+            self._log([line])
 
-    def _log(self) -> None:
-        line = self.buf
+    def _log(self, lines: List[str]) -> None:
         # Algorithms of CR conversion respects the `connections.RemoteRunner.generate_result()`.
         if not LoggerWriter.stream:
-            line = line.rstrip('\r').replace("\r", "\n")
-            sys.stdout.write(line + '\n')
-
-        self.logger.log(logging.DEBUG, line, extra={
-            'real_caller': self.caller, 'prefix': self.prefix, 'ignore_stdout': True
-        })
-        self.buf = ""
+            lines = [line.rstrip('\r').replace("\r", "\n") for line in lines]
+            # All complete lines of the message are printed at once
+            self._write_stdout(''.join(line + '\n' for line in lines))
+
+        for line in lines:
+            self.logger.log(logging.DEBUG, line, extra={
+                'real_caller': self.caller, 'prefix': self.prefix, 'ignore_stdout': True
+            })
+
+    def _write_stdout(self, text: str) -> None:
+        if self._queued_handler is not None:
+            self._queued_handler.write_stdout(text)
+        else:
+            sys.stdout.write(text)
 
     def __repr__(self) -> str:
         return f"LoggerWriter{{DEBUG,stdout}} at {hex(id(self))}"
@@ -406,13 +588,21 @@ def init_log_from_context_args(globals_: dict, context: dict, name: str) -> Log:
         stdout_settings = globals_['logging']['default_targets']['stdout']
         handlers.append(LogHandler(target='stdout', **stdout_settings))
 
-    log = Log(name, handlers)
+    log = Log(name, handlers, queued=args.get('queued_log', False))
 
     log.logger.verbose('Using the following loggers: \n\t%s' % "\n\t".join("- " + str(x) for x in handlers))
 
     return log
 
 
+def flush_handlers(logger: logging.Logger) -> None:
+    """
+    Wait until the handlers of the logger write all the records that are logged by this moment.
+    """
+    for handler in logger.handlers:
+        handler.flush()
+
+
 def caller_info(logger: EnhancedLogger) -> Dict[str, object]:
     """
     Catches and returns invocation metadata of the method that calls caller_info()
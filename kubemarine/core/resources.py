@@ -84,6 +84,9 @@ class DynamicResources:
     def logger_if_initialized(self) -> Optional[log.EnhancedLogger]:
         return self._logger
 
+    def connection_pool_if_initialized(self) -> Optional[ConnectionPool]:
+        return self._connection_pool
+
     def logger(self) -> log.EnhancedLogger:
         if self._logger is None:
             self._logger = self._create_logger()
@@ -0,0 +1,136 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+import random
+import threading
+import time
+from typing import Dict, Iterable, List, Optional
+
+
+class Clock:
+    """
+    Source of the time for the delays between retries and for the soft deadline of independent batches.
+    Tests can use `kubemarine.demo.FakeClock` to check the delays without real waiting.
+    """
+
+    def monotonic(self) -> float:
+        return time.monotonic()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds > 0:
+            time.sleep(seconds)
+
+
+SYSTEM_CLOCK = Clock()
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with decorrelated jitter.
+
+    The first delay is `base_delay`. Each next delay is chosen randomly between `base_delay`
+    and the previous delay multiplied by `multiplier`, and is limited by `max_delay`.
+    Without jitter, each next delay is exactly the previous delay multiplied by `multiplier`.
+    """
+
+    def __init__(self, base_delay: float, max_delay: float = None, *,
+                 multiplier: float = 3, jitter: bool = True, seed: int = None):
+        if max_delay is None:
+            max_delay = base_delay
+        if base_delay < 0 or max_delay < base_delay:
+            raise ValueError(f"Invalid delays of the retry policy: base {base_delay}, max {max_delay}")
+        if multiplier < 1:
+            raise ValueError(f"Multiplier of the retry policy should be at least 1, got {multiplier}")
+
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def from_config(config: dict) -> 'RetryPolicy':
+        """
+        Create the policy from the section of globals with `delay_period` and optional `max_delay_period`.
+        """
+        base_delay = config['delay_period']
+        return RetryPolicy(base_delay, max(config.get('max_delay_period', base_delay), base_delay))
+
+    def next_delay(self, previous: Optional[float]) -> float:
+        """
+        :param previous: previous delay, or None for the first retry
+        :return: delay in seconds before the next retry
+        """
+        if previous is None:
+            return self.base_delay
+
+        upper = max(previous * self.multiplier, self.base_delay)
+        if self.jitter:
+            with self._lock:
+                delay = self._random.uniform(self.base_delay, upper)
+        else:
+            delay = upper
+
+        return min(delay, self.max_delay)
+
+
+class Backoff:
+    """
+    Independent timers of the retries for each host.
+    The delays for each host grow according to the `RetryPolicy` until the timer of the host is reset.
+    """
+
+    def __init__(self, policy: RetryPolicy, clock: Clock = SYSTEM_CLOCK):
+        self.policy = policy
+        self.clock = clock
+        self._delays: Dict[str, float] = {}
+        self._deadlines: Dict[str, float] = {}
+
+    def schedule(self, host: str) -> float:
+        """
+        Schedule the next retry for the host.
+
+        :return: delay in seconds before the retry
+        """
+        delay = self._delays[host] = self.policy.next_delay(self._delays.get(host))
+        self._deadlines[host] = self.clock.monotonic() + delay
+        return delay
+
+    def reset(self, host: str) -> None:
+        self._delays.pop(host, None)
+        self._deadlines.pop(host, None)
+
+    def remaining(self, host: str) -> float:
+        deadline = self._deadlines.get(host)
+        if deadline is None:
+            return 0
+
+        return max(deadline - self.clock.monotonic(), 0)
+
+    def ready(self, hosts: Iterable[str]) -> List[str]:
+        """
+        :return: hosts whose retry can be performed now
+        """
+        return [host for host in hosts if self.remaining(host) == 0]
+
+    def wait(self, hosts: Iterable[str], timeout: float = None) -> None:
+        """
+        Sleep until the retry of at least one of the hosts can be performed, but not longer than `timeout`.
+        """
+        delay = min((self.remaining(host) for host in hosts), default=0)
+        if timeout is not None:
+            delay = min(delay, timeout)
+
+        self.clock.sleep(delay)
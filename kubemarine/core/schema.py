@@ -12,16 +12,19 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import pathlib
+import threading
 import urllib.request
 import urllib.error
 from collections.abc import Hashable
 from textwrap import dedent
-from typing import List, Dict, Union, cast
+from typing import List, Dict, Union, cast, Optional, Tuple
 
 import jsonschema
 import referencing
 import referencing.exceptions
+import referencing.jsonschema
 import referencing.retrieval
 from ordered_set import OrderedSet
 
@@ -63,15 +66,7 @@ def _verify_inventory_by_schema(cluster: KubernetesCluster, inventory: dict, sch
                      else f" for procedure '{schema_name}'")
 
     root_schema_resource = f'resources/schemas/{schema_name}.json'
-    root_schema_path = utils.get_internal_resource_path(root_schema_resource)
-    root_schema = pathlib.Path(root_schema_path)
-    if not root_schema.exists():
-        raise Exception(f"Failed to find schema to validate the inventory file{for_procedure}.")
-
-    root_schema_uri = root_schema.as_uri()
-
-    registry = referencing.Registry(retrieve=retrieve_uri_filesystem)  # type: ignore[call-arg, var-annotated]
-    validator = jsonschema.Draft7Validator({"$ref": root_schema_uri}, registry=registry)
+    root_schema_uri, validator = _VALIDATORS.get(schema_name, for_procedure)
 
     errs = list(validator.iter_errors(inventory))
     if not errs:
@@ -102,6 +97,96 @@ def _verify_inventory_by_schema(cluster: KubernetesCluster, inventory: dict, sch
     raise errors.FailException(msg, hint=hint)
 
 
+class _ValidatorRegistry:
+    """
+    Process-wide registry of compiled validators.
+
+    All JSON schemas are loaded and crawled once in a single `referencing.Registry`,
+    and a validator is created only once for each root schema.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._registry: Optional[referencing.Registry] = None
+        self._validators: Dict[str, Tuple[str, jsonschema.Draft7Validator]] = {}
+
+    def get(self, schema_name: str, for_procedure: str = '') -> Tuple[str, jsonschema.Draft7Validator]:
+        """
+        Get URI of the root schema and the validator for it.
+
+        :param schema_name: relative path to the root schema in `resources/schemas` without `.json` extension
+        :param for_procedure: suffix of the error message if the schema is not found
+        :return: pair of the root schema URI and the validator
+        """
+        with self._lock:
+            cached = self._validators.get(schema_name)
+            if cached is not None:
+                return cached
+
+            root_schema = pathlib.Path(_get_schemas_directory(), f'{schema_name}.json')
+            if not root_schema.exists():
+                raise Exception(f"Failed to find schema to validate the inventory file{for_procedure}.")
+
+            if self._registry is None:
+                self._registry = _create_registry()
+
+            root_schema_uri = root_schema.as_uri()
+            validator = jsonschema.Draft7Validator({"$ref": root_schema_uri}, registry=self._registry)
+            self._validators[schema_name] = cached = (root_schema_uri, validator)
+            return cached
+
+    def clear(self) -> None:
+        with self._lock:
+            self._registry = None
+            self._validators.clear()
+
+
+_VALIDATORS = _ValidatorRegistry()
+
+
+def _get_schemas_directory() -> str:
+    return utils.get_internal_resource_path('resources/schemas')
+
+
+def _create_registry() -> referencing.Registry:
+    schemas_dir = pathlib.Path(_get_schemas_directory())
+    resources = [
+        (schemas_dir.joinpath(relpath).as_uri(),
+         referencing.Resource.from_contents(contents, default_specification=referencing.jsonschema.DRAFT7))
+        for relpath, contents in _load_schemas_bundle().items()
+    ]
+
+    # Preserve on-demand retrieval in case some schema is not preloaded, e.g. is added after the bundle is persisted.
+    registry = referencing.Registry(retrieve=retrieve_uri_filesystem)  # type: ignore[call-arg, var-annotated]
+    return registry.with_resources(resources).crawl()
+
+
+def _load_schemas_bundle() -> Dict[str, dict]:
+    """
+    Load all JSON schemas either from the persisted bundle if the cache directory is configured,
+    or from the separate files.
+
+    :return: mapping of schema path relative to `resources/schemas` to the schema contents
+    """
+    cache_filename = f'schemas-{utils.get_version()}.json'
+    cached = utils.load_cache(cache_filename)
+    if cached is not None:
+        try:
+            bundle: Dict[str, dict] = json.loads(cached)
+            return bundle
+        except ValueError:
+            pass
+
+    schemas_dir = pathlib.Path(_get_schemas_directory())
+    bundle = {}
+    for path in sorted(schemas_dir.rglob('*.json')):
+        with open(path, encoding='utf-8') as f:
+            bundle[path.relative_to(schemas_dir).as_posix()] = json.load(f)
+
+    utils.save_cache(cache_filename, json.dumps(bundle).encode('utf-8'))
+    return bundle
+
+
 @referencing.retrieval.to_cached_resource()  # type: ignore[arg-type]
 def retrieve_uri_filesystem(uri: str) -> str:
     try:
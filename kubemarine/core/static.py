@@ -12,18 +12,26 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from kubemarine.core import utils
+import marshal
+import os
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
 
+from kubemarine.core import utils
 
-def reload() -> None:
-    GLOBALS.clear()
-    GLOBALS.update(_load_globals())
+_COMPATIBILITY_MAPS = ('kubernetes_images.yaml', 'packages.yaml', 'plugins.yaml', 'thirdparties.yaml')
 
-    DEFAULTS.clear()
-    DEFAULTS.update(_load_defaults())
 
-    KUBERNETES_VERSIONS.clear()
-    KUBERNETES_VERSIONS.update(load_kubernetes_versions())
+def reload() -> None:
+    """
+    Reload the already loaded resources in place. Not yet loaded resources are loaded on first access.
+    """
+    with _LOCK:
+        for name in _RESOURCES:
+            resource: Optional[dict] = globals().get(name)
+            if resource is not None:
+                resource.clear()
+                resource.update(_load(name))
 
 
 def load_compatibility_map(filename: str) -> dict:
@@ -42,7 +50,7 @@ def _load_globals() -> dict:
     globals_ = utils.load_yaml(
         utils.get_internal_resource_path('resources/configurations/globals.yaml'))
 
-    for config_filename in ('kubernetes_images.yaml', 'packages.yaml', 'plugins.yaml', 'thirdparties.yaml'):
+    for config_filename in _COMPATIBILITY_MAPS:
         internal_compatibility = load_compatibility_map(config_filename)
 
         globals_compatibility = globals_['compatibility_map']['software']
@@ -60,8 +68,81 @@ def _load_defaults() -> dict:
         utils.get_internal_resource_path('resources/configurations/defaults.yaml'))
 
 
-GLOBALS: dict = {}
-DEFAULTS: dict = {}
-KUBERNETES_VERSIONS: dict = {}
-
-reload()
+def _load(name: str) -> dict:
+    """
+    Load the resource, and use the persisted cache if it is configured and is up-to-date with the resource files.
+    """
+    loader, sources = _RESOURCES[name]
+    # Late binding allows to mock loaders in tests
+    load: Callable[[], dict] = globals()[loader]
+    if not os.environ.get(utils.CACHE_DIR_ENV):
+        return load()
+
+    stamp = (_get_sources_stamp(sources), _get_loader_stamp())
+    cache_filename = f"{name.lower()}-{utils.get_version()}.marshal"
+    cached = utils.load_cache(cache_filename)
+    if cached is not None:
+        try:
+            cached_stamp, cached_data = marshal.loads(cached)
+            if cached_stamp == stamp and isinstance(cached_data, dict):
+                return cached_data
+        except (ValueError, EOFError, TypeError):
+            pass
+
+    data = load()
+    try:
+        utils.save_cache(cache_filename, marshal.dumps((stamp, data)))
+    except ValueError:
+        # Resource contains objects that are not supported by marshal, for example, dates.
+        pass
+
+    return data
+
+
+def _get_sources_stamp(sources: List[str]) -> List[Tuple[str, int, int]]:
+    stamp = []
+    for source in sources:
+        stat = os.stat(utils.get_internal_resource_path(source))
+        stamp.append((source, stat.st_mtime_ns, stat.st_size))
+
+    return stamp
+
+
+def _get_loader_stamp() -> List[str]:
+    """
+    The resources are parsed differently if the implicit resolvers of the loader are patched,
+    for example, by `kubemarine.__main__`. Patterns of the resolvers are taken into account in the cache stamp.
+    """
+    resolvers = utils.SafeLoader.yaml_implicit_resolvers
+    return sorted({regexp.pattern for first_char_resolvers in resolvers.values() for _, regexp in first_char_resolvers})
+
+
+def __getattr__(name: str) -> dict:
+    if name not in _RESOURCES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    with _LOCK:
+        resource: Optional[dict] = globals().get(name)
+        if resource is None:
+            resource = globals()[name] = _load(name)
+
+        return resource
+
+
+# Resources are loaded lazily on first access of the module attribute. See __getattr__
+GLOBALS: dict
+DEFAULTS: dict
+KUBERNETES_VERSIONS: dict
+
+_RESOURCES: Dict[str, Tuple[str, List[str]]] = {
+    'GLOBALS': ('_load_globals', [
+        'resources/configurations/globals.yaml',
+        *(f'resources/configurations/compatibility/internal/{filename}' for filename in _COMPATIBILITY_MAPS)
+    ]),
+    'DEFAULTS': ('_load_defaults', ['resources/configurations/defaults.yaml']),
+    'KUBERNETES_VERSIONS': ('load_kubernetes_versions', [
+        'resources/configurations/compatibility/kubernetes_versions.yaml'
+    ]),
+}
+
+_LOCK = threading.RLock()
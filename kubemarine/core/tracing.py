@@ -0,0 +1,318 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""
+Optional tracing of the procedure execution.
+
+The tracing is disabled by default, and then every instrumented place costs only one check of the module global.
+If enabled using `--trace`, the spans of tasks, executor batches, remote commands on each host, file transfers,
+and Kubernetes waits are recorded, and are written to the dump directory
+in Chrome trace format (`trace.json`) and in OTLP JSON format (`trace.otlp.json`).
+"""
+
+import functools
+import itertools
+import json
+import os
+import threading
+import time
+from types import TracebackType
+from typing import Optional, Dict, Any, List, Callable, TypeVar, Type, cast
+
+from kubemarine.core import utils
+
+CHROME_TRACE_FILENAME = 'trace.json'
+OTLP_TRACE_FILENAME = 'trace.otlp.json'
+
+_F = TypeVar('_F', bound=Callable[..., Any])
+
+
+class Span:
+    __slots__ = ('name', 'category', 'attributes', 'span_id', 'parent_id', 'thread_id', 'start_ns', 'end_ns', 'error')
+
+    def __init__(self, name: str, category: str, attributes: Dict[str, Any],
+                 span_id: int, parent_id: Optional[int]):
+        self.name = name
+        self.category = category
+        self.attributes = attributes
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.thread_id = threading.get_ident()
+        self.start_ns = time.perf_counter_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class _NoopSpan(Span):
+    # pylint: disable=super-init-not-called
+
+    def __init__(self) -> None:
+        pass
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def __enter__(self) -> Span:
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 tb: Optional[TracebackType]) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Tracer:
+    def __init__(self) -> None:
+        self.trace_id = os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._local = threading.local()
+        # Spans are measured using monotonic clock, and are converted to wall time only on export.
+        self._epoch_offset_ns = time.time_ns() - time.perf_counter_ns()
+
+    def current_span(self) -> Optional[Span]:
+        stack: List[Span] = getattr(self._local, 'stack', [])
+        return stack[-1] if stack else None
+
+    def start_span(self, name: str, category: str, attributes: Dict[str, Any], parent: Optional[Span]) -> Span:
+        if parent is None:
+            parent = self.current_span()
+        with self._lock:
+            span_id = next(self._ids)
+        span = Span(name, category, attributes, span_id, parent.span_id if parent is not None else None)
+        self._local.__dict__.setdefault('stack', []).append(span)
+        return span
+
+    def end_span(self, span: Span, exc_value: Optional[BaseException]) -> None:
+        span.end_ns = time.perf_counter_ns()
+        if exc_value is not None:
+            span.error = type(exc_value).__name__
+
+        stack: List[Span] = self._local.stack
+        if stack and stack[-1] is span:
+            stack.pop()
+        with self._lock:
+            self.spans.append(span)
+
+    def to_wall_ns(self, perf_counter_ns: int) -> int:
+        return perf_counter_ns + self._epoch_offset_ns
+
+
+class _SpanContext:
+    __slots__ = ('_tracer', '_name', '_category', '_attributes', '_parent', '_span')
+
+    def __init__(self, tracer: Tracer, name: str, category: str, attributes: Dict[str, Any], parent: Optional[Span]):
+        self._tracer = tracer
+        self._name = name
+        self._category = category
+        self._attributes = attributes
+        self._parent = parent
+        self._span: Optional[Span] = None
+
+    def __enter__(self) -> Span:
+        span = self._tracer.start_span(self._name, self._category, self._attributes, self._parent)
+        self._span = span
+        return span
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_value: Optional[BaseException],
+                 tb: Optional[TracebackType]) -> None:
+        self._tracer.end_span(cast(Span, self._span), exc_value)
+
+
+_TRACER: Optional[Tracer] = None
+
+
+def enabled() -> bool:
+    return _TRACER is not None
+
+
+def start() -> Tracer:
+    """
+    Enable tracing. All spans that are recorded until `stop()` is called belong to the returned tracer.
+    """
+    global _TRACER  # pylint: disable=global-statement
+    _TRACER = Tracer()
+    return _TRACER
+
+
+def stop() -> Optional[Tracer]:
+    """
+    Disable tracing.
+
+    :return: the tracer with the recorded spans, if tracing was enabled.
+    """
+    global _TRACER  # pylint: disable=global-statement
+    tracer, _TRACER = _TRACER, None
+    return tracer
+
+
+def span(name: str, category: str, *, parent: Span = None, **attributes: Any) -> Any:
+    """
+    Context manager that records span of the enclosed code, if tracing is enabled.
+
+    :param name: name of the span
+    :param category: category of the span, for example, 'task' or 'executor'
+    :param parent: explicit parent span. By default, the innermost span opened in the current thread is the parent.
+    :param attributes: additional attributes of the span
+    :return: context manager that returns the `Span` on enter
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return _NOOP_SPAN
+
+    return _SpanContext(tracer, name, category, attributes, parent)
+
+
+def current_span() -> Optional[Span]:
+    tracer = _TRACER
+    return tracer.current_span() if tracer is not None else None
+
+
+def traced(category: str) -> Callable[[_F], _F]:
+    """
+    Decorator that records span of each call of the function, if tracing is enabled.
+    """
+    def decorator(func: _F) -> _F:
+        name = f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            tracer = _TRACER
+            if tracer is None:
+                return func(*args, **kwargs)
+
+            with _SpanContext(tracer, name, category, {}, None):
+                return func(*args, **kwargs)
+
+        return cast(_F, wrapper)
+
+    return decorator
+
+
+def wrap(func: _F, name: str, category: str, *, parent: Optional[Span], **attributes: Any) -> _F:
+    """
+    Wrap the function so that its call is recorded as a span with the explicit parent.
+    This is intended for calls that are submitted to another thread.
+    The function is returned as is if tracing is disabled.
+    """
+    tracer = _TRACER
+    if tracer is None:
+        return func
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with _SpanContext(tracer, name, category, attributes, parent):
+            return func(*args, **kwargs)
+
+    return cast(_F, wrapper)
+
+
+def to_chrome_trace(tracer: Tracer) -> dict:
+    """
+    Convert the recorded spans to the Chrome trace event format,
+    that can be opened in chrome://tracing or https://ui.perfetto.dev.
+    Spans related to the particular host are shown in the separate row of the host.
+    """
+    lanes: Dict[Any, int] = {}
+    events: List[dict] = []
+    for span_ in sorted(tracer.spans, key=lambda s: s.start_ns):
+        lane_key = span_.attributes.get('host', span_.thread_id)
+        tid = lanes.get(lane_key)
+        if tid is None:
+            tid = lanes[lane_key] = len(lanes) + 1
+            lane_name = lane_key if 'host' in span_.attributes else f"thread-{tid}"
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': lane_name}})
+
+        args = {k: _to_json_value(v) for k, v in span_.attributes.items()}
+        if span_.error is not None:
+            args['error'] = span_.error
+        end_ns = span_.end_ns if span_.end_ns is not None else span_.start_ns
+        events.append({
+            'name': span_.name,
+            'cat': span_.category,
+            'ph': 'X',
+            'ts': tracer.to_wall_ns(span_.start_ns) / 1000,
+            'dur': (end_ns - span_.start_ns) / 1000,
+            'pid': 1,
+            'tid': tid,
+            'args': args,
+        })
+
+    return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+
+def to_otlp(tracer: Tracer) -> dict:
+    """
+    Convert the recorded spans to the OTLP JSON format of the OpenTelemetry protocol,
+    that can be sent to the `/v1/traces` endpoint of the OpenTelemetry collector.
+    """
+    spans = []
+    for span_ in tracer.spans:
+        end_ns = span_.end_ns if span_.end_ns is not None else span_.start_ns
+        otlp_span: Dict[str, Any] = {
+            'traceId': tracer.trace_id,
+            'spanId': f"{span_.span_id:016x}",
+            'name': span_.name,
+            # SPAN_KIND_INTERNAL
+            'kind': 1,
+            'startTimeUnixNano': str(tracer.to_wall_ns(span_.start_ns)),
+            'endTimeUnixNano': str(tracer.to_wall_ns(end_ns)),
+            'attributes': [_to_otlp_attribute('category', span_.category)]
+                          + [_to_otlp_attribute(k, v) for k, v in span_.attributes.items()],
+            # STATUS_CODE_OK or STATUS_CODE_ERROR
+            'status': {'code': 1} if span_.error is None else {'code': 2, 'message': span_.error},
+        }
+        if span_.parent_id is not None:
+            otlp_span['parentSpanId'] = f"{span_.parent_id:016x}"
+        spans.append(otlp_span)
+
+    return {
+        'resourceSpans': [{
+            'resource': {'attributes': [_to_otlp_attribute('service.name', 'kubemarine')]},
+            'scopeSpans': [{'scope': {'name': 'kubemarine'}, 'spans': spans}],
+        }]
+    }
+
+
+def _to_json_value(value: Any) -> Any:
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def _to_otlp_attribute(key: str, value: Any) -> dict:
+    if isinstance(value, bool):
+        otlp_value: Dict[str, Any] = {'boolValue': value}
+    elif isinstance(value, int):
+        otlp_value = {'intValue': str(value)}
+    elif isinstance(value, float):
+        otlp_value = {'doubleValue': value}
+    else:
+        otlp_value = {'stringValue': str(value)}
+
+    return {'key': key, 'value': otlp_value}
+
+
+def dump(context: dict, tracer: Tracer) -> None:
+    """
+    Write the recorded spans to the dump directory.
+    """
+    utils.dump_file(context, json.dumps(to_chrome_trace(tracer)), CHROME_TRACE_FILENAME)
+    utils.dump_file(context, json.dumps(to_otlp(tracer)), OTLP_TRACE_FILENAME)
@@ -16,6 +16,7 @@ import hashlib
 import io
 import ipaddress
 import json
+import math
 import os
 import re
 import shutil
@@ -27,7 +28,9 @@ from collections import OrderedDict
 from copy import deepcopy
 from datetime import datetime
 
-from typing import Tuple, Callable, List, TextIO, cast, Union, Dict, Sequence, Optional, NoReturn, BinaryIO
+from typing import (
+    Tuple, Callable, List, TextIO, cast, Union, Dict, Sequence, Optional, NoReturn, BinaryIO, Any, IO, Type
+)
 
 import deepdiff  # type: ignore[import-untyped]
 import yaml
@@ -47,6 +50,8 @@ def do_fail(message: str = '', reason: BaseException = None, hint: str = '', log
         sys.stderr.write("\033[91m")
 
     pretty_print_error(message, reason, logger)
+    if logger:
+        log.flush_handlers(logger)
 
     # Please do not rewrite this to logging approach:
     # hint should be visible only in stdout and without special formatting
@@ -70,7 +75,8 @@ def get_elapsed_string(start: float, end: float) -> str:
 def prepare_dump_directory(context: dict) -> None:
     args: dict = context['execution_arguments']
     location = args['dump_location']
-    reset_directory = not args['disable_dump_cleanup']
+    # Resumed procedure needs the checkpoints of the previous run
+    reset_directory = not args['disable_dump_cleanup'] and not args.get('resume', False)
     dumpdir = os.path.join(location, 'dump')
     if reset_directory and os.path.exists(dumpdir) and os.path.isdir(dumpdir):
         shutil.rmtree(dumpdir)
@@ -192,7 +198,7 @@ def is_dump_allowed(context: dict, filename: str) -> bool:
 
 
 def dump_file(context: Union[dict, object], data: Union[TextIO, str], filename: str,
-              *, dump_location: bool = True) -> None:
+              *, dump_location: bool = True, atomic: bool = False) -> None:
     if dump_location:
         if not isinstance(context, dict):
             # cluster is passed instead of the context directly
@@ -219,8 +225,12 @@ def dump_file(context: Union[dict, object], data: Union[TextIO, str], filename:
     else:
         text = data.read()
 
-    with open_utf8(target_path, 'w') as file:
+    # Readers of the file written atomically see either previous or new content, even if the process is terminated.
+    write_path = target_path + '.tmp' if atomic else target_path
+    with open_utf8(write_path, 'w') as file:
         file.write(text)
+    if atomic:
+        os.replace(write_path, target_path)
 
 
 def get_dump_directory(context: dict) -> str:
@@ -349,6 +359,24 @@ def get_remote_tmp_path(filename: str = None, ext: str = None) -> str:
     return "/tmp/" + filename
 
 
+SafeLoader: Type[yaml.SafeLoader] = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+"""
+C-accelerated safe YAML loader if libyaml is available.
+"""
+
+
+def yaml_safe_load(stream: Union[str, IO]) -> Any:
+    """
+    Parse YAML or JSON to native python objects using the C-accelerated loader if possible.
+    Should be used to load read-only data, such as internal resources and output of remote commands.
+    If the structure should be preserved to be dumped back, use `yaml_structure_preserver`.
+    """
+    if isinstance(stream, str):
+        # C-accelerated loader does not accept subclasses of str, for example, ruamel scalar strings.
+        stream = str(stream)
+    return yaml.load(stream, Loader=SafeLoader)
+
+
 def yaml_structure_preserver() -> ruamel.yaml.YAML:
     """YAML loader and dumper which saves original structure"""
     ruamel_yaml = ruamel.yaml.YAML()
@@ -381,7 +409,7 @@ def convert_native_yaml(data: dict) -> dict:
     if isinstance(data, CommentedMap):
         buf = io.StringIO()
         yaml_structure_preserver().dump(data, buf)
-        data = yaml.safe_load(io.StringIO(buf.getvalue()))
+        data = yaml_safe_load(io.StringIO(buf.getvalue()))
 
     return data
 
@@ -449,7 +477,7 @@ def insert_map_sorted(map_: CommentedMap, k: str, v: object, key: Callable[[str]
 def load_yaml(filepath: str) -> dict:
     try:
         with open_utf8(filepath, 'r') as stream:
-            data: dict = yaml.safe_load(stream)
+            data: dict = yaml_safe_load(stream)
             return data
     except yaml.YAMLError as exc:
         do_fail(f"Failed to load {filepath}", exc)
@@ -486,10 +514,26 @@ def strtoint(value: Union[str, int]) -> int:
         raise ValueError(f"invalid integer value {value!r}") from None
 
 
+def percentile(values: Sequence[float], percent: float) -> float:
+    """
+    Calculate percentile of the values using the nearest-rank method.
+
+    :param values: non-empty sequence of values
+    :param percent: percentile in range (0, 100]
+    :return: the smallest value such that at least the given percent of the values are less or equal to it
+    """
+    if not values:
+        raise ValueError("At least one value should be present")
+
+    ordered = sorted(values)
+    rank = max(1, math.ceil(percent / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
 def print_diff(logger: log.EnhancedLogger, diff: deepdiff.DeepDiff) -> None:
     # Extra transformation to JSON is necessary,
     # because DeepDiff.to_dict() returns custom nested classes that cannot be serialized to yaml by default.
-    logger.debug(yaml.safe_dump(yaml.safe_load(diff.to_json())))
+    logger.debug(yaml.safe_dump(yaml_safe_load(diff.to_json())))
 
 
 def get_unified_diff(old: str, new: str, fromfile: str = '', tofile: str = '') -> Optional[str]:
@@ -505,7 +549,7 @@ def get_unified_diff(old: str, new: str, fromfile: str = '', tofile: str = '') -
 
 
 def get_yaml_diff(old: str, new: str, fromfile: str = '', tofile: str = '') -> Optional[str]:
-    if yaml.safe_load(old) == yaml.safe_load(new):
+    if yaml_safe_load(old) == yaml_safe_load(new):
         return None
 
     return get_unified_diff(old, new, fromfile, tofile)
@@ -515,6 +559,54 @@ def isipv(address: str, versions: List[int]) -> bool:
     return ipaddress.ip_network(address).version in versions
 
 
+CACHE_DIR_ENV = 'KUBEMARINE_CACHE_DIR'
+"""
+Optional directory to persist caches of parsed internal resources to.
+The caches are keyed by the Kubemarine version, and are reused by the subsequent runs.
+"""
+
+
+def load_cache(filename: str) -> Optional[bytes]:
+    """
+    Read the cache file from the directory specified by `KUBEMARINE_CACHE_DIR` environment variable.
+
+    :param filename: name of the cache file
+    :return: content of the file, or None if the cache directory is not configured, or the file cannot be read.
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+
+    try:
+        with open(os.path.join(cache_dir, filename), 'rb') as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+def save_cache(filename: str, data: bytes) -> None:
+    """
+    Atomically write the cache file to the directory specified by `KUBEMARINE_CACHE_DIR` environment variable.
+    Does nothing if the directory is not configured. Failures to write are ignored, as the cache is an optimization only.
+
+    :param filename: name of the cache file
+    :param data: content of the file
+    """
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return
+
+    path = os.path.join(cache_dir, filename)
+    tmp_path = f'{path}.{os.getpid()}.tmp'
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except OSError:
+        pass
+
+
 def get_version_filepath() -> str:
     return get_internal_resource_path("version")
 
@@ -11,9 +11,8 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
-from typing import Tuple, Optional
-
-from deepmerge import Merger  # type: ignore[import-untyped]
+from copy import deepcopy
+from typing import Tuple, Optional, Any, Dict, List
 
 
 def is_list_extends(nxt: list, path: list) -> bool:
@@ -35,38 +34,125 @@ def get_strategy_position(nxt: list, path: list) -> Tuple[Optional[str], int]:
     return strategy, strategy_definition_position
 
 
-def list_merger(_: Merger, path: list, base: list, nxt: list) -> list:
-    strategy, strategy_definition_position = get_strategy_position(nxt, path)
+class YamlMerger:
+    """
+    Deep merger of the YAML-like structures.
+
+    Dictionaries are merged recursively, lists are either overridden,
+    or merged according to the `<<: merge` and `<<: replace` strategy definitions,
+    and all other values are overridden.
+    """
+
+    def __init__(self, extend_lists: bool):
+        self._extend_lists = extend_lists
+
+    def merge(self, base: Any, nxt: Any) -> Any:
+        """
+        Merge `nxt` into `base`. Dictionaries of `base` are updated in place,
+        while the values of `nxt` are inserted into the result without copying.
+
+        :param base: structure to merge into
+        :param nxt: structure to merge
+        :return: merged structure. It is `base` if both structures are dictionaries.
+        """
+        return self._merge(base, nxt, [])
+
+    def merge_copy(self, base: Any, nxt: Any) -> Any:
+        """
+        Merge `nxt` into a copy of `base`. In contrast to the deep copying of `base` followed by `merge`,
+        only those parts of `base` that are not overridden by `nxt` are copied.
+        The values of `nxt` are inserted into the result without copying.
+
+        :param base: structure to merge. It is not changed.
+        :param nxt: structure to merge
+        :return: merged structure
+        """
+        return self._merge_copy(base, nxt, [], {})
+
+    def _merge(self, base: Any, nxt: Any, path: List[Any]) -> Any:
+        if isinstance(base, dict) and isinstance(nxt, dict):
+            for k, v in nxt.items():
+                if k in base:
+                    path.append(k)
+                    base[k] = self._merge(base[k], v, path)
+                    path.pop()
+                else:
+                    base[k] = v
+            return base
+
+        if isinstance(base, list) and isinstance(nxt, list):
+            return self._merge_lists(base, nxt, path, None)
 
-    if strategy is None:
         return nxt
 
-    elements_after = nxt[(strategy_definition_position + 1):]
-    elements_before = nxt[:strategy_definition_position]
-    # do not modify source list
-    nxt = []
-    nxt.extend(elements_before)
-    if strategy == 'merge':
-        nxt.extend(base)
-    nxt.extend(elements_after)
-
-    return nxt
-
-
-default_merger: Merger = Merger(
-    [
-        (list, [list_merger]),
-        (dict, ["merge"])
-    ],
-    ["override"],
-    ["override"]
-)
-
-override_merger: Merger = Merger(
-    [
-        (list, ["override"]),
-        (dict, ["merge"])
-    ],
-    ["override"],
-    ["override"]
-)
+    def _merge_copy(self, base: Any, nxt: Any, path: List[Any], memo: Dict[int, Any]) -> Any:
+        if isinstance(base, dict) and isinstance(nxt, dict):
+            if type(base) is not dict:  # pylint: disable=unidiomatic-typecheck
+                # Preserve specific dictionary types, for example, the ruamel.yaml ones
+                return self._merge(deepcopy(base, memo), nxt, path)
+
+            result = {}
+            for k, v in base.items():
+                if k in nxt:
+                    path.append(k)
+                    result[k] = self._merge_copy(v, nxt[k], path, memo)
+                    path.pop()
+                else:
+                    result[k] = _copy(v, memo)
+            for k, v in nxt.items():
+                if k not in base:
+                    result[k] = v
+            return result
+
+        if isinstance(base, list) and isinstance(nxt, list):
+            return self._merge_lists(base, nxt, path, memo)
+
+        return nxt
+
+    def _merge_lists(self, base: list, nxt: list, path: List[Any], memo: Optional[Dict[int, Any]]) -> list:
+        if not self._extend_lists:
+            return nxt
+
+        strategy, strategy_definition_position = get_strategy_position(nxt, list(path))
+        if strategy is None:
+            return nxt
+
+        # do not modify source list
+        merged = nxt[:strategy_definition_position]
+        if strategy == 'merge':
+            merged.extend(base if memo is None else _copy(base, memo))
+        merged.extend(nxt[(strategy_definition_position + 1):])
+
+        return merged
+
+
+def _copy(value: Any, memo: Dict[int, Any]) -> Any:
+    """
+    Deep copy of the structure that consists of plain dictionaries, lists, and immutable values.
+    Works much faster than `copy.deepcopy`, and similarly preserves the shared references inside the structure.
+    """
+    value_type = type(value)
+    if value_type is dict:
+        copied = memo.get(id(value))
+        if copied is None:
+            copied = memo[id(value)] = {}
+            for k, v in value.items():
+                copied[k] = _copy(v, memo)
+        return copied
+
+    if value_type is list:
+        copied = memo.get(id(value))
+        if copied is None:
+            copied = memo[id(value)] = []
+            copied.extend(_copy(v, memo) for v in value)
+        return copied
+
+    if isinstance(value, (dict, list, set)):
+        return deepcopy(value, memo)
+
+    return value
+
+
+default_merger = YamlMerger(extend_lists=True)
+
+override_merger = YamlMerger(extend_lists=False)
@@ -138,45 +138,100 @@ def calculate_sandbox_image_upgrade_required(cluster: KubernetesCluster) -> None
 
 
 def fetch_containerd_config(group: NodeGroup) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    Fetch and parse containerd config.toml and hosts.toml of all registries from the nodes.
+
+    Content hashes are collected from all nodes first, and only one file per distinct hash is downloaded and parsed.
+    Nodes with identical configuration share the same parsed objects, that should be considered read-only.
+
+    :param group: nodes to fetch the configuration from
+    :return: pair of mappings host -> parsed config.toml, and host -> registry -> parsed hosts.toml
+    """
     cluster = group.cluster
+    config_locations = {host: cluster.get_package_association_for_node(host, 'containerd', 'config_location')
+                        for host in group.get_hosts()}
+
     collector = CollectorCallback(cluster)
     with group.new_executor() as exe:
         for node in exe.group.get_ordered_members_list():
-            config_location = cluster.get_package_association_for_node(node.get_host(),
-                                                                       'containerd', 'config_location')
-            node.sudo(f'cat {config_location}', callback=collector)
+            node.sudo(f'sha256sum {config_locations[node.get_host()]}', callback=collector)
 
-    containerd_config = {host: toml.loads(config_string.stdout)
-                         for host, config_string in collector.result.items()}
+    config_hashes = {host: result.stdout.split()[0] for host, result in collector.result.items()}
 
-    collector = CollectorCallback(cluster)
+    config_representatives: Dict[str, str] = {}
+    for host in group.get_hosts():
+        config_representatives.setdefault(config_hashes[host], host)
+
+    config_collector = CollectorCallback(cluster)
     with group.new_executor() as exe:
         for node in exe.group.get_ordered_members_list():
-            config_path = containerd_config[node.get_host()]\
-                .get('plugins', {})\
-                .get('io.containerd.grpc.v1.cri', {}).get('registry', {}).get('config_path')
-            if config_path:
-                node.sudo(f'ls {config_path}', callback=collector)
+            host = node.get_host()
+            if config_representatives[config_hashes[host]] == host:
+                node.sudo(f'cat {config_locations[host]}', callback=config_collector)
 
-    containerd_registries = {host: registries.stdout.split('\n')[:-1]
-                             for host, registries in collector.result.items()}
+    parsed_configs = {config_hashes[host]: toml.loads(config_string.stdout)
+                      for host, config_string in config_collector.result.items()}
+
+    containerd_config = {host: parsed_configs[config_hashes[host]] for host in group.get_hosts()}
 
     collector = CollectorCallback(cluster)
     with group.new_executor() as exe:
         for node in exe.group.get_ordered_members_list():
-            config_path = containerd_config[node.get_host()] \
-                .get('plugins', {}) \
-                .get('io.containerd.grpc.v1.cri', {}).get('registry', {}).get('config_path')
-            for registry in containerd_registries.get(node.get_host(), {}):
-                node.sudo(f'cat {config_path}/{registry}/hosts.toml', callback=collector)
-
-    containerd_reg_config = {host: {containerd_registries[host][i]: toml.loads(reg_host.stdout)
-                                    for i, reg_host in enumerate(reg_hosts)}
-                             for host, reg_hosts in collector.results.items()}
+            config_path = _get_registries_config_path(containerd_config[node.get_host()])
+            if config_path:
+                node.sudo(f'find {config_path} -mindepth 2 -maxdepth 2 -name hosts.toml -exec sha256sum {{}} +',
+                          callback=collector)
+
+    # host -> registry -> (hash, path)
+    registries_hashes: Dict[str, Dict[str, Tuple[str, str]]] = {}
+    for host, result in collector.result.items():
+        config_path = _get_registries_config_path(containerd_config[host]).rstrip('/')
+        registries = registries_hashes[host] = {}
+        for line in result.stdout.splitlines():
+            if not line.strip():
+                continue
+            hash_, path = line.split(maxsplit=1)
+            registry = path[len(config_path) + 1:].split('/')[0]
+            registries[registry] = (hash_, path)
+
+    registries_representatives: Dict[str, Tuple[str, str]] = {}
+    for host, registries in registries_hashes.items():
+        for hash_, path in registries.values():
+            registries_representatives.setdefault(hash_, (host, path))
+
+    fetched_registries: Dict[str, List[str]] = {}
+    collector = CollectorCallback(cluster)
+    with group.new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            host = node.get_host()
+            for hash_, path in registries_hashes.get(host, {}).values():
+                if registries_representatives[hash_] == (host, path):
+                    node.sudo(f'cat {path}', callback=collector)
+                    fetched_registries.setdefault(host, []).append(hash_)
+
+    parsed_registries = {hash_: toml.loads(reg_host.stdout)
+                         for host, reg_hosts in collector.results.items()
+                         for hash_, reg_host in zip(fetched_registries[host], reg_hosts)}
+
+    # Hosts with the same set of registries share the same mapping.
+    registries_mappings: Dict[Tuple[Tuple[str, str], ...], Dict[str, dict]] = {}
+    containerd_reg_config = {}
+    for host, registries in registries_hashes.items():
+        key = tuple(sorted((registry, hash_) for registry, (hash_, _) in registries.items()))
+        if key not in registries_mappings:
+            registries_mappings[key] = {registry: parsed_registries[hash_] for registry, hash_ in key}
+        containerd_reg_config[host] = registries_mappings[key]
 
     return containerd_config, containerd_reg_config
 
 
+def _get_registries_config_path(containerd_config: dict) -> str:
+    config_path: str = containerd_config \
+        .get('plugins', {}) \
+        .get('io.containerd.grpc.v1.cri', {}).get('registry', {}).get('config_path', '')
+    return config_path
+
+
 def install(group: NodeGroup) -> RunnersGroupResult:
     collector = CollectorCallback(group.cluster)
     with group.new_executor() as exe:
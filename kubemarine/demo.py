@@ -22,7 +22,7 @@ import threading
 import time
 from abc import ABC
 from copy import deepcopy
-from typing import List, Dict, Union, Any, Optional, Mapping, Iterable, IO, Tuple, cast, Callable
+from typing import List, Dict, Union, Any, Optional, Mapping, Iterable, IO, Tuple, cast, Callable, Pattern, Sequence
 
 import fabric  # type: ignore[import-untyped]
 import invoke
@@ -32,7 +32,7 @@ from kubemarine import system, procedures
 from kubemarine.core.cluster import (
     KubernetesCluster, _AnyConnectionTypes, EnrichmentStage, EnrichmentFunction, enrichment
 )
-from kubemarine.core import connections, static, errors, utils
+from kubemarine.core import connections, static, errors, utils, retry
 from kubemarine.core.connections import ConnectionPool
 from kubemarine.core.executor import RunnersResult, GenericResult, Token, CommandTimedOut
 from kubemarine.core.group import (
@@ -42,61 +42,164 @@ from kubemarine.core.group import (
 from kubemarine.core.resources import DynamicResources
 
 _ShellResult = Dict[str, Any]
+_ShellArg = Union[str, Pattern[str]]
+_ShellKey = Tuple[str, Tuple[_ShellArg, ...]]
 _ROLE_SPEC = Union[int, List[str]]
 
 
+class _HostShell:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        # Results with exact arguments indexed by the type of the command and the arguments
+        self.results: Dict[_ShellKey, List[_ShellResult]] = {}
+        # Results with arguments that are patterns, in order of adding
+        self.patterns: List[_ShellResult] = []
+        self.history: List[_ShellResult] = []
+        self.history_index: Dict[_ShellKey, List[_ShellResult]] = {}
+
+
 class FakeShell:
+    """
+    Registry of results of fake commands.
+    The results are indexed by host and by the command with its arguments,
+    and each host has its own lock, so that fake commands on different hosts do not wait for each other.
+    """
+
     def __init__(self) -> None:
-        self.results: Dict[str, List[_ShellResult]] = {}
-        self.history: Dict[str, List[_ShellResult]] = {}
+        self._hosts: Dict[str, _HostShell] = {}
         self._lock = threading.Lock()
+        self._sequence = itertools.count()
 
     def reset(self) -> None:
-        self.results = {}
-        self.history = {}
+        with self._lock:
+            self._hosts = {}
 
-    def add(self, results: Mapping[str, GenericResult], do_type: str, args: List[str], usage_limit: int = 0) -> None:
-        args.sort()
+    def _get_host_shell(self, host: str) -> _HostShell:
+        host_shell = self._hosts.get(host)
+        if host_shell is None:
+            with self._lock:
+                host_shell = self._hosts.setdefault(host, _HostShell())
+
+        return host_shell
+
+    def add(self, results: Mapping[str, GenericResult], do_type: str, args: Sequence[_ShellArg], usage_limit: int = 0) -> None:
+        """
+        Add results of the command for the specified hosts.
+
+        :param results: results for each host
+        :param do_type: the type of the command
+        :param args: arguments of the command. Arguments can be compiled regular expressions
+                     that should fully match the actual arguments.
+        :param usage_limit: number of times the result can be found. Unlimited by default.
+        """
+        has_patterns = any(isinstance(arg, re.Pattern) for arg in args)
+        if not has_patterns:
+            args = sorted(cast(Sequence[str], args))
 
         for host, result in results.items():
-            result = {
+            item = {
                 'result': result,
                 'do_type': do_type,
                 'args': args,
-                'used_times': 0
+                'used_times': 0,
+                'sequence': next(self._sequence),
             }
 
             if usage_limit > 0:
-                result['usage_limit'] = usage_limit
+                item['usage_limit'] = usage_limit
 
-            self.results.setdefault(host, []).append(result)
+            host_shell = self._get_host_shell(host)
+            with host_shell.lock:
+                if has_patterns:
+                    host_shell.patterns.append(item)
+                else:
+                    host_shell.results.setdefault((do_type, tuple(args)), []).append(item)
+
+    def remove(self, host: str, do_type: str, args: List[str]) -> List[GenericResult]:
+        """
+        Remove not yet exhausted results of the command with exactly the specified arguments.
+
+        :return: removed results in order of adding
+        """
+        host_shell = self._hosts.get(host)
+        if host_shell is None:
+            return []
+
+        with host_shell.lock:
+            items = host_shell.results.pop((do_type, tuple(sorted(args))), [])
+
+        return [item['result'] for item in items]
+
+    def round_trip(self, host: str, do_type: str) -> None:
+        """
+        The method is called on each remote call of the fake connection, that is, on each emulated SSH round-trip.
+        It can be overridden to emulate the network latency or failures.
+        """
+        pass
+
+    def default_result(self, host: str, do_type: str, command: str, hide: bool) -> Optional[GenericResult]:
+        """
+        The method is called if no result was added for the command.
+        It can be overridden to emulate arbitrary commands. By default, the command is considered unexpected.
+        """
+        # pylint: disable=unused-argument
+        return None
 
     def find(self, host: str, do_type: str, args: List[str]) -> Optional[GenericResult]:
         # TODO: Support kwargs
-        with self._lock:
-            results = self.results.get(host, [])
-            for i, item in enumerate(results):
-                if item['do_type'] == do_type and item['args'] == args:
-                    history_found = any(history_item is item for history_item in self.history.get(host, []))
-                    if not history_found:
-                        self.history.setdefault(host, []).append(item)
-
-                    item['used_times'] += 1
-                    if item.get('usage_limit') is not None:
-                        item['usage_limit'] -= 1
-                        if item['usage_limit'] < 1:
-                            del results[i]
-                    return item['result']
+        host_shell = self._hosts.get(host)
+        if host_shell is None:
             return None
 
+        key = (do_type, tuple(args))
+        with host_shell.lock:
+            items = host_shell.results.get(key)
+            found_item = items[0] if items else None
+            # Fallback to the patterns that are added earlier than the exactly matched result.
+            for item in host_shell.patterns:
+                if found_item is not None and item['sequence'] > found_item['sequence']:
+                    break
+                if self._matches(item, do_type, args):
+                    items = host_shell.patterns
+                    found_item = item
+                    break
+
+            if found_item is None or items is None:
+                return None
+
+            if found_item['used_times'] == 0:
+                host_shell.history.append(found_item)
+                host_shell.history_index.setdefault((found_item['do_type'], tuple(found_item['args'])), [])\
+                    .append(found_item)
+
+            found_item['used_times'] += 1
+            if found_item.get('usage_limit') is not None:
+                found_item['usage_limit'] -= 1
+                if found_item['usage_limit'] < 1:
+                    items.remove(found_item)
+                    if not items and items is not host_shell.patterns:
+                        del host_shell.results[key]
+
+        return found_item['result']
+
+    @staticmethod
+    def _matches(item: _ShellResult, do_type: str, args: List[str]) -> bool:
+        item_args: List[_ShellArg] = item['args']
+        if item['do_type'] != do_type or len(item_args) != len(args):
+            return False
+
+        return all(item_arg.fullmatch(arg) is not None if isinstance(item_arg, re.Pattern) else item_arg == arg
+                   for item_arg, arg in zip(item_args, args))
+
     # covered by test.test_demo.TestFakeShell.test_calculate_calls
-    def history_find(self, host: str, do_type: str, args: List[str]) -> List[_ShellResult]:
+    def history_find(self, host: str, do_type: str, args: Sequence[_ShellArg]) -> List[_ShellResult]:
         # TODO: Support kwargs
-        result = []
-        for item in self.history.get(host, []):
-            if item['do_type'] == do_type and item['args'] == args:
-                result.append(item)
-        return result
+        host_shell = self._hosts.get(host)
+        if host_shell is None:
+            return []
+
+        with host_shell.lock:
+            return list(host_shell.history_index.get((do_type, tuple(args)), []))
 
     def is_called_each(self, hosts: List[str], do_type: str, args: List[str]) -> bool:
         return all((self.is_called(host, do_type, args) for host in hosts))
@@ -183,6 +286,25 @@ class FakeFS:
         return result
 
 
+class FakeClock(retry.Clock):
+    """
+    Deterministic clock that does not really sleep, but instantly advances its time.
+    """
+
+    def __init__(self) -> None:
+        self.time = 0.0
+        self.sleeps: List[float] = []
+        self._lock = threading.Lock()
+
+    def monotonic(self) -> float:
+        return self.time
+
+    def sleep(self, seconds: float) -> None:
+        with self._lock:
+            self.sleeps.append(seconds)
+            self.time += max(seconds, 0)
+
+
 class FakeClusterStorage(utils.ClusterStorage):
     def make_dir(self) -> None:
         pass
@@ -332,9 +454,11 @@ class FakeConnection(connections.Connection):
     def put(self, data: Union[io.BytesIO, str], filename: str, **kwargs: Any) -> None:  # pylint: disable=arguments-differ
         # It should return fabric.transfer.Result, but currently returns None.
         # Transfer Result is currently never handled.
+        self.fake_shell.round_trip(self.host, 'put')
         self.fake_fs.write(self.host, filename, data)
 
     def _do(self, do_type: str, original_command: str, **kwargs: Any) -> fabric.runners.Result:
+        self.fake_shell.round_trip(self.host, do_type)
         # start fake execution of commands
         commands, sep_symbol, command_sep = self._split_command(do_type, original_command)
 
@@ -344,6 +468,8 @@ class FakeConnection(connections.Connection):
         i = 0
         for command in commands:
             found_result = self.fake_shell.find(self.host, do_type, [command])
+            if found_result is None:
+                found_result = self.fake_shell.default_result(self.host, do_type, command, kwargs.get('hide', False))
 
             if found_result is None:
                 raise Exception('Fake result not found for requested action type \'%s\' and command %s' % (do_type, [command]))
@@ -584,10 +710,12 @@ def generate_inventory(balancer: _ROLE_SPEC = 1, control_plane: _ROLE_SPEC = 1,
         ip_i = ip_i + 1
         if "control-plane" in roles and worker == 0:
             roles.append('worker')
+        # Large inventories span few subnets
+        subnet_i, host_i = divmod(ip_i - 1, 254)
         inventory['nodes'].append({
             'name': id_,
-            'address': '10.101.1.%s' % ip_i,
-            'internal_address': '192.168.0.%s' % ip_i,
+            'address': '10.101.%s.%s' % (1 + subnet_i * 10, host_i + 1),
+            'internal_address': '192.168.%s.%s' % (subnet_i, host_i + 1),
             'roles': roles
         })
 
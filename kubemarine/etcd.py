@@ -16,7 +16,7 @@ import json
 import time
 from typing import List, Dict, Optional, Tuple
 
-from kubemarine.core import utils
+from kubemarine.core import utils, tracing
 from kubemarine.core.cluster import KubernetesCluster
 from kubemarine.core.group import NodeGroup, CollectorCallback
 
@@ -56,6 +56,7 @@ def remove_members(group: NodeGroup) -> None:
             log.verbose(f"Skipping {node_name} as it is not among etcd members.")
 
 
+@tracing.traced('kubernetes wait')
 def wait_for_health(cluster: KubernetesCluster, node: NodeGroup) -> List[Dict]:
     """
     The method checks etcd endpoints health until all endpoints are healthy or retries are exhausted
@@ -26,7 +26,7 @@ from jinja2 import Template
 from ordered_set import OrderedSet
 
 from kubemarine import system, admission, etcd, packages, jinja, sysctl, thirdparties
-from kubemarine.core import utils, static, summary, log, errors
+from kubemarine.core import utils, static, summary, log, errors, tracing
 from kubemarine.core.cluster import KubernetesCluster, EnrichmentStage, enrichment
 from kubemarine.core.executor import Token
 from kubemarine.core.group import NodeGroup, DeferredGroup, RunnersGroupResult, CollectorCallback
@@ -577,6 +577,7 @@ def init_first_control_plane(group: NodeGroup) -> None:
     is_cluster_installed(cluster)
 
 
+@tracing.traced('kubernetes wait')
 def wait_uncordon(node: NodeGroup) -> None:
     cluster = node.cluster
     timeout_config = cluster.inventory['globals']['expect']['pods']['kubernetes']
@@ -588,6 +589,7 @@ def wait_uncordon(node: NodeGroup) -> None:
                                      retries=timeout_config['retries'])
 
 
+@tracing.traced('kubernetes wait')
 def wait_for_nodes(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     log = cluster.log
@@ -667,7 +669,7 @@ def init_workers(group: NodeGroup) -> None:
             " --v=5",
             hide=False, pty=True)
 
-        components.wait_for_pods(node)
+    components.wait_for_pods(group)
 
 
 def apply_labels(group: NodeGroup) -> RunnersGroupResult:
@@ -962,6 +964,7 @@ def verify_supported_version(target_version: str, logger: log.EnhancedLogger) ->
     return True
 
 
+@tracing.traced('kubernetes wait')
 def expect_kubernetes_version(cluster: KubernetesCluster, version: str,
                               timeout: int = None, retries: int = None,
                               node: NodeGroup = None, apply_filter: str = None) -> None:
@@ -1218,14 +1221,14 @@ def exec_running_nodes_report(cluster: KubernetesCluster) -> None:
 
 
 def get_nodes_description_cmd() -> str:
-    return 'kubectl get node -o yaml'
+    return 'kubectl get node -o json'
 
 
 def get_nodes_description(cluster: KubernetesCluster) -> dict:
     cmd = get_nodes_description_cmd()
     result = cluster.nodes['control-plane'].get_any_member().sudo(cmd)
     cluster.log.verbose(result)
-    data: dict = yaml.safe_load(list(result.values())[0].stdout)
+    data: dict = json.loads(list(result.values())[0].stdout)
     return data
 
 
@@ -14,21 +14,23 @@
 
 import io
 import re
+import time
 from textwrap import dedent
-from typing import List, Optional, Dict, Callable, Sequence, Union
+from typing import List, Optional, Dict, Callable, Sequence, Union, Tuple
 
 import yaml
 from jinja2 import Template
 from ordered_set import OrderedSet
 
 from kubemarine import plugins, system
-from kubemarine.core import utils, log
+from kubemarine.core import utils, log, tracing
 from kubemarine.core.cluster import KubernetesCluster
 from kubemarine.core.group import NodeGroup, DeferredGroup, CollectorCallback, AbstractGroup, RunResult
 from kubemarine.core.yaml_merger import override_merger
 from kubemarine.kubernetes.object import KubernetesObject
 
 ERROR_WAIT_FOR_PODS_NOT_SUPPORTED = "Waiting for pods of {components} components is currently not supported"
+ERROR_PODS_NOT_READY_ON_NODES = plugins.ERROR_PODS_NOT_READY + ". Not ready components by nodes: {pods}"
 ERROR_RESTART_NOT_SUPPORTED = "Restart of {components} components is currently not supported"
 ERROR_RECONFIGURE_NOT_SUPPORTED = "Reconfiguration of {components} components is currently not supported"
 
@@ -158,7 +160,7 @@ class KubeadmConfig:
         self.loaded_maps[configmap] = configmap_obj
 
         key = CONFIGMAPS_CONSTANTS[configmap]['key']
-        config: dict = yaml.safe_load(configmap_obj.obj["data"][key])
+        config: dict = utils.yaml_safe_load(configmap_obj.obj["data"][key])
 
         if edit_func is not None:
             config = edit_func(config)
@@ -446,13 +448,12 @@ def wait_for_pods(group: NodeGroup, components: Sequence[str] = None) -> None:
             raise Exception(ERROR_WAIT_FOR_PODS_NOT_SUPPORTED.format(components=not_supported))
 
     cluster: KubernetesCluster = group.cluster
-    first_control_plane = cluster.nodes['control-plane'].get_first_member()
     expect_config = cluster.inventory['globals']['expect']['pods']['kubernetes']
 
+    control_plane: Optional[NodeGroup] = None
+    nodes_components: Dict[str, List[str]] = {}
     for node in group.get_ordered_members_list():
-        node_name = node.get_node_name()
         is_control_plane = 'control-plane' in node.get_config()['roles']
-        cluster.log.debug(f"Waiting for system pods on node: {node_name}")
 
         if components is not None:
             _components = list(components)
@@ -465,14 +466,101 @@ def wait_for_pods(group: NodeGroup, components: Sequence[str] = None) -> None:
         if not _components:
             continue
 
-        control_plane = node
-        if not is_control_plane:
-            control_plane = first_control_plane
+        nodes_components[node.get_node_name()] = _components
+        if is_control_plane and control_plane is None:
+            control_plane = node
+
+    if not nodes_components:
+        return
+
+    if control_plane is None:
+        control_plane = cluster.nodes['control-plane'].get_first_member()
+
+    cluster.log.debug(f"Waiting for system pods on nodes: {', '.join(nodes_components)}")
+    _expect_pods_on_nodes(cluster, control_plane, nodes_components,
+                          timeout=expect_config['timeout'], retries=expect_config['retries'])
+
+
+@tracing.traced('kubernetes wait')
+def _expect_pods_on_nodes(cluster: KubernetesCluster, control_plane: NodeGroup, nodes_components: Dict[str, List[str]],
+                          *, timeout: int, retries: int) -> None:
+    """
+    Wait for pods of Kubernetes components to be ready on all the specified nodes.
+    Each retry takes one snapshot of pods in the `kube-system` namespace, and checks all the nodes against it.
 
-        plugins.expect_pods(cluster, _components, namespace='kube-system',
-                            control_plane=control_plane, node_name=node_name,
-                            timeout=expect_config['timeout'],
-                            retries=expect_config['retries'])
+    :param cluster: KubernetesCluster instance
+    :param control_plane: control plane to get pods from
+    :param nodes_components: mapping of node names to the Kubernetes components to wait for on the node
+    :param timeout: time to wait between retries
+    :param retries: number of retries
+    """
+    cluster.log.verbose("Max expectation time: %ss" % (timeout * retries))
+
+    failures = 0
+    not_ready: Dict[str, List[str]] = {}
+    while retries > 0:
+        result = control_plane.sudo("kubectl get pods -n kube-system -o=wide", warn=True, pty=True)
+        stdout = list(result.values())[0].stdout
+
+        not_ready, failure_found = _get_not_ready_pods(cluster, stdout, nodes_components)
+        if failure_found:
+            failures += 1
+            # just in case, skip the error a couple of times, what if it comes out of the failure state?
+            if failures > cluster.globals['pods']['allowed_failures']:
+                raise Exception('Pod entered a state of error, further proceeding is impossible')
+
+        if not not_ready:
+            cluster.log.debug("Pods are ready!")
+            return
+
+        retries -= 1
+        cluster.log.debug("Pods are not ready yet... (%ss left)" % (retries * timeout))
+        cluster.log.debug(_format_not_ready_pods(not_ready))
+        time.sleep(timeout)
+
+    raise Exception(ERROR_PODS_NOT_READY_ON_NODES.format(pods=_format_not_ready_pods(not_ready)))
+
+
+def _get_not_ready_pods(cluster: KubernetesCluster, stdout: str,
+                        nodes_components: Dict[str, List[str]]) -> Tuple[Dict[str, List[str]], bool]:
+    """
+    Find the components which pods are not ready on the nodes in the output of `kubectl get pods -o=wide`.
+
+    :return: pair of mapping of node names to the not ready components, and flag whether any pod is in critical state.
+    """
+    nodes_lines: Dict[str, List[str]] = {node_name: [] for node_name in nodes_components}
+    for line in stdout.splitlines():
+        node_name = next((token for token in line.split() if token in nodes_lines), None)
+        if node_name is not None:
+            nodes_lines[node_name].append(line)
+
+    failure_found = False
+    not_ready: Dict[str, List[str]] = {}
+    for node_name, components in nodes_components.items():
+        running_pods: Dict[str, List[str]] = {component: [] for component in components}
+        for line in nodes_lines[node_name]:
+            # it is necessary to look for pods with the name "xxxx-xxxx-" instead of "xxxx-xxxx" because
+            # "xxxx-xxxx" may be the name of the namespace in which another healthy pod will be running
+            component = next((c for c in components if c + "-" in line), None)
+            if component is None:
+                continue
+
+            if plugins.is_critical_state_in_stdout(cluster, line):
+                cluster.log.verbose("Failed pod detected: %s\n" % line)
+                failure_found = True
+            else:
+                running_pods[component].append(line)
+
+        not_ready_components = [component for component, lines in running_pods.items()
+                                if not lines or any("0/1" in line for line in lines)]
+        if not_ready_components:
+            not_ready[node_name] = not_ready_components
+
+    return not_ready, failure_found
+
+
+def _format_not_ready_pods(not_ready: Dict[str, List[str]]) -> str:
+    return '; '.join(f"{node_name}: {', '.join(components)}" for node_name, components in not_ready.items())
 
 
 # function to create kubeadm patches and put them to a node
@@ -758,75 +846,111 @@ def compare_manifests(cluster: KubernetesCluster, *, with_inventory: bool) \
     :param with_inventory: flag if cluster configuration should be generated from the inventory
     :return: mapping host -> component -> diff string
     """
-    kubeadm_config = KubeadmConfig(cluster)
-    if not with_inventory:
-        kubeadm_config.load('kubeadm-config', cluster.nodes['control-plane'].get_first_member())
+    return _compare_manifests(cluster, [with_inventory])[with_inventory]
+
+
+def compare_all_manifests(cluster: KubernetesCluster) -> Dict[bool, Dict[str, Dict[str, Optional[str]]]]:
+    """
+    Same as `compare_manifests`, but generate the manifests both from kubeadm-config ConfigMap and from the inventory.
+    The present manifests are fetched only once, and the manifests of both sources are generated together.
+
+    :param cluster: KubernetesCluster instance
+    :return: mapping `with_inventory` flag -> host -> component -> diff string
+    """
+    return _compare_manifests(cluster, [False, True])
+
+
+def _compare_manifests(cluster: KubernetesCluster, sources: List[bool]) \
+        -> Dict[bool, Dict[str, Dict[str, Optional[str]]]]:
+    first_control_plane = cluster.nodes['control-plane'].get_first_member()
+    kubeadm_configs: Dict[bool, KubeadmConfig] = {}
+    temp_configs: Dict[bool, str] = {}
+    patches_dirs: Dict[bool, str] = {}
+    for with_inventory in sources:
+        kubeadm_config = KubeadmConfig(cluster)
+        if not with_inventory:
+            kubeadm_config.load('kubeadm-config', first_control_plane)
+
+        kubeadm_configs[with_inventory] = kubeadm_config
+        temp_configs[with_inventory] = utils.get_remote_tmp_path()
+        patches_dirs[with_inventory] = utils.get_remote_tmp_path() if with_inventory else '/etc/kubernetes/patches'
 
     control_planes = cluster.nodes['control-plane'].new_defer()
-    temp_config = utils.get_remote_tmp_path()
-    patches_dir = '/etc/kubernetes/patches'
-    if with_inventory:
-        patches_dir = utils.get_remote_tmp_path()
 
     components = [c for c in CONTROL_PLANE_COMPONENTS
                   if c != 'etcd' or kubeadm_extended_dryrun(cluster)]
 
+    # Each dry-run creates new temporary directory.
+    # List the directories before the first dry-run and after each dry-run to find the newly created one.
     tmp_dirs_cmd = "sh -c 'sudo ls /etc/kubernetes/tmp/ | grep dryrun 2>/dev/null || true'"
-    old_tmp_dirs = CollectorCallback(cluster)
-    new_tmp_dirs = CollectorCallback(cluster)
+    tmp_dirs = CollectorCallback(cluster)
     for defer in control_planes.get_ordered_members_list():
-        _upload_config(cluster, defer, kubeadm_config, temp_config, patches_dir=patches_dir)
-        if with_inventory:
-            defer.sudo(f'mkdir -p {patches_dir}')
-
-        for component in components:
+        defer.sudo(tmp_dirs_cmd, callback=tmp_dirs)
+        for with_inventory in sources:
+            temp_config = temp_configs[with_inventory]
+            patches_dir = patches_dirs[with_inventory]
+            _upload_config(cluster, defer, kubeadm_configs[with_inventory], temp_config, patches_dir=patches_dir)
             if with_inventory:
-                _create_kubeadm_patches_for_component_on_node(cluster, defer, component,
-                                                              patches_dir=patches_dir, reset=False)
+                defer.sudo(f'mkdir -p {patches_dir}')
 
-            defer.sudo(tmp_dirs_cmd, callback=old_tmp_dirs)
+            for component in components:
+                if with_inventory:
+                    _create_kubeadm_patches_for_component_on_node(cluster, defer, component,
+                                                                  patches_dir=patches_dir, reset=False)
 
-            init_phase = COMPONENTS_CONSTANTS[component]['init_phase']
-            defer.sudo(f'kubeadm init phase {init_phase} --dry-run --config {temp_config}')
+                init_phase = COMPONENTS_CONSTANTS[component]['init_phase']
+                defer.sudo(f'kubeadm init phase {init_phase} --dry-run --config {temp_config}')
 
-            defer.sudo(tmp_dirs_cmd, callback=new_tmp_dirs)
+                defer.sudo(tmp_dirs_cmd, callback=tmp_dirs)
 
     control_planes.flush()
 
     stored_manifest = CollectorCallback(cluster)
     generated_manifest = CollectorCallback(cluster)
     for defer in control_planes.get_ordered_members_list():
-        old_tmp_dirs_results = old_tmp_dirs.results[defer.get_host()]
-        new_tmp_dirs_results = new_tmp_dirs.results[defer.get_host()]
-        for i, component in enumerate(components):
+        for component in components:
+            defer.sudo(f'cat /etc/kubernetes/manifests/{component}.yaml', callback=stored_manifest)
+
+        tmp_dirs_results = tmp_dirs.results[defer.get_host()]
+        for i, component in enumerate(components * len(sources)):
             tmp_dir = next(iter(
-                set(new_tmp_dirs_results[i].stdout.split())
-                - set(old_tmp_dirs_results[i].stdout.split())
+                set(tmp_dirs_results[i + 1].stdout.split())
+                - set(tmp_dirs_results[i].stdout.split())
             ))
-            defer.sudo(f'cat /etc/kubernetes/manifests/{component}.yaml', callback=stored_manifest)
             defer.sudo(f'cat /etc/kubernetes/tmp/{tmp_dir}/{component}.yaml', callback=generated_manifest)
 
     control_planes.flush()
 
-    result: Dict[str, Dict[str, Optional[str]]] = {}
+    result: Dict[bool, Dict[str, Dict[str, Optional[str]]]] = {with_inventory: {} for with_inventory in sources}
     for host in control_planes.get_hosts():
         stored_manifest_results = stored_manifest.results[host]
         generated_manifest_results = generated_manifest.results[host]
         for i, component in enumerate(components):
-            tofile = (f"{component}.yaml generated from 'services.kubeadm' section"
-                      if with_inventory
-                      else f"{component}.yaml generated from kubeadm-config ConfigMap")
             stored = stored_manifest_results[i].stdout
-            generated = generated_manifest_results[i].stdout
             if component == 'etcd':
                 stored = _filter_etcd_initial_cluster_args(stored)
-                generated = _filter_etcd_initial_cluster_args(generated)
 
-            diff = utils.get_yaml_diff(stored, generated,
-                                       fromfile=f'/etc/kubernetes/manifests/{component}.yaml',
-                                       tofile=tofile)
+            # Both sources usually generate the same manifest. Parse and compare each distinct content only once.
+            stored_obj = utils.yaml_safe_load(stored)
+            equal: Dict[str, bool] = {}
+            for j, with_inventory in enumerate(sources):
+                tofile = (f"{component}.yaml generated from 'services.kubeadm' section"
+                          if with_inventory
+                          else f"{component}.yaml generated from kubeadm-config ConfigMap")
+                generated = generated_manifest_results[j * len(components) + i].stdout
+                if component == 'etcd':
+                    generated = _filter_etcd_initial_cluster_args(generated)
+
+                if generated not in equal:
+                    equal[generated] = utils.yaml_safe_load(generated) == stored_obj
+
+                diff = None
+                if not equal[generated]:
+                    diff = utils.get_unified_diff(stored, generated,
+                                                  fromfile=f'/etc/kubernetes/manifests/{component}.yaml',
+                                                  tofile=tofile)
 
-            result.setdefault(host, {})[component] = diff
+                result[with_inventory].setdefault(host, {})[component] = diff
 
     return result
 
@@ -928,7 +1052,7 @@ def compare_configmap(cluster: KubernetesCluster, configmap: str) -> Optional[st
         cfg = dedent(cfg)
 
         key = CONFIGMAPS_CONSTANTS[configmap]['key']
-        generated_config = yaml.safe_load(cfg)['data'][key]
+        generated_config = utils.yaml_safe_load(cfg)['data'][key]
         if 'resolvConf' not in kubeadm_config.maps[configmap]:
             generated_config = _filter_kubelet_configmap_resolv_conf(generated_config)
 
@@ -936,7 +1060,7 @@ def compare_configmap(cluster: KubernetesCluster, configmap: str) -> Optional[st
         # Use loaded_maps that preserve original formatting
         stored_config = kubeadm_config.loaded_maps[configmap].obj["data"][key]
 
-        if yaml.safe_load(generated_config) == yaml.safe_load(stored_config):
+        if utils.yaml_safe_load(generated_config) == utils.yaml_safe_load(stored_config):
             return None
 
         return utils.get_unified_diff(stored_config, generated_config,
@@ -149,21 +149,33 @@ def setup_modprobe(group: NodeGroup) -> bool:
     return True
 
 
-def is_modprobe_valid(group: NodeGroup) -> Tuple[bool, bool, RunnersGroupResult]:
+def is_modprobe_valid(group: NodeGroup, lsmod_result: RunnersGroupResult = None,
+                      config_result: RunnersGroupResult = None) -> Tuple[bool, bool, RunnersGroupResult]:
+    """
+    Check that the configured kernel modules are loaded and persisted on the nodes.
+
+    :param group: group of nodes to check
+    :param lsmod_result: already fetched result of `lsmod`.
+    :param config_result: already fetched result of `cat {predefined_file_path}`.
+                          Both results are fetched if any of them is not specified.
+    :return: modules validity, config validity, and the result of `lsmod`
+    """
     cluster: KubernetesCluster = group.cluster
     logger = cluster.log
-    defer = group.new_defer()
 
-    lsmod_collector = CollectorCallback(cluster)
-    config_collector = CollectorCallback(cluster)
-    defer.sudo("lsmod", warn=True, callback=lsmod_collector)
-    defer.sudo(f"cat {predefined_file_path}", warn=True, callback=config_collector)
-    defer.flush()
+    if lsmod_result is None or config_result is None:
+        defer = group.new_defer()
+        lsmod_collector = CollectorCallback(cluster)
+        config_collector = CollectorCallback(cluster)
+        defer.sudo("lsmod", warn=True, callback=lsmod_collector)
+        defer.sudo(f"cat {predefined_file_path}", warn=True, callback=config_collector)
+        defer.flush()
+        lsmod_result, config_result = lsmod_collector.result, config_collector.result
 
     is_valid = True
     is_config_valid = True
 
-    for node in defer.get_ordered_members_list():
+    for node in group.get_ordered_members_list():
         expected_config = generate_config(node)
         if not expected_config:
             continue
@@ -172,11 +184,10 @@ def is_modprobe_valid(group: NodeGroup) -> Tuple[bool, bool, RunnersGroupResult]
 
         host = node.get_host()
 
-        lsmod_result = lsmod_collector.result[host]
         actual_modules = {mod.split()[0]
-                          for mod in lsmod_result.stdout.rstrip('\n').split('\n')[1:]}
+                          for mod in lsmod_result[host].stdout.rstrip('\n').split('\n')[1:]}
 
-        actual_config = config_collector.result[host]
+        actual_config = config_result[host]
 
         for module_name in expected_modules:
             if module_name not in actual_modules:
@@ -187,4 +198,4 @@ def is_modprobe_valid(group: NodeGroup) -> Tuple[bool, bool, RunnersGroupResult]
             logger.debug(f'Config is outdated at {host}')
             is_config_valid = False
 
-    return is_valid, is_config_valid, lsmod_collector.result
+    return is_valid, is_config_valid, lsmod_result
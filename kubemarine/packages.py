@@ -11,8 +11,9 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import fnmatch
 import re
-from typing import List, Dict, Tuple, Optional, Union, Mapping, Set, Protocol
+from typing import List, Dict, Tuple, Optional, Union, Mapping, Set, Protocol, Iterable
 from io import StringIO
 
 from kubemarine import yum, apt, jinja
@@ -570,18 +571,21 @@ def clean(group: NodeGroup) -> RunnersGroupResult:
 def install(group: AbstractGroup[GROUP_RUN_TYPE], include: Union[str, List[str]] = None,
             exclude: Union[str, List[str]] = None,
             pty: bool = False, callback: Callback = None) -> GROUP_RUN_TYPE:
+    _invalidate_installed_packages(group)
     return get_package_manager(group).install(group, include, exclude,
                                               pty=pty, callback=callback)
 
 
 def remove(group: AbstractGroup[GROUP_RUN_TYPE], include: Union[str, List[str]] = None, exclude: Union[str, List[str]] = None,
            warn: bool = False, hide: bool = True, pty: bool = False) -> GROUP_RUN_TYPE:
+    _invalidate_installed_packages(group)
     return get_package_manager(group).remove(group, include, exclude, warn=warn, hide=hide, pty=pty)
 
 
 def upgrade(group: AbstractGroup[GROUP_RUN_TYPE], include: Union[str, List[str]] = None,
             exclude: Union[str, List[str]] = None,
             pty: bool = False) -> GROUP_RUN_TYPE:
+    _invalidate_installed_packages(group)
     return get_package_manager(group).upgrade(group, include, exclude, pty=pty)
 
 
@@ -594,44 +598,85 @@ def search_package(group: DeferredGroup, package: str, callback: Callback = None
     return get_package_manager(group).search(group, package, callback)
 
 
-def get_detect_package_version_cmd(os_family: str, package_name: str) -> str:
+def get_detect_installed_packages_cmd(os_family: str) -> str:
+    """
+    Return command that lists all packages installed on the node in machine-readable format.
+    Each line of the output is "<name>\\t<package>",
+    where <package> is formatted as by `rpm -q` or `dpkg-query -W` respectively (e.g. 'containerd=1.5.9-0ubuntu1').
+    """
     if os_family in ["rhel", "rhel8", "rhel9"]:
-        cmd = r"rpm -q %s" % package_name
+        cmd = r"rpm -qa --queryformat '%{NAME}\t%{NAME}-%{VERSION}-%{RELEASE}.%{ARCH}\n'"
     else:
-        cmd = r"dpkg-query -f '${Package}=${Version}\n' -W %s" % package_name
+        cmd = r"dpkg-query -f '${Package}\t${Package}=${Version}\n' -W"
 
     return cmd
 
 
-def _detect_installed_package_version(group: DeferredGroup, package: str, collector: CollectorCallback) -> Token:
-    """
-    Detect package versions for each host on remote group
-    :param group: Group of nodes, where package should be found
-    :param package: package name, which version should be detected (eg. 'containerd')
-    :return: NodeGroupResults with package version on each host
+def _parse_installed_packages(result: RunnersResult) -> Dict[str, List[str]]:
+    installed_packages: Dict[str, List[str]] = {}
+    for line in result.stdout.splitlines():
+        name, sep, package = line.partition('\t')
+        package = package.strip()
+        # consider version, which ended with special symbol = or - as not installed
+        # (it is possible in some cases to receive "containerd=" version)
+        if not sep or not package or package[-1] == '=' or package[-1] == '-':
+            continue
 
-    Method generates different package query for different OS.
+        installed_packages.setdefault(name.strip(), []).append(package)
 
-    Note: for Ubuntu/Debian some packages returns multiline results for some queries
-    (for example docker-ce* returns docker-ce and docker-ce-cli).
+    return installed_packages
+
+
+def get_installed_packages(cluster: KubernetesCluster, hosts: Iterable[str]) -> Dict[str, Dict[str, List[str]]]:
     """
+    Detect all packages installed on the specified hosts.
+    Each node is queried at most once during the lifetime of the cluster object,
+    unless the packages are installed, removed, or upgraded on it using this module.
 
-    os_family = group.get_nodes_os()
-    package_name = get_package_name(os_family, package)
+    :param cluster: KubernetesCluster instance
+    :param hosts: Remote hosts to detect installed packages on.
+    :return: Package names with list of installed versions for each host.
+    """
+    hosts = list(hosts)
+    installed_packages = cluster.installed_packages
+    not_detected_hosts = [host for host in hosts if host not in installed_packages]
 
-    cmd = get_detect_package_version_cmd(os_family, package_name)
-    return group.sudo(cmd, warn=True, callback=collector)
+    detected: Dict[str, Dict[str, List[str]]] = {}
+    if not_detected_hosts:
+        collector = CollectorCallback(cluster)
+        with cluster.make_group(not_detected_hosts).new_executor() as exe:
+            for node in exe.group.get_ordered_members_list():
+                cmd = get_detect_installed_packages_cmd(node.get_nodes_os())
+                node.sudo(cmd, warn=True, callback=collector)
 
+        for host, result in collector.result.items():
+            detected[host] = _parse_installed_packages(result)
+            # Do not remember failed queries to let them be retried
+            if result.exited == 0:
+                installed_packages[host] = detected[host]
 
-def _parse_node_detected_package(result: RunnersResult, package: str) -> str:
-    node_detected_package = result.stdout.strip() + result.stderr.strip()
-    # consider version, which ended with special symbol = or - as not installed
-    # (it is possible in some cases to receive "containerd=" version)
-    if "not installed" in node_detected_package or "no packages found" in node_detected_package \
-            or node_detected_package[-1] == '=' or node_detected_package[-1] == '-':
-        node_detected_package = f"not installed {package}"
+    return {host: installed_packages.get(host, detected.get(host, {})) for host in hosts}
 
-    return node_detected_package
+
+def _invalidate_installed_packages(group: AbstractGroup[GROUP_RUN_TYPE]) -> None:
+    installed_packages = group.cluster.installed_packages
+    for host in group.get_hosts():
+        installed_packages.pop(host, None)
+
+
+def _get_node_detected_package(os_family: str, installed_packages: Dict[str, List[str]], package: str) -> str:
+    package_name = get_package_name(os_family, package)
+    if any(c in package_name for c in '*?['):
+        # For example, docker-ce* matches both docker-ce and docker-ce-cli
+        versions = [version for name in sorted(installed_packages) if fnmatch.fnmatchcase(name, package_name)
+                    for version in installed_packages[name]]
+    else:
+        versions = installed_packages.get(package_name, [])
+
+    if not versions:
+        return f"not installed {package}"
+
+    return '\n'.join(versions)
 
 
 def detect_installed_packages_version_hosts(
@@ -639,31 +684,24 @@ def detect_installed_packages_version_hosts(
 ) -> Dict[str, Dict[str, List[str]]]:
     """
     Detect grouped packages versions for specified list of packages for each remote host.
+    All packages of the node are detected using the single query, see `get_installed_packages`.
 
     :param cluster: KubernetesCluster instance
     :param hosts_to_packages: Remote hosts with list of packages to detect versions.
     :return: Dictionary with grouped versions for each queried package, pointing to list of hosts,
         e.g. {"foo" -> {"foo-1": [host1, host2]}, "bar" -> {"bar-1": [host1], "bar-2": [host2]}}
     """
-    hosts_to_packages_dedup = {}
+    hosts_installed_packages = get_installed_packages(cluster, hosts_to_packages)
+
+    results: Dict[str, Dict[str, List]] = {}
     for host, packages_list in hosts_to_packages.items():
         if isinstance(packages_list, str):
             packages_list = [packages_list]
-        # deduplicate
-        hosts_to_packages_dedup[host] = list(set(packages_list))
-
-    collector = CollectorCallback(cluster)
-    with cluster.make_group(hosts_to_packages).new_executor() as exe:
-        for node in exe.group.get_ordered_members_list():
-            for package in hosts_to_packages_dedup[node.get_host()]:
-                _detect_installed_package_version(node, package, collector)
 
-    results: Dict[str, Dict[str, List]] = {}
-
-    for host, multiple_results in collector.results.items():
-        for i, result in enumerate(multiple_results):
-            package = hosts_to_packages_dedup[host][i]
-            node_detected_package = _parse_node_detected_package(result, package)
+        os_family = cluster.get_os_family_for_node(host)
+        # deduplicate
+        for package in dict.fromkeys(packages_list):
+            node_detected_package = _get_node_detected_package(os_family, hosts_installed_packages[host], package)
             results.setdefault(package, {}).setdefault(node_detected_package, []).append(host)
 
     return results
@@ -35,7 +35,7 @@ import yaml
 
 from kubemarine.core.cluster import KubernetesCluster, EnrichmentStage, enrichment
 from kubemarine import jinja, thirdparties
-from kubemarine.core import utils, static, errors, os as kos, log
+from kubemarine.core import utils, static, errors, os as kos, log, tracing
 from kubemarine.core.errors import FailException, KME
 from kubemarine.core.yaml_merger import default_merger
 from kubemarine.core.group import NodeGroup
@@ -212,6 +212,7 @@ def install_plugin(cluster: KubernetesCluster, plugin_name: str, installation_pr
             procedure_types()[apply_type]['apply'](cluster, configs)
 
 
+@tracing.traced('kubernetes wait')
 def expect_daemonset(cluster: KubernetesCluster,
                      daemonsets_names: List[Union[str, Dict[str, str]]],
                      timeout: int = None,
@@ -267,6 +268,7 @@ def expect_daemonset(cluster: KubernetesCluster,
                     'https://github.com/Netcracker/KubeMarine/blob/main/documentation/Installation.md#expect-deploymentsdaemonsetsreplicasetsstatefulsets')
 
 
+@tracing.traced('kubernetes wait')
 def expect_replicaset(cluster: KubernetesCluster,
                       replicasets_names: List[Union[str, Dict[str, str]]],
                       timeout: int = None,
@@ -322,6 +324,7 @@ def expect_replicaset(cluster: KubernetesCluster,
                     'https://github.com/Netcracker/KubeMarine/blob/main/documentation/Installation.md#expect-deploymentsdaemonsetsreplicasetsstatefulsets')
 
 
+@tracing.traced('kubernetes wait')
 def expect_statefulset(cluster: KubernetesCluster,
                        statefulsets_names: List[Union[str, Dict[str, str]]],
                        timeout: int = None,
@@ -377,6 +380,7 @@ def expect_statefulset(cluster: KubernetesCluster,
                     'https://github.com/Netcracker/KubeMarine/blob/main/documentation/Installation.md#expect-deploymentsdaemonsetsreplicasetsstatefulsets')
 
 
+@tracing.traced('kubernetes wait')
 def expect_deployment(cluster: KubernetesCluster,
                       deployments_names: List[Union[str, Dict[str, str]]],
                       timeout: int = None,
@@ -432,6 +436,7 @@ def expect_deployment(cluster: KubernetesCluster,
                     'https://github.com/Netcracker/KubeMarine/blob/main/documentation/Installation.md#expect-deploymentsdaemonsetsreplicasetsstatefulsets')
 
 
+@tracing.traced('kubernetes wait')
 def expect_pods(cluster: KubernetesCluster, pods: List[str], namespace: str = None,
                 timeout: int = None, retries: int = None,
                 control_plane: NodeGroup = None, node_name: str = None) -> None:
@@ -741,7 +746,7 @@ def apply_shell(cluster: KubernetesCluster, step: dict) -> None:
         stdout_parts = stdout.split(vars_separator)
         cluster.log.debug(stdout_parts[0])  # printing original user output
         for part in stdout_parts[1:]:
-            var = yaml.safe_load(part)
+            var = utils.yaml_safe_load(part)
             aliases = out_vars_aliases[var['name']]
             for alias in aliases:
                 cluster.context['runtime_vars'][alias] = var['value']
@@ -807,7 +812,7 @@ def apply_helm(cluster: KubernetesCluster, config: dict) -> None:
     local_config_path = kubernetes.fetch_admin_config(cluster)
 
     with utils.open_external(os.path.join(chart_path, 'Chart.yaml'), 'r') as stream:
-        chart_metadata = yaml.safe_load(stream)
+        chart_metadata = utils.yaml_safe_load(stream)
         chart_name = chart_metadata["name"]
 
     cluster.log.debug("Running helm chart %s" % chart_name)
@@ -875,14 +880,14 @@ def process_chart_values(config: dict, local_chart_path: str) -> None:
     config_values_file = config.get("values_file")
     if config_values_file is not None:
         with utils.open_external(config_values_file) as stream:
-            file_values = yaml.safe_load(stream)
+            file_values = utils.yaml_safe_load(stream)
 
     if config_values is None and file_values is None:
         return
 
     chart_values = os.path.join(local_chart_path, 'values.yaml')
     with utils.open_external(chart_values, 'r') as stream:
-        merged_values = yaml.safe_load(stream)
+        merged_values = utils.yaml_safe_load(stream)
 
     if file_values is not None:
         merged_values = default_merger.merge(merged_values, file_values)
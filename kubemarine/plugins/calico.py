@@ -15,7 +15,6 @@ from textwrap import dedent
 from typing import Optional, List, Dict
 
 import os
-import yaml
 
 from kubemarine import plugins
 from kubemarine.core import utils, log
@@ -212,7 +211,7 @@ class CalicoManifestProcessor(Processor):
         self.log.verbose(f"The {key} has been patched in 'data.cni_network_config' with '{log_str}'")
 
     def enrich_service_account_secret_calico_kube_controllers(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret_calico_kube_controllers)
+        new_yaml = utils.yaml_safe_load(service_account_secret_calico_kube_controllers)
 
         service_account_key = "ServiceAccount_calico-kube-controllers"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -243,7 +242,7 @@ class CalicoManifestProcessor(Processor):
             plugin_service='kube-controllers', container_name='calico-kube-controllers', is_init_container=False)
 
     def enrich_service_account_secret_calico_node(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret_calico_node)
+        new_yaml = utils.yaml_safe_load(service_account_secret_calico_node)
 
         service_account_key = "ServiceAccount_calico-node"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -528,7 +527,7 @@ class CalicoApiServerManifestProcessor(Processor):
         self.assign_default_pss_labels(manifest, 'calico-apiserver')
 
     def enrich_service_account_secret_calico_apiserver(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret_calico_apiserver)
+        new_yaml = utils.yaml_safe_load(service_account_secret_calico_apiserver)
 
         service_account_key = "ServiceAccount_calico-apiserver"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -13,9 +13,8 @@
 # limitations under the License.
 from textwrap import dedent
 from typing import List, Optional, Dict
-import yaml
 
-from kubemarine.core import summary, log
+from kubemarine.core import summary, log, utils
 from kubemarine.core.cluster import KubernetesCluster, EnrichmentStage, enrichment
 from kubemarine.plugins.manifest import Processor, EnrichmentFunction, Manifest, Identity
 
@@ -81,7 +80,7 @@ class DashboardManifestProcessor(Processor):
         self.assign_default_pss_labels(manifest, 'kubernetes-dashboard')
 
     def enrich_service_account_secret_kubernetes_dashboard(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret_kubernetes_dashboard)
+        new_yaml = utils.yaml_safe_load(service_account_secret_kubernetes_dashboard)
 
         service_account_key = "ServiceAccount_kubernetes-dashboard"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -15,9 +15,7 @@
 from textwrap import dedent
 from typing import List, Optional, Dict
 
-import yaml
-
-from kubemarine.core import log
+from kubemarine.core import log, utils
 from kubemarine.core.cluster import KubernetesCluster, EnrichmentStage, enrichment
 from kubemarine.plugins.manifest import Processor, EnrichmentFunction, Manifest, Identity
 
@@ -69,7 +67,7 @@ class LocalPathProvisionerManifestProcessor(Processor):
         self.assign_default_pss_labels(manifest, 'local-path-storage')
 
     def enrich_service_account_secret(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret)
+        new_yaml = utils.yaml_safe_load(service_account_secret)
 
         service_account_key = "ServiceAccount_local-path-provisioner-service-account"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -123,7 +121,7 @@ class LocalPathProvisionerManifestProcessor(Processor):
         self.log.verbose(f"The {key} has been patched in 'data.config.json' with {config_json_oneline!r}")
 
         helperpod_yaml_str = data['helperPod.yaml']
-        helperpod_yaml = yaml.safe_load(helperpod_yaml_str)
+        helperpod_yaml = utils.yaml_safe_load(helperpod_yaml_str)
         busybox_source_image = helperpod_yaml['spec']['containers'][0]['image']
         helperpod_yaml_str = helperpod_yaml_str.replace(
             busybox_source_image, self.get_target_image(image_key='helper-pod-image'))
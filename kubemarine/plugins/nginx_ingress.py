@@ -16,7 +16,6 @@ import io
 from typing import Optional, List, Dict
 
 from textwrap import dedent
-import yaml
 
 from kubemarine.core import utils, log
 from kubemarine.core.cluster import KubernetesCluster, EnrichmentStage, enrichment
@@ -200,7 +199,7 @@ class IngressNginxManifestProcessor(Processor):
                              f"with the data from 'plugins.nginx-ingress-controller.custom_headers'")
 
     def enrich_service_account_secret(self, manifest: Manifest) -> None:
-        new_yaml = yaml.safe_load(service_account_secret)
+        new_yaml = utils.yaml_safe_load(service_account_secret)
 
         service_account_key = "ServiceAccount_ingress-nginx"
         service_account_index = manifest.all_obj_keys().index(service_account_key) \
@@ -389,7 +389,7 @@ class ExportKubernetesParser:
         item_prop = line[2:]
         val = ''
         if item_prop.startswith(f'{key}:'):
-            val = yaml.safe_load(item_prop)[key]
+            val = utils.yaml_safe_load(item_prop)[key]
 
         return val
 
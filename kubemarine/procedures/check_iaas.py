@@ -35,7 +35,7 @@ from kubemarine.core.cluster import KubernetesCluster
 from kubemarine.core.errors import KME0006
 from kubemarine.testsuite import TestSuite, TestCase, TestFailure, TestWarn
 from kubemarine.core.group import (
-    NodeConfig, NodeGroup, DeferredGroup, GroupException, GroupResultException, CollectorCallback
+    NodeConfig, NodeGroup, GroupResultException, CollectorCallback
 )
 
 _CONNECTIVITY_PORTS: Dict[str, Dict[str, Dict[str, Dict[str, List[str]]]]] = {}
@@ -49,36 +49,78 @@ def connection_ssh_connectivity(cluster: KubernetesCluster) -> None:
             raise TestFailure(e.summary, hint=e.details) from None
 
 
+def sample_ssh_latency(group: NodeGroup, samples: int) -> Dict[str, List[float]]:
+    """
+    Measure latency of `samples` sequential commands on each node. Nodes are sampled concurrently.
+
+    :return: list of measurements in milliseconds for each host
+    """
+    def sample(node: NodeGroup) -> List[float]:
+        measurements = []
+        for _ in range(samples):
+            time_start = time.time()
+            node.run("echo 1")
+            time_end = time.time()
+            measurements.append((time_end - time_start) * 1000)
+
+        return measurements
+
+    return system.sample_nodes_concurrently(group, sample)
+
+
+def get_latency_report(cluster: KubernetesCluster, host_measurements: Dict[str, List[float]]) -> List[str]:
+    report = []
+    for host, measurements in host_measurements.items():
+        report.append("%s: p50=%sms p95=%sms p99=%sms max=%sms" % (
+            cluster.get_node_name(host),
+            *(math.floor(utils.percentile(measurements, p)) for p in (50, 95, 99, 100))
+        ))
+
+    return report
+
+
 def connection_ssh_latency_single(cluster: KubernetesCluster) -> None:
     latency_cfg = static.GLOBALS['compatibility_map']['network']['connection']['latency']['single']
     with TestCase(cluster, '002',  'SSH', 'Latency - Single Thread',
                   minimal=latency_cfg['critical'],
                   recommended=latency_cfg['recommended']) as tc:
-        i = 0
-        measurements = []
         accessible_nodes = cluster.nodes['all'].get_accessible_nodes()
         if accessible_nodes.is_empty():
             return tc.success(results="Skipped")
 
-        while i < 5:
-            i += 1
-            for node in accessible_nodes.get_ordered_members_list():
-                time_start = time.time()
-                node.run("echo 1")
-                time_end = time.time()
-                diff = (time_end - time_start) * 1000
-                cluster.log.debug('Connection to %s - %sms' % (node.get_node_name(), diff))
-                measurements.append(diff)
-        average_latency = math.floor(sum(measurements) / accessible_nodes.nodes_amount() / 5)
+        host_measurements = sample_ssh_latency(accessible_nodes, latency_cfg['samples'])
+        report = get_latency_report(cluster, host_measurements)
+        for line in report:
+            cluster.log.debug('Connection to %s' % line)
+
+        measurements = [m for host_measurement in host_measurements.values() for m in host_measurement]
+        average_latency = math.floor(sum(measurements) / len(measurements))
         if average_latency > latency_cfg['critical']:
             raise TestFailure("Very high latency: %sms" % average_latency,
                               hint="A very high latency was detected between the deploy node and cluster nodes. "
-                                   "Check your network settings and status. It is necessary to reduce the latency to %sms."
-                                   % latency_cfg['critical'])
+                                   "Check your network settings and status. It is necessary to reduce the latency to %sms.\n"
+                                   % latency_cfg['critical'] + '\n'.join(report))
         if average_latency > latency_cfg['recommended']:
             raise TestWarn("High latency: %sms" % average_latency,
                            hint="The detected latency is higher than the recommended value (%sms). Check your network settings "
-                                "and status." % latency_cfg['recommended'])
+                                "and status.\n" % latency_cfg['recommended'] + '\n'.join(report))
+
+        # Nodes that are significantly slower than the rest of the fleet gate each batch of commands.
+        fleet_median = utils.percentile(measurements, 50)
+        outliers = []
+        for host, host_measurement in host_measurements.items():
+            host_median = utils.percentile(host_measurement, 50)
+            if (host_median > fleet_median * latency_cfg['outlier_factor']
+                    and host_median - fleet_median >= latency_cfg['outlier_min_difference']):
+                outliers.append(cluster.get_node_name(host))
+
+        if outliers:
+            raise TestWarn("%sms, outliers: %s" % (average_latency, len(outliers)),
+                           hint="Median latency of nodes %s is more than %s times higher than the median latency "
+                                "of all nodes (%sms). Check network and load of these nodes.\n"
+                                % (', '.join(outliers), latency_cfg['outlier_factor'], math.floor(fleet_median))
+                                + '\n'.join(report))
+
         tc.success(results="%sms" % average_latency)
 
 
@@ -114,6 +156,48 @@ def connection_ssh_latency_multiple(cluster: KubernetesCluster) -> None:
         tc.success(results="%sms" % average_latency)
 
 
+def connection_ssh_throughput(cluster: KubernetesCluster) -> None:
+    throughput_cfg = static.GLOBALS['compatibility_map']['network']['connection']['throughput']
+    with TestCase(cluster, '019', 'SSH', 'Upload Throughput',
+                  minimal=throughput_cfg['critical'],
+                  recommended=throughput_cfg['recommended']) as tc:
+        accessible_nodes = cluster.nodes['all'].get_accessible_nodes()
+        if accessible_nodes.is_empty():
+            return tc.success(results="Skipped")
+
+        size = throughput_cfg['sample_size'] * 1024
+        data = ''.join(random.choices(string.ascii_letters + string.digits, k=size))
+        remote_file = utils.get_remote_tmp_path()
+
+        def sample(node: NodeGroup) -> float:
+            time_start = time.time()
+            node.put(io.StringIO(data), remote_file)
+            time_end = time.time()
+            return float(size / 1024 / max(time_end - time_start, 0.001))
+
+        try:
+            host_throughput = system.sample_nodes_concurrently(accessible_nodes, sample)
+        finally:
+            accessible_nodes.run(f"rm -f {remote_file}", warn=True)
+
+        report = ["%s: %sKB/s" % (cluster.get_node_name(host), math.floor(throughput))
+                  for host, throughput in host_throughput.items()]
+        for line in report:
+            cluster.log.debug('Upload throughput to %s' % line)
+
+        min_throughput = math.floor(min(host_throughput.values()))
+        if min_throughput < throughput_cfg['critical']:
+            raise TestFailure("Very low throughput: %sKB/s" % min_throughput,
+                              hint="A very low upload throughput was detected between the deploy node and cluster nodes. "
+                                   "Check your network settings and status.\n" + '\n'.join(report))
+        if min_throughput < throughput_cfg['recommended']:
+            raise TestWarn("Low throughput: %sKB/s" % min_throughput,
+                           hint="The detected upload throughput is lower than the recommended value (%sKB/s). "
+                                "Check your network settings and status.\n" % throughput_cfg['recommended']
+                                + '\n'.join(report))
+        tc.success(results="%sKB/s" % min_throughput)
+
+
 def connection_sudoer_access(cluster: KubernetesCluster) -> None:
     with TestCase(cluster, '004', 'SSH', 'Sudoer Access', default_results='Access provided'):
         non_root = []
@@ -911,14 +995,8 @@ def get_mtu(cluster: KubernetesCluster) -> int:
     return mtu
 
 
-def port_connect(cluster: KubernetesCluster, port_client: str,
-                 node: DeferredGroup, payload: Tuple[str, str, bool],
-                 host_to_ip: Dict[str, str], timeout: int) -> None:
+def get_probe_target(cluster: KubernetesCluster, payload: Tuple[str, str, bool], host_to_ip: Dict[str, str]) -> str:
     target_host, port, connect_only = payload
-    cluster.log.verbose(f"Trying connection from {node.get_node_name()!r} "
-                        f"to {cluster.get_node_name(target_host)!r} by port {port}")
-
-    python_executable = cluster.nodes_context[node.get_host()]['python']['executable']
     # Do not send random stream of bytes if port is already in use,
     # and test listener is not installed.
     # Also, do not send random stream of bytes for Kubernetes managed ports,
@@ -936,8 +1014,7 @@ def port_connect(cluster: KubernetesCluster, port_client: str,
 
     # For UDP, `action` is ignored and random stream of bytes is sent anyway.
     # Currently, for 53 port we do not expect any addressee except the test listener.
-    cmd = f"{python_executable} {port_client} {action} {port} {address} {ip_version}"
-    node.run(cmd, timeout=timeout, pty=True)
+    return f"{action} {port} {address} {ip_version}"
 
 
 def get_start_listener_cmd(python_executable: str, port_listener: str) -> str:
@@ -971,22 +1048,6 @@ def get_stop_listener_cmd(port_listener: str) -> str:
            "&& if [ ! -z $pid ]; then sudo kill -9 $pid; echo \"killed pid $pid for port $port\"; fi"
 
 
-def install_client(group: DeferredGroup, proto: str, mtu: int, timeout: int) -> str:
-    check_script = utils.read_internal('resources/scripts/simple_port_client.py')
-    udp_client = utils.get_remote_tmp_path(ext='py')
-    for node in group.get_ordered_members_list():
-        rendered_script = Template(check_script).render({
-            'proto': proto,
-            'timeout': timeout,
-            'mtu': mtu,
-        })
-        node.put(io.StringIO(rendered_script), udp_client)
-
-    group.flush()
-
-    return udp_client
-
-
 def check_connect_between_all_nodes(cluster: KubernetesCluster,
                                     host_ports: Dict[str, List[Tuple[str, bool]]], host_to_ip: Dict[str, str],
                                     subnet_type: str, proto: str, mtu: int) -> Dict[str, List[str]]:
@@ -996,92 +1057,96 @@ def check_connect_between_all_nodes(cluster: KubernetesCluster,
     logger = cluster.log
     logger.debug(f"Checking {proto.upper()} connectivity between nodes...")
 
-    group = get_python_group(cluster, True).get_accessible_nodes().new_defer()
-    timeout = static.GLOBALS['connection']['defaults']['timeout']
-    port_client = install_client(group, proto, mtu, timeout)
-
+    group = get_python_group(cluster, True).get_accessible_nodes()
     connectivity_ports = get_ports_connectivity(cluster, proto).get(subnet_type, {}).get('output', {})
 
     # Check connectivity from all nodes to each listened port of each specified host.
-    connectivity_payloads: Dict[str, OrderedSet[Tuple[str, str, bool]]] = {}
-
-    def remove_payload(host: str, payload: Tuple[str, str, bool]) -> None:
-        payloads = connectivity_payloads.get(host)
-        if payloads is None:
-            return
-
-        payloads.discard(payload)
-        if not payloads:
-            del connectivity_payloads[host]
-
-    for node in group.get_ordered_members_list():
-        host = node.get_host()
-        output_ports = {port for role in node.get_config()['roles'] for port in connectivity_ports.get(role, [])}
+    connectivity_payloads: Dict[str, List[Tuple[str, str, bool]]] = {}
+    for node in group.get_ordered_members_configs_list():
+        host = node['connect_to']
+        output_ports = {port for role in node['roles'] for port in connectivity_ports.get(role, [])}
         for target_host, listen_ports in host_ports.items():
             if host == target_host:
                 continue
 
             for listen_port, in_use in listen_ports:
                 if listen_port in output_ports:
-                    connectivity_payloads.setdefault(host, OrderedSet[Tuple[str, str, bool]]())\
-                        .add((target_host, listen_port, in_use))
+                    connectivity_payloads.setdefault(host, []).append((target_host, listen_port, in_use))
 
-    failures = 0
-    failures_limit = 10
-    failed_ports: Dict[str, OrderedSet[str]] = {}
+    failed_payloads = nodes_ports_connect(cluster, connectivity_payloads, host_to_ip, proto, mtu)
 
-    while connectivity_payloads:
-        payloads_chunk: Dict[str, Tuple[str, str, bool]] = {}
-        for node in group.get_ordered_members_list():
-            host = node.get_host()
-            payloads = connectivity_payloads.get(host)
-            if payloads is None:
-                continue
-
-            # Try making unique target (host, port) pairs in each chunk
-            payload = next((p for p in payloads if p not in payloads_chunk.values()), payloads[0])
-            remove_payload(host, payload)
-            payloads_chunk[host] = payload
-
-        failed_payloads = nodes_ports_connect(cluster, port_client, payloads_chunk, host_to_ip, timeout)
-        if failed_payloads:
-            failures += 1
-            for host, payload in failed_payloads.items():
-                target_host, listen_port, _ = payload
-                cluster.log.error(f"Subnet connectivity test failed from '{cluster.get_node_name(host)}' "
-                                  f"to '{cluster.get_node_name(target_host)}' by {proto.upper()} port {listen_port}")
-
-                failed_ports.setdefault(target_host, OrderedSet[str]()).add(listen_port)
-
-                # If at least one node failed to connect to the given target host and port,
-                # no need to attempt to do that from other nodes
-                for host in group.get_hosts():
-                    remove_payload(host, payload)
+    failed_ports: Dict[str, OrderedSet[str]] = {}
+    for host, payloads in failed_payloads.items():
+        for target_host, listen_port, _ in payloads:
+            cluster.log.error(f"Subnet connectivity test failed from '{cluster.get_node_name(host)}' "
+                              f"to '{cluster.get_node_name(target_host)}' by {proto.upper()} port {listen_port}")
 
-        if failures == failures_limit:
-            logger.debug("Exceeded limit of failed connectivity checks. Further check is skipped.")
-            break
+            failed_ports.setdefault(target_host, OrderedSet[str]()).add(listen_port)
 
     return {host: list(ports) for host, ports in failed_ports.items()}
 
 
-def nodes_ports_connect(cluster: KubernetesCluster, port_client: str,
-                        payloads: Dict[str, Tuple[str, str, bool]],
-                        host_to_ip: Dict[str, str], timeout: int) -> Dict[str, Tuple[str, str, bool]]:
-    group = cluster.make_group(payloads).new_defer()
+def nodes_ports_connect(cluster: KubernetesCluster, payloads: Dict[str, List[Tuple[str, str, bool]]],
+                        host_to_ip: Dict[str, str], proto: str, mtu: int) -> Dict[str, List[Tuple[str, str, bool]]]:
+    """
+    Probe all the payloads at once.
+    Each node receives the probe program together with the list of its targets,
+    and connects to the targets concurrently with bounded parallelism.
+    If too many targets of the node failed, the remaining targets of the node are skipped.
 
-    for node in group.get_ordered_members_list():
-        host = node.get_host()
-        payload = payloads[host]
-        port_connect(cluster, port_client, node, payload, host_to_ip, timeout)
+    :return: failed payloads for each node
+    """
+    if not payloads:
+        return {}
 
-    failed_payloads = {}
-    try:
-        group.flush()
-    except GroupException as e:
-        cluster.log.verbose(e)
-        excepted_hosts = e.get_excepted_hosts_list()
-        failed_payloads = {host: payload for host, payload in payloads.items() if host in excepted_hosts}
+    timeout = static.GLOBALS['connection']['defaults']['timeout']
+    parallelism = static.GLOBALS['compatibility_map']['network']['connectivity']['parallelism']
+    failures_limit = 10
+    rendered_script = Template(utils.read_internal('resources/scripts/mesh_port_client.py')).render({
+        'proto': proto,
+        'timeout': timeout,
+        'mtu': mtu,
+        'parallelism': parallelism,
+        'failures_limit': failures_limit,
+    })
+    port_client = utils.get_remote_tmp_path(ext='py')
+    targets_file = utils.get_remote_tmp_path(ext='txt')
+
+    group = cluster.make_group(payloads)
+    collector = CollectorCallback(cluster)
+    with group.new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            host = node.get_host()
+            targets = ''.join(get_probe_target(cluster, payload, host_to_ip) + '\n' for payload in payloads[host])
+            node.put(io.StringIO(rendered_script), port_client)
+            node.put(io.StringIO(targets), targets_file)
+
+            # Each probe may take up to the timeout for connect, and for send/receive operations.
+            waves = math.ceil(len(payloads[host]) / parallelism)
+            python_executable = cluster.nodes_context[host]['python']['executable']
+            node.run(f"{python_executable} {port_client} {targets_file}; rm -f {port_client} {targets_file}",
+                     timeout=timeout * 3 * (waves + 1), callback=collector)
+
+    fail_ptrn = re.compile(r'^FAIL (\S+) (\d+) (.*)$', re.M)
+    skipped_ptrn = re.compile(r'^SKIPPED (\d+)$', re.M)
+    failed_payloads: Dict[str, List[Tuple[str, str, bool]]] = {}
+    for host, result in collector.result.items():
+        if not result.stdout.rstrip().endswith('DONE'):
+            raise GroupResultException(collector.result)
+
+        skipped = skipped_ptrn.search(result.stdout)
+        if skipped is not None:
+            cluster.log.debug(f"Exceeded limit of failed connectivity checks from {cluster.get_node_name(host)!r}. "
+                              f"Further check of {skipped.group(1)} targets is skipped.")
+
+        failed_targets = {(address, port): reason for address, port, reason in fail_ptrn.findall(result.stdout)}
+        for payload in payloads[host]:
+            target_host, port, _ = payload
+            reason = failed_targets.get((host_to_ip[target_host], port))
+            if reason is not None:
+                cluster.log.verbose(f"Connection from {cluster.get_node_name(host)!r} "
+                                    f"to {cluster.get_node_name(target_host)!r} by port {port} failed: {reason}")
+                failed_payloads.setdefault(host, []).append(payload)
 
     return failed_payloads
 
@@ -1478,6 +1543,7 @@ tasks = OrderedDict({
             'single': connection_ssh_latency_single,
             'multiple': connection_ssh_latency_multiple
         },
+        'throughput': connection_ssh_throughput,
         'sudoer_access': connection_sudoer_access,
     },
     'network': {
@@ -14,15 +14,15 @@
 # limitations under the License.
 import io
 import ipaddress
+import json
 import sys
 import time
 from collections import OrderedDict
 import re
 from textwrap import dedent
-from typing import List, Dict, Optional, Union, cast, Iterable
+from typing import List, Dict, Optional, Union, cast, Iterable, Tuple
 
 import yaml
-import ruamel.yaml
 from deepdiff import DeepDiff  # type: ignore[import-untyped]
 
 from ordered_set import OrderedSet
@@ -32,7 +32,9 @@ from kubemarine import (
     plugins, modprobe, admission
 )
 from kubemarine.core.cluster import KubernetesCluster
-from kubemarine.core.group import NodeGroup, CollectorCallback, GroupResultException
+from kubemarine.core.group import (
+    NodeGroup, DeferredGroup, CollectorCallback, GroupResultException, RunnersGroupResult
+)
 from kubemarine.cri import containerd
 from kubemarine.kubernetes import components
 from kubemarine.plugins import calico, builtin, manifest
@@ -398,6 +400,9 @@ def thirdparties_hashes(cluster: KubernetesCluster) -> None:
     If thirdparty is an archive, then archive files hashes are also verified.
     If hash is not specified, then thirdparty is skipped.
     If there is no thirdparties with hashes, then warning is shown.
+
+    Hashes of the installed files are taken from the on-node registry of thirdparties if the files are not changed.
+    Sources are downloaded only if sha1 is not specified in the inventory.
     """
     with TestCase(cluster, '212', "Thirdparties", "Hashes") as tc:
         successful = []
@@ -419,8 +424,11 @@ def thirdparties_hashes(cluster: KubernetesCluster) -> None:
             is_curl = config['source'][:4] == 'http' and '://' in config['source'][4:8]
             expected_sha = None
 
+            if is_curl and config.get('sha1') is not None:
+                # Expected sha is pinned in the inventory, no need to download the source
+                cluster.log.verbose(f"Thirdparty {path} has sha {config['sha1']} specified in the inventory")
             # Get sha from source, if it can be downloaded
-            if is_curl:
+            elif is_curl:
                 cluster.log.verbose(f"Thirdparty {path} doesn't have default sha, download it...")
                 # Create tmp dir for loading thirdparty without default sha
                 random_dir = utils.get_remote_tmp_path()
@@ -455,30 +463,38 @@ def thirdparties_hashes(cluster: KubernetesCluster) -> None:
                 script = utils.read_internal(config['source'])
                 expected_sha = utils.get_stream_sha1(io.BytesIO(script.encode('utf-8')))
 
-            recommended_sha = thirdparties.get_thirdparty_recommended_sha(path, cluster)
-            if recommended_sha is not None and recommended_sha != expected_sha:
-                warnings.append(f"{path} source contains not recommended thirdparty version for used kubernetes version")
-
             if config.get("sha1", expected_sha) != expected_sha and expected_sha is not None:
                 broken.append("Given sha is not equal with actual sha from source for %s" % path)
 
             expected_sha = config.get("sha1", expected_sha)
 
+            recommended_sha = thirdparties.get_thirdparty_recommended_sha(path, cluster)
+            if recommended_sha is not None and recommended_sha != expected_sha:
+                warnings.append(f"{path} source contains not recommended thirdparty version for used kubernetes version")
+
             if expected_sha is None:
                 cluster.log.verbose(f"Can`t get expected sha for {path}, skip it")
                 # Skip checking sha if something went wrong or this sha can't be loaded
                 continue
 
-            results = group.sudo(f'openssl sha1 {path} | sed "s/^.* //"', warn=True)
+            results = group.sudo(thirdparties.get_registry_lookup_command(path), warn=True)
             actual_sha: Optional[str] = None
             first_host: Optional[str] = None
+            # Files of the archive that are known to be unchanged since installation
+            hosts_files: Dict[str, Dict[str, Tuple[str, str]]] = {}
             # Searching actual SHA, if possible
             for host, result in results.items():
-                if result.failed:
+                files = thirdparties.parse_registry_lookup(result.stdout) if not result.failed else {}
+                if path not in files:
                     broken.append(f'failed to get {path} sha {host}: {result.stderr}')
                     continue
 
-                found_sha = result.stdout.strip()
+                found_sha, status = files[path]
+                if status == thirdparties.REGISTRY_MISSING:
+                    broken.append(f'{path} is missing on host {host}')
+                    continue
+
+                hosts_files[host] = files
                 if actual_sha is None:
                     actual_sha = found_sha
                     first_host = host
@@ -499,9 +515,27 @@ def thirdparties_hashes(cluster: KubernetesCluster) -> None:
             # SHA is correct, now check if it is an archive and if it does, then also check SHA for archive content
             if 'unpack' in config:
                 unpack_dir = config['unpack']
+                # Archive content is verified by the registry if neither the archive nor the unpacked files
+                # were changed since installation. Otherwise, archive files are compared one by one.
+                # Files that are recorded in the registry, but are deleted, do not need verification.
+                hosts_to_verify: List[str] = []
+                for host, files in hosts_files.items():
+                    missing_files = [file for file, (_, status) in files.items()
+                                     if status == thirdparties.REGISTRY_MISSING]
+                    if missing_files:
+                        broken.extend(f'file {file} unpacked from archive {path} is missing on host {host}'
+                                      for file in missing_files)
+                    elif any(status != thirdparties.REGISTRY_CACHED for _, status in files.values()):
+                        hosts_to_verify.append(host)
+
+                if not hosts_to_verify:
+                    cluster.log.verbose(f"Files of archive {path} are not changed since installation")
+                    continue
+
+                verify_group = cluster.make_group(hosts_to_verify)
                 extension = path.split('.')[-1]
                 if extension == 'zip': 
-                    res = group.sudo(
+                    res = verify_group.sudo(
                                  # for each file in archive
                                  ' unzip -qq -l %s | awk \'NF > 3 { print $4 }\' | while read file_name; do '
                                  '  echo ${file_name} '  # print   1) filename
@@ -509,7 +543,7 @@ def thirdparties_hashes(cluster: KubernetesCluster) -> None:
                                  '    $(sudo openssl sha1 %s/${file_name} | cut -d\\  -f2); '  # 3) sha unpacked
                                  'done' % (path, path, unpack_dir)) 
                 else :
-                    res = group.sudo('tar tf %s | grep -vw "./" | while read file_name; do '  # for each file in archive
+                    res = verify_group.sudo('tar tf %s | grep -vw "./" | while read file_name; do '  # for each file in archive
                                  '  echo ${file_name} '  # print   1) filename
                                  '    $(sudo tar xfO %s ${file_name} | openssl sha1 | cut -d\\  -f2) '  # 2) sha archive
                                  '    $(sudo openssl sha1 %s/${file_name} | cut -d\\  -f2); '  # 3) sha unpacked
@@ -803,30 +837,35 @@ def kubernetes_audit_policy_configuration(cluster: KubernetesCluster) -> None:
 
 def nodes_pid_max(cluster: KubernetesCluster) -> None:
     with TestCase(cluster, '202', "Nodes", "Nodes pid_max correctly installed") as tc:
-        control_plane = cluster.nodes['control-plane'].get_any_member()
-        yaml = ruamel.yaml.YAML()
+        group = cluster.make_group_from_roles(['control-plane', 'worker'])
+        max_pods = {node_description['metadata']['name']: int(node_description['status']['capacity']['pods'])
+                    for node_description in get_nodes_description(cluster)['items']}
+
+        collector = CollectorCallback(cluster)
+        with group.new_executor() as exe:
+            for defer in exe.group.get_ordered_members_list():
+                defer.sudo("cat /proc/sys/kernel/pid_max", callback=collector)
+                defer.sudo("cat /var/lib/kubelet/config.yaml", callback=collector)
+
         nodes_failed_pid_max_check = {}
         nodes_warned_pid_max_check = {}
-        for node in cluster.make_group_from_roles(['control-plane', 'worker']).get_ordered_members_list():
+        for node in group.get_ordered_members_list():
             node_name = node.get_node_name()
+            if node_name not in max_pods:
+                raise Exception(f"Node {node_name!r} is not found in the Kubernetes cluster")
 
-            node_info = control_plane.sudo("kubectl get node %s -o yaml" % node_name).get_simple_out()
-            config = yaml.load(node_info)
-            max_pods = int(config['status']['capacity']['pods'])
-
-            pid_max = int(node.sudo("cat /proc/sys/kernel/pid_max").get_simple_out())
-
-            kubelet_config = node.sudo("cat /var/lib/kubelet/config.yaml").get_simple_out()
-            config = yaml.load(kubelet_config)
+            pid_max_result, kubelet_config_result = collector.results[node.get_host()]
+            pid_max = int(pid_max_result.stdout.strip())
+            config = utils.yaml_safe_load(kubelet_config_result.stdout.strip())
 
             if 'podPidsLimit' in config:
                 pod_pids_limit = int(config['podPidsLimit'])
 
                 # we need limited podPidsLimit to avoid PIDs exhaustion
                 if pod_pids_limit != -1: 
-                    required_pid_max = max_pods * pod_pids_limit + 2048
+                    required_pid_max = max_pods[node_name] * pod_pids_limit + 2048
                     cluster.log.debug("Current values:\n maxPods = %s \n podPidsLimit = %s \n pid_max = %s"
-                                  % (max_pods, pod_pids_limit, pid_max))
+                                  % (max_pods[node_name], pod_pids_limit, pid_max))
                     cluster.log.debug("Required pid_max for current kubelet configuration is %s for node '%s'"
                                   % (required_pid_max, node_name))
                     inventory_pid_max = cast(int, sysctl.get_parameter(cluster, node, 'kernel.pid_max'))
@@ -864,6 +903,68 @@ def nodes_pid_max(cluster: KubernetesCluster) -> None:
         tc.success(results="pid_max correctly installed on all nodes")
 
 
+def get_system_snapshot(cluster: KubernetesCluster) -> Dict[str, RunnersGroupResult]:
+    """
+    Collects raw system state of the nodes for the system and security tests.
+    All the state is collected from all nodes in a single batched round-trip
+    and is cached for the lifetime of the cluster object.
+
+    :param cluster: KubernetesCluster object
+    :return: results of the commands for relevant nodes, identified by the name of the state
+    """
+    snapshot = cluster.system_snapshot
+    if snapshot:
+        return snapshot
+
+    rhel_hosts = cluster.nodes['all'].get_subgroup_with_os(['rhel', 'rhel8', 'rhel9']).get_hosts()
+    debian_hosts = cluster.nodes['all'].get_subgroup_with_os('debian').get_hosts()
+    audit_hosts = cluster.make_group_from_roles(['control-plane', 'worker']).get_hosts()
+
+    collectors: Dict[str, CollectorCallback] = {}
+
+    def collect(node: DeferredGroup, name: str, cmd: str) -> None:
+        node.sudo(cmd, warn=True, callback=collectors.setdefault(name, CollectorCallback(cluster)))
+
+    cluster.log.debug("Collecting system state of the nodes...")
+    with cluster.nodes['all'].new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            host = node.get_host()
+            collect(node, 'swap', system.get_swap_status_cmd())
+            collect(node, 'firewalld', system.get_firewalld_status_cmd())
+            collect(node, 'lsmod', 'lsmod')
+            collect(node, 'modprobe_config', f'cat {modprobe.predefined_file_path}')
+            collect(node, 'sysctl', 'sysctl -a')
+            if host in audit_hosts:
+                collect(node, 'audit', audit.get_audit_rules_cmd(cluster, host))
+            if host in rhel_hosts:
+                collect(node, 'selinux', selinux.get_selinux_status_cmd())
+            if host in debian_hosts:
+                collect(node, 'apparmor_enabled', 'aa-enabled')
+                collect(node, 'apparmor_status', apparmor.get_status_cmd())
+
+    snapshot.update({name: collector.result for name, collector in collectors.items()})
+    return snapshot
+
+
+def get_system_state(cluster: KubernetesCluster, group: NodeGroup, name: str, warn: bool = False) \
+        -> RunnersGroupResult:
+    """
+    Returns the results of the system snapshot for the specified state and group of nodes.
+
+    :param cluster: KubernetesCluster object
+    :param group: group of nodes to return the results for
+    :param name: name of the state, see `get_system_snapshot`
+    :param warn: if false, failure of the command on any of the nodes is raised
+    :return: results of the command
+    """
+    snapshot = get_system_snapshot(cluster)[name]
+    result = RunnersGroupResult(cluster, {host: snapshot[host] for host in group.get_hosts()})
+    if not warn and result.is_any_failed():
+        raise GroupResultException(result)
+
+    return result
+
+
 def verify_selinux_status(cluster: KubernetesCluster) -> None:
     """
     This method is a test, which checks the status of Selinux. It must be `enforcing`. It may be `permissive`, but must
@@ -880,7 +981,8 @@ def verify_selinux_status(cluster: KubernetesCluster) -> None:
             selinux.is_config_valid(group,
                                     state=selinux.get_expected_state(cluster.inventory),
                                     policy=selinux.get_expected_policy(cluster.inventory),
-                                    permissive=selinux.get_expected_permissive(cluster.inventory))
+                                    permissive=selinux.get_expected_permissive(cluster.inventory),
+                                    result=get_system_state(cluster, group, 'selinux'))
         cluster.log.debug(selinux_result)
         enforcing_ips = []
         permissive_ips = []
@@ -938,7 +1040,8 @@ def verify_selinux_config(cluster: KubernetesCluster) -> None:
             selinux.is_config_valid(group,
                                     state=selinux.get_expected_state(cluster.inventory),
                                     policy=selinux.get_expected_policy(cluster.inventory),
-                                    permissive=selinux.get_expected_permissive(cluster.inventory))
+                                    permissive=selinux.get_expected_permissive(cluster.inventory),
+                                    result=get_system_state(cluster, group, 'selinux'))
         cluster.log.debug(selinux_result)
         if selinux_configured:
             tc.success(results='valid')
@@ -957,7 +1060,8 @@ def verify_firewalld_status(cluster: KubernetesCluster) -> None:
     """
     with TestCase(cluster, '215', "Security", "Firewalld status") as tc:
         group = cluster.nodes['all']
-        firewalld_disabled, firewalld_result = system.is_firewalld_disabled(group)
+        firewalld_disabled, firewalld_result = system.is_firewalld_disabled(
+            group, get_system_state(cluster, group, 'firewalld', warn=True))
         cluster.log.debug(firewalld_result)
         if firewalld_disabled:
             tc.success(results='disabled')
@@ -975,22 +1079,24 @@ def verify_time_sync(cluster: KubernetesCluster) -> None:
     :return: None
     """
     with TestCase(cluster, '218', "System", "Time difference") as tc:
-        group = cluster.nodes['all']
-        current_node_time, nodes_timestamp, time_diff = system.get_nodes_time(group)
-        cluster.log.verbose('Current node time: %s' % current_node_time)
-        cluster.log.verbose('Time difference: %s' % time_diff)
-        cluster.log.verbose('Nodes time details:')
-        for host, timestamp in nodes_timestamp.items():
-            cluster.log.verbose(' - %s: %s' % (host, timestamp))
-
-        if time_diff > cluster.globals['nodes']['max_time_difference']:
-            raise TestWarn("%sms" % time_diff,
+        offsets = system.measure_nodes_clock_offset(cluster.nodes['all'])
+        time_diff, uncertainty = system.get_clock_skew(offsets)
+        cluster.log.verbose('Nodes clock offset relative to the deployer:')
+        for host, (offset, offset_uncertainty) in offsets.items():
+            cluster.log.verbose(' - %s: %.1fms ± %.1fms' % (cluster.get_node_name(host), offset, offset_uncertainty))
+
+        results = "%.0fms ± %.0fms" % (time_diff, uncertainty)
+        max_time_difference = cluster.globals['nodes']['max_time_difference']
+        if time_diff - uncertainty > max_time_difference:
+            raise TestWarn(results,
                            hint=f"The time difference between nodes is too large, this can lead to incorrect "
                                 f"behavior of Kubernetes and services. To fix this problem, run the NTP configuring "
-                                f"task on all nodes with the correct parameters. It is also worth paying attention to "
-                                f"the delay between the deployed node and all the others - too much delay can lead to "
-                                f"incorrect time measurements.")
-        tc.success(results="%sms" % time_diff)
+                                f"task on all nodes with the correct parameters.")
+        if time_diff + uncertainty > max_time_difference:
+            raise TestWarn(results,
+                           hint=f"The time difference between nodes cannot be measured precisely enough "
+                                f"because of too large delay between the deployer and the nodes.")
+        tc.success(results=results)
 
 
 def verify_swap_state(cluster: KubernetesCluster) -> None:
@@ -1002,7 +1108,7 @@ def verify_swap_state(cluster: KubernetesCluster) -> None:
     """
     with TestCase(cluster, '216', "System", "Swap state") as tc:
         group = cluster.nodes['all']
-        swap_disabled, swap_result = system.is_swap_disabled(group)
+        swap_disabled, swap_result = system.is_swap_disabled(group, get_system_state(cluster, group, 'swap', warn=True))
         cluster.log.debug(swap_result)
         if swap_disabled:
             tc.success(results='disabled')
@@ -1022,7 +1128,10 @@ def verify_modprobe_rules(cluster: KubernetesCluster) -> None:
     """
     with TestCase(cluster, '217', "System", "Modprobe rules") as tc:
         group = cluster.nodes['all']
-        modprobe_valid, _, modprobe_result = modprobe.is_modprobe_valid(group)
+        modprobe_valid, _, modprobe_result = modprobe.is_modprobe_valid(
+            group,
+            lsmod_result=get_system_state(cluster, group, 'lsmod', warn=True),
+            config_result=get_system_state(cluster, group, 'modprobe_config', warn=True))
         cluster.log.debug(modprobe_result)
         if modprobe_valid:
             tc.success(results='valid')
@@ -1043,7 +1152,7 @@ def verify_sysctl_config(cluster: KubernetesCluster) -> None:
     """
     with TestCase(cluster, '232', "System", "Kernel Parameters") as tc:
         group = cluster.nodes['all']
-        sysctl_valid = sysctl.is_valid(group)
+        sysctl_valid = sysctl.is_valid(group, get_system_state(cluster, group, 'sysctl'))
         if sysctl_valid:
             cluster.log.debug("Required kernel parameters are presented")
             tc.success(results='valid')
@@ -1064,7 +1173,8 @@ def verify_system_audit_rules(cluster: KubernetesCluster) -> None:
     """
     with TestCase(cluster, '231', "System", "Audit Daemon Rules") as tc:
         group = cluster.make_group_from_roles(['control-plane', 'worker'])
-        rules_valid, auditctl_results = audit.audit_rules_valid(group)
+        rules_valid, auditctl_results = audit.audit_rules_valid(
+            group, result=get_system_state(cluster, group, 'audit'))
         cluster.log.debug(auditctl_results)
         if rules_valid:
             tc.success(results='valid')
@@ -1100,16 +1210,26 @@ def container_runtime_configuration_check(cluster: KubernetesCluster) -> None:
         kubernetes_nodes = cluster.make_group_from_roles(['control-plane', 'worker'])
         actual_configs, actual_registries = containerd.fetch_containerd_config(kubernetes_nodes)
 
+        # Nodes with identical configuration share the same parsed objects. Compare each distinct object only once.
+        config_diffs: Dict[int, DeepDiff] = {}
+        registries_diffs: Dict[int, DeepDiff] = {}
+        no_registries: Dict[str, dict] = {}
+
         success = True
         for node in kubernetes_nodes.get_ordered_members_list():
             actual_config = actual_configs[node.get_host()]
-            diff = DeepDiff(actual_config, expected_config)
+            if id(actual_config) not in config_diffs:
+                config_diffs[id(actual_config)] = DeepDiff(actual_config, expected_config)
+            diff = config_diffs[id(actual_config)]
             if diff:
                 cluster.log.debug(f"Configuration of containerd is not actual on {node.get_node_name()} node")
                 utils.print_diff(cluster.log, diff)
                 success = False
 
-            diff = DeepDiff(actual_registries.get(node.get_host(), {}), expected_registries)
+            actual_registry = actual_registries.get(node.get_host(), no_registries)
+            if id(actual_registry) not in registries_diffs:
+                registries_diffs[id(actual_registry)] = DeepDiff(actual_registry, expected_registries)
+            diff = registries_diffs[id(actual_registry)]
             if diff:
                 cluster.log.debug(f"Configuration of containerd registries is not actual on {node.get_node_name()} node")
                 utils.print_diff(cluster.log, diff)
@@ -1139,15 +1259,16 @@ def control_plane_configuration_status(cluster: KubernetesCluster) -> None:
     '''
     with TestCase(cluster, '220', "Control plane", "configuration status") as tc:
         messages = []
+        manifest_diffs = components.compare_all_manifests(cluster)
 
         cluster.log.debug("Checking consistency with kubeadm-config ConfigMap")
-        failed_nodes = _control_plane_compare_manifests(cluster, with_inventory=False)
+        failed_nodes = _control_plane_compare_manifests(cluster, manifest_diffs[False])
         if failed_nodes:
             messages.append(f"Static pod manifests are not consistent with kubeadm-config ConfigMap "
                             f"on control-planes {', '.join(failed_nodes)}")
 
         cluster.log.debug("Checking consistency with inventory")
-        failed_nodes = _control_plane_compare_manifests(cluster, with_inventory=True)
+        failed_nodes = _control_plane_compare_manifests(cluster, manifest_diffs[True])
         if failed_nodes:
             messages.append(f"Static pod manifests are not consistent with inventory "
                             f"on control-planes {', '.join(failed_nodes)}")
@@ -1163,8 +1284,8 @@ def control_plane_configuration_status(cluster: KubernetesCluster) -> None:
             raise TestFailure('invalid', hint=yaml.safe_dump(messages))
 
 
-def _control_plane_compare_manifests(cluster: KubernetesCluster, *, with_inventory: bool) -> List[str]:
-    manifest_diffs = components.compare_manifests(cluster, with_inventory=with_inventory)
+def _control_plane_compare_manifests(cluster: KubernetesCluster,
+                                     manifest_diffs: Dict[str, Dict[str, Optional[str]]]) -> List[str]:
     failed_nodes = OrderedSet[str]()
     failed_manifests = set()
     for host, manifests in manifest_diffs.items():
@@ -1203,15 +1324,16 @@ def control_plane_health_status(cluster: KubernetesCluster) -> None:
                 static_pod_names.append(static_pod + '-' + control_plane.get_node_name())
 
         first_control_plane = cluster.nodes['control-plane'].get_first_member()
+        # kubeadm labels all control plane static pods with tier=control-plane
+        result = first_control_plane.sudo("kubectl get pods -n kube-system -l tier=control-plane -o json")
+        pods = {pod['metadata']['name']: pod for pod in json.loads(result.get_simple_out())['items']}
+
         not_found_pod = []
         for static_pod_name in static_pod_names:
-            results = first_control_plane.sudo(f"kubectl get pod -n kube-system -oyaml {static_pod_name}", warn=True)
-            exit_code = list(results.values())[0].exited
-            if exit_code == 0:
-                result = yaml.safe_load(results.get_simple_out())
-                if result['status']['containerStatuses'][0]['state'].get('running'):
-                    break
-            not_found_pod.append(static_pod_name)
+            container_statuses = pods.get(static_pod_name, {}).get('status', {}).get('containerStatuses', [])
+            if not container_statuses \
+                    or not all(status.get('state', {}).get('running') for status in container_statuses):
+                not_found_pod.append(static_pod_name)
 
         if len(not_found_pod) == 0:
             tc.success(results='valid')
@@ -1233,9 +1355,9 @@ def default_services_configuration_status(cluster: KubernetesCluster) -> None:
     '''
     with TestCase(cluster, '222', "Default services", "configuration status") as tc:
         first_control_plane = cluster.nodes['control-plane'].get_first_member()
-        original_coredns_cm = yaml.safe_load(generate_configmap(cluster.inventory))
+        original_coredns_cm = utils.yaml_safe_load(generate_configmap(cluster.inventory))
         result = first_control_plane.sudo('kubectl get cm coredns -n kube-system -oyaml')
-        coredns_cm = yaml.safe_load(result.get_simple_out())
+        coredns_cm = utils.yaml_safe_load(result.get_simple_out())
         diff = utils.get_unified_diff(
             coredns_cm['data']['Corefile'], original_coredns_cm['data']['Corefile'],
             fromfile='kube-system/configmaps/coredns/data/Corefile',
@@ -1393,7 +1515,7 @@ def _check_calico_env(cluster: KubernetesCluster, manifest_: manifest.Manifest)
         expected_obj = manifest_.get_obj(f"{type_}_{service_name}", patch=False)
         buf = io.StringIO()
         utils.yaml_structure_preserver().dump(expected_obj, buf)
-        expected_obj = yaml.safe_load(buf.getvalue())
+        expected_obj = utils.yaml_safe_load(buf.getvalue())
         expected_env = get_envs(expected_obj)
 
         diff = DeepDiff(actual_env, expected_env)
@@ -1428,8 +1550,8 @@ def calico_config_check(cluster: KubernetesCluster) -> None:
 
         # Check calico ipam config of CNI config
         result = first_control_plane.sudo(f"kubectl get cm calico-config -n kube-system -oyaml")
-        calico_config = yaml.safe_load(result.get_simple_out())
-        cni_network_config = yaml.safe_load(calico_config["data"]["cni_network_config"])
+        calico_config = utils.yaml_safe_load(result.get_simple_out())
+        cni_network_config = utils.yaml_safe_load(calico_config["data"]["cni_network_config"])
         ip = cluster.inventory['services']['kubeadm']['networking']['podSubnet'].split('/')[0]
         if utils.isipv(ip, [4]):
             ipam_config = cluster.inventory["plugins"]["calico"]["cni"]["ipam"]["ipv4"]
@@ -1613,7 +1735,7 @@ def geo_check(cluster: KubernetesCluster) -> None:
         control_plane_node = cluster.nodes['control-plane'].get_first_member()
 
         svc_result = control_plane_node.sudo("kubectl get svc -n %s %s -o yaml" % (namespace, service)).get_simple_out()
-        svc = yaml.safe_load(io.StringIO(svc_result))
+        svc = utils.yaml_safe_load(io.StringIO(svc_result))
         ip = svc["spec"]["clusterIP"]
         port = svc["spec"]["ports"][0]["port"]
 
@@ -1624,7 +1746,7 @@ def geo_check(cluster: KubernetesCluster) -> None:
         peers_result = cluster.nodes['control-plane'].get_first_member().\
             sudo(f'curl http://{ip}:{port}/peers/status').get_simple_out()
 
-        peers = yaml.safe_load(io.StringIO(peers_result))
+        peers = utils.yaml_safe_load(io.StringIO(peers_result))
         if len(peers) == 0:
             raise TestFailure("configuration error", hint="geo-monitor instance has no peers.")
 
@@ -1688,7 +1810,7 @@ def verify_apparmor_status(cluster: KubernetesCluster) -> None:
         group = cluster.nodes['all'].get_subgroup_with_os('debian')
         if group.is_empty():
             return tc.success("No Debian nodes found")
-        results = group.sudo("aa-enabled")
+        results = get_system_state(cluster, group, 'apparmor_enabled')
         enabled_nodes: List[str] = []
         invalid_nodes: List[str] = []
         for host, item in results.items():
@@ -1717,7 +1839,8 @@ def verify_apparmor_config(cluster: KubernetesCluster) -> None:
             return tc.success("No Debian nodes found")
         expected_profiles = cluster.inventory['services']['kernel_security'].get('apparmor', {})
         if expected_profiles:
-            apparmor_configured = apparmor.is_state_valid(group, expected_profiles)
+            apparmor_configured = apparmor.is_state_valid(
+                group, expected_profiles, get_system_state(cluster, group, 'apparmor_status'))
             if apparmor_configured:
                 cluster.log.verbose(f"Apparmor is configured properly on cluster")
                 tc.success(results='valid')
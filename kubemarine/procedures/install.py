@@ -14,9 +14,10 @@
 # limitations under the License.
 
 
+import functools
 from collections import OrderedDict
 from types import FunctionType
-from typing import Callable, List, Dict, cast
+from typing import Callable, List, Dict, Sequence, cast
 
 from kubemarine.core.cluster import KubernetesCluster
 from kubemarine.core.errors import KME
@@ -24,8 +25,9 @@ from kubemarine import (
     system, sysctl, haproxy, keepalived, kubernetes, plugins,
     kubernetes_accounts, selinux, thirdparties, audit, coredns, cri, packages, apparmor, modprobe
 )
-from kubemarine.core import flow, utils, summary
+from kubemarine.core import flow, utils, summary, journal
 from kubemarine.core.group import NodeGroup, RunnersGroupResult, CollectorCallback
+from kubemarine.core.executor import BatchPolicy
 from kubemarine.core.resources import DynamicResources
 
 
@@ -65,6 +67,48 @@ def _applicable_for_new_nodes_with_roles(*roles: str) -> Callable[[DECORATED_GRO
     return roles_wrapper
 
 
+def _checkpointed(*, single_batch: bool = False) -> Callable[[DECORATED_GROUP_CALLABLE], DECORATED_GROUP_CALLABLE]:
+    """
+    Decorator to annotate installation methods that perform the task on each node independently of other nodes.
+    The nodes that completed the task are recorded to the checkpoints,
+    and are skipped if the procedure is resumed. See `flow.run_with_nodes_checkpoints`.
+    The decorator should be applied before `_applicable_for_new_nodes_with_roles`.
+
+    :param single_batch: the annotated method performs all remote commands in a single batch.
+    :return: new wrapping method.
+    """
+    def checkpoint_wrapper(fn: DECORATED_GROUP_CALLABLE) -> DECORATED_GROUP_CALLABLE:
+        @functools.wraps(fn)
+        def group_wrapper(group: NodeGroup) -> None:
+            flow.run_with_nodes_checkpoints(group, fn, single_batch=single_batch)
+
+        return group_wrapper
+
+    return checkpoint_wrapper
+
+
+def _journaled(name: str, *paths: Sequence[str]) -> Callable[[DECORATED_GROUP_CALLABLE], DECORATED_GROUP_CALLABLE]:
+    """
+    Decorator to annotate installation methods, whose result for each node depends only on the specified
+    sections of the inventory.
+    If the journal of the tasks is enabled, the annotated method is run only on the nodes
+    whose sections are changed since the last successful run. See `kubemarine.core.journal`.
+    The decorator should be applied before `_applicable_for_new_nodes_with_roles`.
+
+    :param name: name of the task in the journal.
+    :param paths: paths to the sections of the inventory that the annotated method consumes.
+    :return: new wrapping method.
+    """
+    def journal_wrapper(fn: DECORATED_GROUP_CALLABLE) -> DECORATED_GROUP_CALLABLE:
+        @functools.wraps(fn)
+        def group_wrapper(group: NodeGroup) -> None:
+            journal.run_changed(group, name, journal.inventory_inputs(*paths), fn)
+
+        return group_wrapper
+
+    return journal_wrapper
+
+
 def system_prepare_check_sudoer(cluster: KubernetesCluster) -> None:
     group = cluster.make_group_from_roles(['control-plane', 'balancer']).include_group(cluster.get_new_nodes_or_self())
     not_sudoers = []
@@ -110,6 +154,7 @@ def system_prepare_check_cluster_installation(cluster: KubernetesCluster) -> Non
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_system_chrony(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     if cluster.inventory['services']['ntp'].get('chrony', {}).get('servers') is None:
@@ -119,6 +164,7 @@ def system_prepare_system_chrony(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_system_timesyncd(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     if not cluster.inventory['services']['ntp'].get('timesyncd', {}).get('Time', {}).get('NTP') and \
@@ -129,6 +175,8 @@ def system_prepare_system_timesyncd(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
+@_journaled('sysctl', ['services', 'sysctl'])
 def system_prepare_system_sysctl(group: NodeGroup) -> None:
     is_updated = system.configure_sensitive_service(group, sysctl.setup_sysctl)
     if is_updated:
@@ -146,26 +194,32 @@ def system_prepare_system_setup_apparmor(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_system_disable_firewalld(group: NodeGroup) -> None:
     group.call(system.disable_firewalld)
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_system_disable_swap(group: NodeGroup) -> None:
     group.call(system.disable_swap)
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
+@_journaled('modprobe', ['services', 'modprobe'])
 def system_prepare_system_modprobe(group: NodeGroup) -> None:
     system.configure_sensitive_service(group, modprobe.setup_modprobe)
 
 
 @_applicable_for_new_nodes_with_roles('control-plane', 'worker')
+@_journaled('audit_install', ['services', 'packages', 'associations'])
 def system_install_audit(group: NodeGroup) -> None:
     group.call(audit.install)
 
 
 @_applicable_for_new_nodes_with_roles('control-plane', 'worker')
+@_journaled('audit_rules', ['services', 'audit'])
 def system_prepare_audit(group: NodeGroup) -> None:
     group.call(audit.apply_audit_rules)
 
@@ -186,6 +240,7 @@ def deploy_kubernetes_audit(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed(single_batch=True)
 def system_prepare_dns_hostname(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     with group.new_executor() as exe:
@@ -195,6 +250,7 @@ def system_prepare_dns_hostname(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_dns_resolv_conf(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     if cluster.inventory["services"].get("resolv.conf") is None:
@@ -234,6 +290,8 @@ def system_prepare_dns_etc_hosts(cluster: KubernetesCluster) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
+@_journaled('package_manager', ['services', 'packages', 'package_manager'])
 def system_prepare_package_manager_configure(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     repositories = cluster.inventory['services']['packages']['package_manager'].get("repositories")
@@ -254,6 +312,8 @@ def system_prepare_package_manager_disable_unattended_upgrades(group: NodeGroup)
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
+@_journaled('packages', ['services', 'packages'])
 def system_prepare_package_manager_manage_packages(group: NodeGroup) -> None:
     group.call_batch([
         manage_mandatory_packages,
@@ -265,7 +325,8 @@ def manage_mandatory_packages(group: NodeGroup) -> RunnersGroupResult:
     cluster: KubernetesCluster = group.cluster
 
     collector = CollectorCallback(cluster)
-    with group.new_executor() as exe:
+    # Installation of packages on one node does not depend on other nodes.
+    with group.new_executor(BatchPolicy(independent=True)) as exe:
         for node in exe.group.get_ordered_members_list():
             pkgs: List[str] = []
             for package in cluster.inventory["services"]["packages"]['mandatory'].keys():
@@ -344,6 +405,7 @@ def system_cri_configure(group: NodeGroup) -> None:
 
 
 @_applicable_for_new_nodes_with_roles('all')
+@_checkpointed()
 def system_prepare_thirdparties(group: NodeGroup) -> None:
     cluster: KubernetesCluster = group.cluster
     if not cluster.inventory['services'].get('thirdparties', {}):
@@ -383,6 +445,21 @@ def deploy_loadbalancer_haproxy_configure(cluster: KubernetesCluster) -> None:
         cluster.log.debug('Skipped - no balancers to perform')
         return
 
+    journal.run_changed(group, 'haproxy', _get_haproxy_inputs, _configure_haproxy)
+
+
+def _get_haproxy_inputs(node: NodeGroup) -> object:
+    cluster: KubernetesCluster = node.cluster
+    node_config = node.get_config()
+    inputs = journal.inventory_inputs(['services', 'packages', 'associations'])(node)
+    configs = [haproxy.get_config(cluster, node_config)]
+    if haproxy.is_maintenance_mode(cluster):
+        configs.append(haproxy.get_config(cluster, node_config, True))
+
+    return {'configs': configs, 'inventory': inputs}
+
+
+def _configure_haproxy(group: NodeGroup) -> None:
     with group.new_executor() as exe:
         exe.group.call_batch([
             haproxy.configure,
@@ -419,7 +496,12 @@ def deploy_loadbalancer_keepalived_configure(cluster: KubernetesCluster) -> None
         cluster.log.debug('Skipped - no VRRP IPs to perform')
         return
 
-    group.call(keepalived.configure)
+    journal.run_changed(group, 'keepalived', _get_keepalived_inputs, keepalived.configure)
+
+
+def _get_keepalived_inputs(node: NodeGroup) -> object:
+    inputs = journal.inventory_inputs(['services', 'packages', 'associations'])(node)
+    return {'config': keepalived.generate_config(node.cluster, node.get_config()), 'inventory': inputs}
 
 
 @_applicable_for_new_nodes_with_roles('control-plane', 'worker')
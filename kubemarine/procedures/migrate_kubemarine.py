@@ -18,8 +18,6 @@ from abc import ABC, abstractmethod
 from textwrap import dedent
 from typing import List, Union
 
-import yaml
-
 import kubemarine.patches
 from kubemarine import kubernetes, plugins, packages, etcd, thirdparties, haproxy, keepalived
 from kubemarine.core import flow, static, utils, errors
@@ -374,7 +372,7 @@ class PluginUpgradePatch(_SoftwareUpgradePatch):
 
 def load_upgrade_config() -> dict:
     with utils.open_internal(SOFTWARE_UPGRADE_PATH) as stream:
-        upgrade_config: dict = yaml.safe_load(stream)
+        upgrade_config: dict = utils.yaml_safe_load(stream)
         return upgrade_config
 
 
@@ -18,8 +18,9 @@ from typing import List, Union
 from ordered_set import OrderedSet
 
 from kubemarine import kubernetes, sysctl, system
-from kubemarine.core import flow
+from kubemarine.core import flow, journal
 from kubemarine.core.cluster import KubernetesCluster
+from kubemarine.core.group import NodeGroup
 
 
 def system_prepare_system_sysctl(cluster: KubernetesCluster) -> None:
@@ -43,13 +44,17 @@ def system_prepare_system_sysctl(cluster: KubernetesCluster) -> None:
         # The parameters are closely tied to the other services' settings, e.g. kube-proxy, and may be changed together.
         # After reboot, if sysctl is reconfigured, but other services are not yet,
         # verification may fail, but the final inventory may still be correct after all.
-        is_updated = group.call(sysctl.setup_sysctl)
-        if is_updated:
-            group.call(system.verify_sysctl)
+        journal.run_changed(group, 'sysctl', journal.inventory_inputs(['services', 'sysctl']), _setup_sysctl)
     else:
         cluster.log.debug("No changes detected, skipping.")
 
 
+def _setup_sysctl(group: NodeGroup) -> None:
+    is_updated = group.call(sysctl.setup_sysctl)
+    if is_updated:
+        group.call(system.verify_sysctl)
+
+
 def deploy_kubernetes_reconfigure(cluster: KubernetesCluster) -> None:
     changed_components = OrderedSet[str]()
     for component, constants in kubernetes.components.COMPONENTS_CONSTANTS.items():
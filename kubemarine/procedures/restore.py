@@ -22,10 +22,9 @@ import uuid
 from collections import OrderedDict
 from typing import List
 
-import yaml
-
 from kubemarine.core import utils, flow
 from kubemarine.core.cluster import KubernetesCluster
+from kubemarine.core.group import CollectorCallback
 from kubemarine.core.resources import DynamicResources
 from kubemarine.procedures import install, backup
 from kubemarine import system, kubernetes, etcd
@@ -93,7 +92,7 @@ def unpack_data(resources: DynamicResources) -> None:
         raise FileNotFoundError('Descriptor not found in backup file')
 
     with utils.open_external(descriptor_filepath, 'r') as stream:
-        context['backup_descriptor'] = yaml.safe_load(stream)
+        context['backup_descriptor'] = utils.yaml_safe_load(stream)
 
 
 def stop_cluster(cluster: KubernetesCluster) -> None:
@@ -178,50 +177,58 @@ def import_etcd(cluster: KubernetesCluster) -> None:
     mount_options = '-mount type=bind,src=/var/lib/etcd,dst=/var/lib/etcd,options=rbind:rw ' \
                     '-mount type=bind,src=/etc/kubernetes/pki/etcd,dst=/etc/kubernetes/pki/etcd,options=rbind:rw'
 
-    etcd_instances = 0
-    for control_plane in cluster.nodes['control-plane'].get_ordered_members_configs_list():
-        cluster.log.debug('Restoring ETCD member ' + control_plane['name'])
-        control_plane_conn = cluster.make_group([control_plane['connect_to']])
-        control_plane_conn.sudo(
-            f'chmod 777 {snap_name} && '
-            f'sudo ls -la {snap_name} && '
-            f'sudo ETCD_IMAGE="{etcd_image}" ETCD_MOUNTS="{mount_options}" etcdctl '
-            f'--cert={etcd_cert} '
-            f'--key={etcd_key} '
-            f'--cacert={etcd_cacert} '
-            f'--endpoints={",".join(initial_cluster_list_without_names)} '
-            f'snapshot restore {snap_name} '
-            f'--name={control_plane["name"]} '
-            f'--data-dir=/var/lib/etcd/snapshot '
-            f'--initial-cluster={initial_cluster} '
-            f'--initial-advertise-peer-urls=https://{control_plane["internal_address"]}:2380',
-            hide=False, pty=True)
-
-        _ = control_plane_conn.sudo(
-            f'mv /var/lib/etcd/snapshot/member /var/lib/etcd/member && '
-            f'sudo rm -rf /var/lib/etcd/snapshot {snap_name} && '
-            f'sudo ctr run -d --net-host '
-            f'--env ETCDCTL_API=3 '
-            f'{mount_options} '
-            f'{etcd_image} {container_name} etcd '
-            f'--advertise-client-urls=https://{control_plane["internal_address"]}:2379 '
-            f'--cert-file={etcd_cert} '
-            f'--key-file={etcd_key} '
-            f'--trusted-ca-file={etcd_cacert} '
-            f'--client-cert-auth=true '
-            f'--data-dir=/var/lib/etcd '
-            f'--initial-advertise-peer-urls=https://{control_plane["internal_address"]}:2380 '
-            f'--initial-cluster={initial_cluster} '
-            f'--listen-client-urls=https://127.0.0.1:2379,https://{control_plane["internal_address"]}:2379 '
-            f'--listen-peer-urls=https://{control_plane["internal_address"]}:2380 '
-            f'--name={control_plane["name"]} '
-            f'--peer-client-cert-auth=true '
-            f'--peer-cert-file={etcd_peer_cert} '
-            f'--peer-key-file={etcd_peer_key} '
-            f'--peer-trusted-ca-file={etcd_peer_cacert} ',
-            pty=True)
-
-        etcd_instances += 1
+    # Restore of each member is independent until etcd is started, so restore all members concurrently.
+    # Output cannot be streamed in the batch, so it is collected and printed after the restore.
+    cluster.log.debug('Restoring ETCD members...')
+    collector = CollectorCallback(cluster)
+    with cluster.nodes['control-plane'].new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            control_plane = node.get_config()
+            node.sudo(
+                f'chmod 777 {snap_name} && '
+                f'sudo ls -la {snap_name} && '
+                f'sudo ETCD_IMAGE="{etcd_image}" ETCD_MOUNTS="{mount_options}" etcdctl '
+                f'--cert={etcd_cert} '
+                f'--key={etcd_key} '
+                f'--cacert={etcd_cacert} '
+                f'--endpoints={",".join(initial_cluster_list_without_names)} '
+                f'snapshot restore {snap_name} '
+                f'--name={control_plane["name"]} '
+                f'--data-dir=/var/lib/etcd/snapshot '
+                f'--initial-cluster={initial_cluster} '
+                f'--initial-advertise-peer-urls=https://{control_plane["internal_address"]}:2380',
+                pty=True, callback=collector)
+
+    cluster.log.debug(collector.result)
+
+    # Start all members of the restored cluster at once.
+    cluster.log.debug('Starting restored ETCD members...')
+    with cluster.nodes['control-plane'].new_executor() as exe:
+        for node in exe.group.get_ordered_members_list():
+            control_plane = node.get_config()
+            node.sudo(
+                f'mv /var/lib/etcd/snapshot/member /var/lib/etcd/member && '
+                f'sudo rm -rf /var/lib/etcd/snapshot {snap_name} && '
+                f'sudo ctr run -d --net-host '
+                f'--env ETCDCTL_API=3 '
+                f'{mount_options} '
+                f'{etcd_image} {container_name} etcd '
+                f'--advertise-client-urls=https://{control_plane["internal_address"]}:2379 '
+                f'--cert-file={etcd_cert} '
+                f'--key-file={etcd_key} '
+                f'--trusted-ca-file={etcd_cacert} '
+                f'--client-cert-auth=true '
+                f'--data-dir=/var/lib/etcd '
+                f'--initial-advertise-peer-urls=https://{control_plane["internal_address"]}:2380 '
+                f'--initial-cluster={initial_cluster} '
+                f'--listen-client-urls=https://127.0.0.1:2379,https://{control_plane["internal_address"]}:2379 '
+                f'--listen-peer-urls=https://{control_plane["internal_address"]}:2380 '
+                f'--name={control_plane["name"]} '
+                f'--peer-client-cert-auth=true '
+                f'--peer-cert-file={etcd_peer_cert} '
+                f'--peer-key-file={etcd_peer_key} '
+                f'--peer-trusted-ca-file={etcd_peer_cacert} ',
+                pty=True)
 
     # After restore check db size equal, cluster health and leader elected
     # Checks should be changed
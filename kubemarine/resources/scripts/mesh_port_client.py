@@ -0,0 +1,123 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# Port client that probes many targets concurrently and can be run on both python 2 and 3.
+# The script is for testing purpose only.
+# The first argv parameter is the file with targets, one target per line: <action> <port> <address> <ip_version>.
+# For each failed target, the line "FAIL <address> <port> <reason>" is printed.
+# If the number of failed targets reaches the limit, the remaining targets are not probed,
+# and the line "SKIPPED <number of not probed targets>" is printed.
+# The line "DONE" is printed when all targets are probed.
+
+import io
+import os
+import socket
+import sys
+import threading
+
+major_version = sys.version_info.major
+if major_version == 3:
+    import queue
+else:
+    # pylint: disable-next=import-error
+    import Queue as queue  # type: ignore[import-not-found, no-redef]
+
+proto = '{{ proto }}'
+timeout = int('{{ timeout }}')
+sz = int('{{ mtu }}')
+parallelism = int('{{ parallelism }}')
+failures_limit = int('{{ failures_limit }}')
+
+s_type = socket.SOCK_STREAM
+if proto == 'udp':
+    s_type = socket.SOCK_DGRAM
+
+
+def probe(action, port, address, ip_version):
+    # type: (str, int, str, str) -> str
+    family = socket.AF_INET
+    if ip_version == '6':
+        family = socket.AF_INET6
+
+    s = socket.socket(family, s_type)
+    try:
+        s.settimeout(timeout)
+
+        if proto == 'udp':
+            s.sendto(os.urandom(sz), (address, port))
+            data, _ = s.recvfrom(sz)
+        else:
+            s.connect((address, port))
+            data = bytearray()
+            if action == 'send':
+                s.sendall(os.urandom(sz))
+                while len(data) < sz:
+                    chunk = s.recv(sz)
+                    if not chunk:
+                        break
+                    data.extend(chunk)
+    finally:
+        s.close()
+
+    if action == 'send' and len(data) != sz:
+        return "Data is lost"
+
+    return ""
+
+
+targets = queue.Queue()  # type: queue.Queue[tuple]
+with io.open(sys.argv[1], encoding='utf-8') as f:
+    for line in f:
+        parts = line.split()
+        if len(parts) == 4:
+            targets.put((parts[0], int(parts[1]), parts[2], parts[3]))
+
+output_lock = threading.Lock()
+failures = [0]
+
+
+def worker():
+    # type: () -> None
+    while True:
+        with output_lock:
+            if failures[0] >= failures_limit:
+                return
+        try:
+            action, port, address, ip_version = targets.get_nowait()
+        except queue.Empty:
+            return
+
+        try:
+            reason = probe(action, port, address, ip_version)
+        except Exception as e:
+            reason = str(e) or e.__class__.__name__
+
+        if reason:
+            with output_lock:
+                failures[0] += 1
+                sys.stdout.write("FAIL %s %s %s\n" % (address, port, reason.replace('\n', ' ')))
+                sys.stdout.flush()
+
+
+workers = [threading.Thread(target=worker) for _ in range(min(parallelism, targets.qsize()))]
+for w in workers:
+    w.daemon = True
+    w.start()
+for w in workers:
+    w.join()
+
+if not targets.empty():
+    sys.stdout.write("SKIPPED %s\n" % targets.qsize())
+sys.stdout.write("DONE\n")
+sys.stdout.flush()
@@ -13,12 +13,14 @@
 # limitations under the License.
 
 # Simple TCP socket listener that can be run on both python 2 and 3,
-# The listener accepts connections sequentially, and suppresses the received data.
+# The listener serves each accepted connection in a separate thread, and echoes the received data.
+# Connections are expected to be made from many nodes concurrently.
 # The script is for testing purpose only.
 # The first argv parameter is the TCP port to listen. The second argv parameter is the ip protocol version.
 
 import socket
 import sys
+import threading
 
 port = int(sys.argv[1])
 
@@ -56,17 +58,24 @@ try:
             s.sendto(data, address)
 
     else:
-        s.listen(1)
+        s.listen(128)
 
-        while True:
-            client, _ = s.accept()
+        def serve(client):  # type: ignore[no-untyped-def]
             try:
                 while True:
                     data = client.recv(sz)
                     if not data:
                         break
                     client.sendall(data)
+            except socket.error:
+                pass
             finally:
                 client.close()
+
+        while True:
+            client, _ = s.accept()
+            t = threading.Thread(target=serve, args=(client,))
+            t.daemon = True
+            t.start()
 finally:
     s.close()
@@ -108,10 +108,16 @@ def parse_selinux_permissive_types(logger: log.EnhancedLogger, stdout: str) -> L
     return result
 
 
-def get_selinux_status(group: NodeGroup) -> Tuple[RunnersGroupResult, Dict[str, dict]]:
+def get_selinux_status_cmd() -> str:
+    return "sestatus && sudo semanage permissive -l"
+
+
+def get_selinux_status(group: NodeGroup, result: RunnersGroupResult = None) \
+        -> Tuple[RunnersGroupResult, Dict[str, dict]]:
     log = group.cluster.log
 
-    result = group.sudo("sestatus && sudo semanage permissive -l")
+    if result is None:
+        result = group.sudo(get_selinux_status_cmd())
 
     parsed_result: Dict[str, dict] = {}
     for host, node_result in result.items():
@@ -122,7 +128,8 @@ def get_selinux_status(group: NodeGroup) -> Tuple[RunnersGroupResult, Dict[str,
     return result, parsed_result
 
 
-def is_config_valid(group: NodeGroup, state: str = None, policy: str = None, permissive: List[str] = None) \
+def is_config_valid(group: NodeGroup, state: str = None, policy: str = None, permissive: List[str] = None,
+                    result: RunnersGroupResult = None) \
         -> Tuple[bool, RunnersGroupResult, Dict[str, dict]]:
     log = group.cluster.log
 
@@ -140,7 +147,7 @@ def is_config_valid(group: NodeGroup, state: str = None, policy: str = None, per
     if permissive is None:
         permissive = get_expected_permissive(group.cluster.inventory)
 
-    result, parsed_result = get_selinux_status(group)
+    result, parsed_result = get_selinux_status(group, result)
     valid = True
 
     for host, selinux_status in parsed_result.items():
@@ -230,18 +230,24 @@ def configure(group: NodeGroup) -> RunnersGroupResult:
     return group.sudo('ls -la /etc/sysctl.d/98-kubemarine-sysctl.conf')
 
 
-def is_valid(group: NodeGroup) -> bool:
+def is_valid(group: NodeGroup, result: RunnersGroupResult = None) -> bool:
+    """
+    Check that all the configured kernel parameters are loaded on the nodes.
+
+    :param group: group of nodes to check
+    :param result: already fetched result of `sysctl -a`. If not specified, it is fetched.
+    """
     logger = group.cluster.log
 
-    verify_results = group.sudo('sysctl -a')
+    verify_results = group.sudo('sysctl -a') if result is None else result
 
     sysctl_valid = True
     for node in group.get_ordered_members_list():
         host = node.get_host()
-        result = verify_results[host]
+        node_result = verify_results[host]
         config = make_config(group.cluster, node)
         for parameter in config.rstrip('\n').split('\n'):
-            if parameter not in result.stdout:
+            if parameter not in node_result.stdout:
                 logger.debug(f'Kernel parameter {parameter!r} is not found at {host}')
                 sysctl_valid = False
 
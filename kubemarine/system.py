@@ -17,10 +17,10 @@ import io
 import re
 import socket
 import time
-from typing import Dict, Tuple, Optional, List, Callable
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Tuple, Optional, List, Callable, TypeVar
 
 import paramiko
-from dateutil.parser import parse
 from ordered_set import OrderedSet
 
 from kubemarine import selinux, apparmor, sysctl, modprobe
@@ -33,6 +33,8 @@ from kubemarine.core.group import (
 )
 from kubemarine.core.annotations import restrict_empty_group
 
+_T = TypeVar('_T')
+
 
 @enrichment(EnrichmentStage.FULL)
 def verify_inventory(cluster: KubernetesCluster) -> None:
@@ -271,12 +273,24 @@ def configure_sensitive_service(group: NodeGroup, action: Callable[[NodeGroup],
     return is_updated
 
 
+def get_firewalld_status_cmd() -> str:
+    return "systemctl status firewalld"
+
+
 def fetch_firewalld_status(group: NodeGroup) -> RunnersGroupResult:
-    return group.sudo("systemctl status firewalld", warn=True)
+    return group.sudo(get_firewalld_status_cmd(), warn=True)
+
 
+def is_firewalld_disabled(group: NodeGroup, result: RunnersGroupResult = None) -> Tuple[bool, RunnersGroupResult]:
+    """
+    Check that FirewallD is disabled or not installed on the nodes.
 
-def is_firewalld_disabled(group: NodeGroup) -> Tuple[bool, RunnersGroupResult]:
-    result = fetch_firewalld_status(group)
+    :param group: group of nodes to check
+    :param result: already fetched result of `get_firewalld_status_cmd()`. If not specified, it is fetched.
+    :return: pair of the check result and the result of the command
+    """
+    if result is None:
+        result = fetch_firewalld_status(group)
     disabled_status = True
 
     for node_result in list(result.values()):
@@ -306,8 +320,20 @@ def disable_firewalld(group: NodeGroup) -> RunnersGroupResult:
     return result
 
 
-def is_swap_disabled(group: NodeGroup) -> Tuple[bool, RunnersGroupResult]:
-    result = group.sudo("cat /proc/swaps", warn=True)
+def get_swap_status_cmd() -> str:
+    return "cat /proc/swaps"
+
+
+def is_swap_disabled(group: NodeGroup, result: RunnersGroupResult = None) -> Tuple[bool, RunnersGroupResult]:
+    """
+    Check that swap is disabled on the nodes.
+
+    :param group: group of nodes to check
+    :param result: already fetched result of `get_swap_status_cmd()`. If not specified, it is fetched.
+    :return: pair of the check result and the result of the command
+    """
+    if result is None:
+        result = group.sudo(get_swap_status_cmd(), warn=True)
     disabled_status = True
 
     for node_result in list(result.values()):
@@ -425,14 +451,13 @@ def configure_chronyd(group: NodeGroup, retries: int = 60) -> RunnersGroupResult
         if results.stdout_contains("Normal"):
             log.verbose("NTP service reported successful time synchronization, validating...")
 
-            _, _, time_diff = get_nodes_time(group)
-            if time_diff > cluster.globals['nodes']['max_time_difference']:
-                log.debug("Time is not synced yet")
-                log.debug(results)
-            else:
+            if not is_clock_skew_exceeded(group):
                 log.debug("Time synced!")
                 return results
 
+            log.debug("Time is not synced yet")
+            log.debug(results)
+
         else:
             log.debug("Time is not synced yet")
             log.debug(results)
@@ -442,6 +467,23 @@ def configure_chronyd(group: NodeGroup, retries: int = 60) -> RunnersGroupResult
     raise Exception("Time not synced, but timeout is reached")
 
 
+def is_clock_skew_exceeded(group: NodeGroup) -> bool:
+    """
+    Check that the clock skew between the nodes certainly exceeds `nodes.max_time_difference` global,
+    taking into account the uncertainty of the measurement.
+    """
+    cluster: KubernetesCluster = group.cluster
+    time_diff, uncertainty = get_clock_skew(measure_nodes_clock_offset(group))
+    max_time_difference = cluster.globals['nodes']['max_time_difference']
+    if time_diff - uncertainty > max_time_difference:
+        return True
+    if time_diff + uncertainty > max_time_difference:
+        cluster.log.debug("Time difference between nodes %.0fms ± %.0fms cannot be measured precisely enough"
+                          % (time_diff, uncertainty))
+
+    return False
+
+
 def configure_timesyncd(group: NodeGroup, retries: int = 120) -> RunnersGroupResult:
     cluster: KubernetesCluster = group.cluster
     log = cluster.log
@@ -470,14 +512,13 @@ def configure_timesyncd(group: NodeGroup, retries: int = 120) -> RunnersGroupRes
         if results.stdout_contains("synchronized: yes"):
             log.verbose("NTP service reported successful time synchronization, validating...")
 
-            _, _, time_diff = get_nodes_time(group)
-            if time_diff > cluster.globals['nodes']['max_time_difference']:
-                log.debug("Time is not synced yet")
-                log.debug(results)
-            else:
+            if not is_clock_skew_exceeded(group):
                 log.debug("Time synced!")
                 return results
 
+            log.debug("Time is not synced yet")
+            log.debug(results)
+
         else:
             log.debug("Time is not synced yet")
             log.debug(results)
@@ -640,31 +681,61 @@ def whoami(cluster: KubernetesCluster) -> RunnersGroupResult:
 
 
 @restrict_empty_group
-def get_nodes_time(group: NodeGroup) -> Tuple[float, Dict[str, float], float]:
+def measure_nodes_clock_offset(group: NodeGroup, samples: int = 5) -> Dict[str, Tuple[float, float]]:
+    """
+    Measure offset of the clock of each node relative to the local clock, similar to NTP.
+    Each node is sampled several times. The nodes are sampled concurrently.
+    For each sample, the time is requested from the node, and the local send and receive times are taken.
+    The sample with the minimal round-trip time is chosen as the most precise one.
+
+    :param group: Group of nodes, where clock offset should be measured.
+    :param samples: number of samples for each node
+    :return: mapping host -> (offset, uncertainty) in milliseconds.
+             The real offset is within `offset ± uncertainty`.
     """
-    Polls the time from the specified group of nodes, parses it and returns tuple with results.
-    :param group: Group of nodes, where timestamps should be detected.
-    :return: tuple with max timestamp, dict of parsed timestamps per node and max found time difference.
+    def sample(node: NodeGroup) -> Tuple[float, float]:
+        best_offset, best_uncertainty = 0.0, float('inf')
+        for _ in range(samples):
+            sent = time.time()
+            result = node.run('date +%s%N').get_simple_out()
+            received = time.time()
 
-    Max time required for comparing dates computed on nodes, because we can not detect real time between nodes.
-    Max nodes time should be less than minimal compared time from future.
+            remote_time = int(result.strip()) / 1000000
+            uncertainty = (received - sent) * 1000 / 2
+            offset = remote_time - (sent + received) * 1000 / 2
+            if uncertainty < best_uncertainty:
+                best_offset, best_uncertainty = offset, uncertainty
 
-    Timestamp - is a time in milliseconds since epoch.
-    """
+        return best_offset, best_uncertainty
+
+    return sample_nodes_concurrently(group, sample)
 
-    # Please, note: this method can not detect time on nodes precisely, since Kubemarine can execute commands not at the
-    # same time depending on various factors, for example, restrictions on the number of open sockets.
 
-    parsed_time_per_node: Dict[str, float] = {}
+def sample_nodes_concurrently(group: NodeGroup, sample: Callable[[NodeGroup], _T]) -> Dict[str, _T]:
+    """
+    Run `sample` for each node of the group in separate threads.
+    The number of the nodes that are sampled at the same time is limited by `connection.sampling_parallelism` global.
 
-    # TODO: request and parse more accurate timestamp in milliseconds
+    :param group: nodes to sample
+    :param sample: function that accepts single node group and returns the measured value
+    :return: measured value for each host
+    """
+    nodes = group.get_ordered_members_list()
+    max_workers = min(len(nodes), static.GLOBALS['connection']['sampling_parallelism'])
+    with ThreadPoolExecutor(max_workers=max_workers) as tpe:
+        futures = {node.get_host(): tpe.submit(sample, node) for node in nodes}
+        return {host: future.result() for host, future in futures.items()}
 
-    raw_results = group.run('date')
-    for host, result in raw_results.items():
-        parsed_time = parse(result.stdout.strip()).timestamp() * 1000
-        parsed_time_per_node[host] = parsed_time
 
-    min_time = min(parsed_time_per_node.values())
-    max_time = max(parsed_time_per_node.values())
+def get_clock_skew(offsets: Dict[str, Tuple[float, float]]) -> Tuple[float, float]:
+    """
+    Calculate the maximum clock skew between the nodes.
 
-    return max_time, parsed_time_per_node, max_time-min_time
+    :param offsets: result of `measure_nodes_clock_offset`
+    :return: pair of the skew and its uncertainty in milliseconds
+    """
+    min_host = min(offsets, key=lambda host: offsets[host][0])
+    max_host = max(offsets, key=lambda host: offsets[host][0])
+    skew = offsets[max_host][0] - offsets[min_host][0]
+    uncertainty = offsets[max_host][1] + offsets[min_host][1]
+    return skew, uncertainty
@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import hashlib
 import io
 from typing import Tuple, Optional, Dict, List, Union
 
@@ -24,6 +25,18 @@ ERROR_SHA1_NOT_CHANGED = (
     "Key 'source' was changed for third-party {thirdparty!r} during upgrade {previous_version} -> {version}, "
     "but 'sha1' was not changed.")
 
+# On-node registry of installed third-parties.
+# Each installed third-party has an entry file with lines "<sha1> <size> <mtime> <path>"
+# for the third-party itself and for every file unpacked from it.
+REGISTRY_DIR = '/etc/kubemarine/thirdparties'
+
+# Status of the file hash as reported by the registry lookup.
+REGISTRY_CACHED = 'cached'
+REGISTRY_HASHED = 'hashed'
+REGISTRY_MISSING = 'missing'
+# Placeholder of sha1 for the files that cannot be hashed.
+REGISTRY_MISSING_SHA = '-'
+
 
 def is_default_thirdparty(destination: str) -> bool:
     return destination in static.GLOBALS['thirdparties']
@@ -297,6 +310,94 @@ def get_group_require_unzip(cluster: KubernetesCluster, inventory: dict) -> Node
     return group
 
 
+def get_registry_entry_path(destination: str) -> str:
+    """
+    :param destination: absolute path of third-party
+    :return: path to the entry of the on-node registry that describes the third-party
+    """
+    return f"{REGISTRY_DIR}/{hashlib.sha1(destination.encode('utf-8')).hexdigest()}"
+
+
+def _list_archive_members_command(destination: str, unpack_dir: str) -> str:
+    extension = destination.split('.')[-1]
+    if extension == 'zip':
+        list_command = 'sudo unzip -qq -l %s | awk \'NF > 3 { print $4 }\'' % destination
+    else:
+        list_command = 'sudo tar -tf %s' % destination
+
+    return '%s | grep -v "/$" | sed "s#^#%s/#"' % (list_command, unpack_dir)
+
+
+def get_registry_record_command(destination: str, unpack_dir: Optional[str]) -> str:
+    """
+    Build remote command that records sha1, size and mtime of the installed third-party
+    and of its unpacked files to the on-node registry.
+
+    :param destination: absolute path of third-party
+    :param unpack_dir: directory where the third-party is unpacked to, or None
+    :return: shell command
+    """
+    files_command = 'echo %s' % destination
+    if unpack_dir is not None:
+        files_command = '{ %s; %s; }' % (files_command, _list_archive_members_command(destination, unpack_dir))
+
+    return ('sudo mkdir -p %s && %s | while read file_name; do '
+            '  echo $(sudo openssl sha1 "${file_name}" | sed "s/^.* //") '
+            '    $(sudo stat -c "%%s %%Y" "${file_name}") ${file_name}; '
+            'done | sudo tee %s > /dev/null'
+            % (REGISTRY_DIR, files_command, get_registry_entry_path(destination)))
+
+
+def get_registry_lookup_command(destination: str) -> str:
+    """
+    Build remote command that prints "<sha1> <status> <path>" lines for the third-party and its unpacked files.
+    The sha1 is taken from the on-node registry if size and mtime of the file are not changed,
+    and is recalculated otherwise.
+    If the file cannot be hashed, for example if it is deleted, the "missing" status is printed with placeholder sha1.
+    If the registry has no entry for the third-party, only the third-party itself is hashed.
+
+    :param destination: absolute path of third-party
+    :return: shell command
+    """
+    entry = get_registry_entry_path(destination)
+    return ('if sudo test -f %s; then '
+            '  sudo cat %s | while read sha size mtime file_name; do '
+            '    if [ "$(sudo stat -c "%%s %%Y" "${file_name}" 2>/dev/null)" = "${size} ${mtime}" ]; then '
+            '      echo ${sha} %s ${file_name}; '
+            '    else '
+            '      %s; '
+            '    fi; '
+            '  done; '
+            'else '
+            '  file_name=%s; %s; '
+            'fi'
+            % (entry, entry, REGISTRY_CACHED, _get_hash_file_command(), destination, _get_hash_file_command()))
+
+
+def _get_hash_file_command() -> str:
+    return ('sha=$(sudo openssl sha1 "${file_name}" 2>/dev/null | sed "s/^.* //"); '
+            'if [ -n "${sha}" ]; then echo ${sha} %s ${file_name}; else echo "%s" %s ${file_name}; fi'
+            % (REGISTRY_HASHED, REGISTRY_MISSING_SHA, REGISTRY_MISSING))
+
+
+def parse_registry_lookup(stdout: str) -> Dict[str, Tuple[str, str]]:
+    """
+    Parse output of the command built by `get_registry_lookup_command`.
+
+    :param stdout: output of the command
+    :return: mapping of path to pair of sha1 and registry status
+    """
+    files = {}
+    for line in stdout.strip().split('\n'):
+        parts = line.split(maxsplit=2)
+        if len(parts) != 3:
+            continue
+        sha, status, path = parts
+        files[path] = (sha, status)
+
+    return files
+
+
 def install_thirdparty(filter_group: NodeGroup, destination: str) -> Optional[RunnersGroupResult]:
     cluster = filter_group.cluster
     config = cluster.inventory['services'].get('thirdparties', {}).get(destination)
@@ -336,9 +437,11 @@ def install_thirdparty(filter_group: NodeGroup, destination: str) -> Optional[Ru
         cluster.log.verbose('Installation via curl download detected')
         if config.get('sha1') is not None:
             # if hash equal, then stop further actions immediately! unpack should not be performed too
+            # the registry is still refreshed in case the third-party was installed without it
             remote_commands += (' && [ -f %s ] && [ "%s" == "$(sudo openssl sha1 %s | sed "s/^.* //")" ]'
-                                ' && exit 0 || true '
-                                % (destination, config['sha1'], destination))
+                                ' && { %s; exit 0; } || true '
+                                % (destination, config['sha1'], destination,
+                                   get_registry_record_command(destination, config.get('unpack'))))
         remote_commands += (' && sudo rm -f %s && sudo curl --max-time %d -k -f -g -s --show-error -L %s -o %s && '
                             % (destination, cluster.inventory['globals']['timeout_download'], config['source'], destination))
     else:
@@ -389,6 +492,8 @@ def install_thirdparty(filter_group: NodeGroup, destination: str) -> Optional[Ru
                            % (destination, config['owner'], config['unpack'])
             remote_commands += ' && sudo tar -tf %s | xargs -I FILE sudo ls -la %s/FILE' % (destination, config['unpack'])
 
+    remote_commands += ' && ' + get_registry_record_command(destination, config.get('unpack'))
+
     return common_group.sudo(remote_commands, pty=True)
 
 
@@ -0,0 +1,79 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures merge of the defaults with the 1000-node inventory,
+# and of the 1000-node inventory with the procedure patch that extends the list of nodes.
+# The merger based on the deepmerge library with the preliminary deep copy is compared with `yaml_merger`.
+# The deepmerge library is installed with the `test` extra: `pip install .[test]`.
+
+import time
+from copy import deepcopy
+from typing import Any, Callable
+
+from deepmerge import Merger  # type: ignore[import-untyped]
+
+from kubemarine import demo
+from kubemarine.core import static, utils
+from kubemarine.core.yaml_merger import default_merger, get_strategy_position
+
+ITERATIONS = 20
+
+
+def deepmerge_list_merger(_: Merger, path: list, base: list, nxt: list) -> list:
+    strategy, strategy_definition_position = get_strategy_position(nxt, path)
+    if strategy is None:
+        return nxt
+
+    merged = nxt[:strategy_definition_position]
+    if strategy == 'merge':
+        merged.extend(base)
+    merged.extend(nxt[(strategy_definition_position + 1):])
+    return merged
+
+
+DEEPMERGE_MERGER = Merger([(list, [deepmerge_list_merger]), (dict, ["merge"])], ["override"], ["override"])
+
+
+def measure(merge: Callable[[], Any]) -> float:
+    start = time.perf_counter()
+    for _ in range(ITERATIONS):
+        merge()
+    return (time.perf_counter() - start) * 1000 / ITERATIONS
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    inventory = demo.generate_inventory(balancer=2, control_plane=3, worker=995)
+    inventory['services'] = {
+        'kubeadm': {'apiServer': {'extraArgs': {'audit-log-maxage': '30'}}},
+        'modprobe': {'rhel9': [{'<<': 'merge'}, {'modulename': 'custom'}]},
+    }
+    inventory['plugins'] = {'calico': {'install': True, 'mtu': 1400}, 'nginx-ingress-controller': {'install': True}}
+    patch = {'nodes': [{'<<': 'merge'}, *deepcopy(inventory['nodes'][-10:])]}
+
+    defaults = static.DEFAULTS
+    print(f"{len(inventory['nodes'])} nodes, {ITERATIONS} iterations, average time:")
+    print(f"  defaults, deepmerge with deepcopy_yaml: "
+          f"{measure(lambda: DEEPMERGE_MERGER.merge(utils.deepcopy_yaml(defaults), inventory)):.1f} ms")
+    print(f"  defaults, yaml_merger.merge_copy: "
+          f"{measure(lambda: default_merger.merge_copy(defaults, inventory)):.1f} ms")
+    print(f"  nodes patch, deepmerge with deepcopy_yaml: "
+          f"{measure(lambda: DEEPMERGE_MERGER.merge(utils.deepcopy_yaml(inventory), patch)):.1f} ms")
+    print(f"  nodes patch, yaml_merger.merge_copy: "
+          f"{measure(lambda: default_merger.merge_copy(inventory, patch)):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
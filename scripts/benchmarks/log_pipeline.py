@@ -0,0 +1,122 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures logging of heavy remote output from many hosts in parallel,
+# as it happens for the remote commands with `hide=False`.
+# Each host thread writes the output through `log.LoggerWriter` in chunks, and logs the debug messages.
+# The logs are written to the file with the verbose level, and to stdout that is redirected to the file.
+# Optionally, each write to the log file is delayed to emulate slow storage.
+# The time until the threads finish and the time until all records are written are reported
+# for the synchronous and for the queued logging.
+#
+# Example: python scripts/benchmarks/log_pipeline.py --hosts 200 --lines 500 --write-latency 0.05
+
+import argparse
+import io
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import IO, Tuple, cast
+
+from kubemarine.core import log
+
+CHUNK_LINES = 20
+
+
+class SlowStream:
+    def __init__(self, stream: IO[str], latency: float) -> None:
+        self.stream = stream
+        self.latency = latency
+
+    def write(self, text: str) -> int:
+        time.sleep(self.latency)
+        return self.stream.write(text)
+
+    def flush(self) -> None:
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.stream.close()
+
+
+def run(queued: bool, hosts: int, lines: int, write_latency: float, tmpdir: str) -> Tuple[float, float]:
+    handlers = [
+        log.LogHandler(os.path.join(tmpdir, f"debug-{queued}.log"), 'verbose', filemode='w', correct_newlines=True),
+        log.LogHandler('stdout', 'debug', colorize=True, correct_newlines=True),
+    ]
+    if write_latency:
+        file_handler: log.FileHandlerWithHeader = handlers[0].handler  # type: ignore[assignment]
+        file_handler.stream = cast(io.TextIOWrapper, SlowStream(file_handler.stream, write_latency))
+    logger = log.Log(f"benchmark-{queued}", handlers, queued=queued).logger
+    chunk = ''.join(f"remote output line {i} of the package manager\n" for i in range(CHUNK_LINES))
+
+    def produce(host: int) -> None:
+        caller = log.caller_info(logger)
+        writer = log.LoggerWriter(logger, caller, '\t')
+        for _ in range(lines // CHUNK_LINES):
+            writer.write(chunk)
+            logger.debug("Received chunk from host %d", host)
+        writer.flush(remainder=True)
+
+    threads = [threading.Thread(target=produce, args=(host,)) for host in range(hosts)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    produced = time.perf_counter() - start
+    log.flush_handlers(logger)
+    written = time.perf_counter() - start
+
+    for handler in logger.handlers:
+        handler.close()
+    logger.handlers.clear()
+    return produced, written
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    parser = argparse.ArgumentParser(description="Benchmark of logging of remote output from many hosts")
+    parser.add_argument('--hosts', type=int, default=100, help="number of hosts writing in parallel")
+    parser.add_argument('--lines', type=int, default=1000, help="number of lines of remote output for each host")
+    parser.add_argument('--write-latency', type=float, default=0,
+                        help="latency of each write to the log file in milliseconds")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        results = {}
+        # The console is emulated by the file, so that the benchmark does not depend on the terminal.
+        stdout = os.dup(sys.stdout.fileno())
+        with open(os.path.join(tmpdir, 'stdout.log'), 'w', encoding='utf-8') as console:
+            sys.stdout.flush()
+            os.dup2(console.fileno(), sys.stdout.fileno())
+            try:
+                for queued in (False, True):
+                    results[queued] = run(queued, args.hosts, args.lines, args.write_latency / 1000, tmpdir)
+            finally:
+                sys.stdout.flush()
+                os.dup2(stdout, sys.stdout.fileno())
+
+    print(f"{args.hosts} hosts, {args.lines} lines of remote output each, "
+          f"write latency {args.write_latency} ms")
+    print(f"{'logging':<14}{'threads finished s':>20}{'all written s':>16}")
+    for queued, (produced, written) in results.items():
+        print(f"{'queued' if queued else 'synchronous':<14}{produced:>20.2f}{written:>16.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,160 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures how the procedures scale with the number of nodes using the fake cluster of `kubemarine.demo`.
+# Each remote call of the fake connections is delayed by the configured latency and jitter,
+# and fails with the configured rate. The failure is temporary, so it is retried by the executor without delay.
+# The fake commands succeed with empty output, unless the output is required by the procedure slice.
+# Each slice is run in a separate process, and wall time, CPU time, peak RSS of the process,
+# and the number of SSH round-trips are reported.
+#
+# Example: python scripts/benchmarks/scale.py --nodes 10,100,500 --latency 5 --jitter 2 --failure-rate 0.001
+
+import argparse
+import multiprocessing
+import os
+import random
+import resource
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from kubemarine import demo
+from kubemarine.core import flow, static
+from kubemarine.core.executor import GenericResult, RunnersResult
+from kubemarine.procedures import check_paas, install
+
+# Procedure, its action, and the tasks to run. Slice without procedure measures only the enrichment of the inventory.
+SLICES: Dict[str, Tuple[Optional[str], Optional[Callable[[], flow.TasksAction]], str]] = {
+    'enrichment': (None, None, ''),
+    'prepare': ('install', install.InstallAction, 'prepare.dns,prepare.ntp,prepare.package_manager,prepare.cri'),
+    'thirdparties': ('install', install.InstallAction, 'prepare.thirdparties'),
+    'check_paas': ('check_paas', check_paas.PaasAction,
+                   'services.security.firewalld,services.system,thirdparties.hashes'),
+}
+
+
+class LatencyShell(demo.FakeShell):
+    def __init__(self, latency: float, jitter: float, failure_rate: float, seed: int) -> None:
+        super().__init__()
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.round_trips = 0
+        self.failures = 0
+        self.boots: Dict[str, int] = {}
+        self._random = random.Random(seed)
+        self._counter_lock = threading.Lock()
+
+    def round_trip(self, host: str, do_type: str) -> None:
+        with self._counter_lock:
+            self.round_trips += 1
+            delay = self.latency + self._random.uniform(-self.jitter, self.jitter)
+            failed = self._random.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            raise Exception(static.GLOBALS['kubernetes']['temporary_exceptions'][0])
+
+    def default_result(self, host: str, do_type: str, command: str, hide: bool) -> Optional[GenericResult]:
+        stdout = ''
+        if command == 'last reboot':
+            # Each next boot history differs, so that the reboot of nodes is considered finished
+            with self._counter_lock:
+                self.boots[host] = self.boots.get(host, 0) + 1
+                stdout = f"reboot {self.boots[host]}"
+
+        return RunnersResult([command], [0], stdout=stdout, hide=hide)
+
+
+def run_slice(name: str, nodes: int, latency: float, jitter: float, failure_rate: float, seed: int) -> dict:
+    # Output of the procedures is not interesting
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, sys.stdout.fileno())
+    os.dup2(devnull, sys.stderr.fileno())
+    static.GLOBALS['workaround']['delay_period'] = 0
+
+    inventory = demo.generate_inventory(balancer=1, control_plane=3, worker=max(nodes - 4, 1))
+    procedure, action, tasks = SLICES[name]
+    context = demo.create_silent_context(['--tasks', tasks] if procedure else None, procedure=procedure or 'install')
+    shell = LatencyShell(latency, jitter, failure_rate, seed)
+    resources = demo.FakeResources(context, inventory, nodes_context=demo.generate_nodes_context(inventory),
+                                   fake_shell=shell)
+
+    error = None
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        if action is None:
+            resources.cluster()
+        else:
+            flow.run_actions(resources, [action()])
+    except (Exception, SystemExit) as exc:  # pylint: disable=broad-exception-caught
+        error = type(exc).__name__
+
+    return {
+        'wall': time.perf_counter() - wall_start,
+        'cpu': time.process_time() - cpu_start,
+        # ru_maxrss is in kilobytes on Linux
+        'rss': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'round_trips': shell.round_trips,
+        'failures': shell.failures,
+        'error': error,
+    }
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    parser = argparse.ArgumentParser(description="Scale benchmark of the procedures on the fake cluster")
+    parser.add_argument('--nodes', default='10,100,500,2000',
+                        help="comma-separated sizes of the generated inventories")
+    parser.add_argument('--slices', default=','.join(SLICES),
+                        help=f"comma-separated slices of procedures to run. Available: {', '.join(SLICES)}")
+    parser.add_argument('--latency', type=float, default=0, help="latency of each remote call in milliseconds")
+    parser.add_argument('--jitter', type=float, default=0, help="maximum deviation of the latency in milliseconds")
+    parser.add_argument('--failure-rate', type=float, default=0,
+                        help="probability of temporary failure of each remote call")
+    parser.add_argument('--seed', type=int, default=0, help="seed for the latency jitter and failures")
+    args = parser.parse_args()
+
+    sizes: List[int] = [int(size) for size in args.nodes.split(',')]
+    slices: List[str] = args.slices.split(',')
+    unknown = set(slices) - set(SLICES)
+    if unknown:
+        parser.error(f"Unknown slices {', '.join(sorted(unknown))}")
+
+    print(f"latency {args.latency} ms, jitter {args.jitter} ms, failure rate {args.failure_rate}")
+    print(f"{'slice':<14}{'nodes':>7}{'wall s':>10}{'cpu s':>10}{'peak RSS MB':>13}{'round-trips':>13}{'failures':>10}")
+    # Fresh process for each measurement makes peak RSS and CPU time of the slices independent.
+    mp_context = multiprocessing.get_context('spawn')
+    for name in slices:
+        for nodes in sizes:
+            with ProcessPoolExecutor(max_workers=1, mp_context=mp_context) as pool:
+                result = pool.submit(run_slice, name, nodes, args.latency / 1000, args.jitter / 1000,
+                                     args.failure_rate, args.seed).result()
+
+            line = (f"{name:<14}{nodes:>7}{result['wall']:>10.2f}{result['cpu']:>10.2f}{result['rss']:>13.0f}"
+                    f"{result['round_trips']:>13}{result['failures']:>10}")
+            if result['error'] is not None:
+                line += f"  failed: {result['error']}"
+            print(line, flush=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,53 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures the cost of the inventory validation against the JSON schema.
+# The cold run includes loading and crawling of all schemas, the warm runs reuse the compiled validator.
+# The 1st optional argv parameter defines the number of warm runs.
+
+import sys
+import time
+
+from kubemarine import demo
+from kubemarine.core import schema
+
+# The benchmark measures the private validators registry directly.
+# pylint: disable=protected-access
+
+
+def measure(registry: schema._ValidatorRegistry, inventory: dict) -> float:
+    start = time.perf_counter()
+    _, validator = registry.get('cluster')
+    errors = list(validator.iter_errors(inventory))
+    elapsed = time.perf_counter() - start
+    assert not errors, "Inventory should be valid"
+    return elapsed * 1000
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 10
+    inventory = demo.generate_inventory(**demo.FULLHA)
+
+    registry = schema._ValidatorRegistry()
+    cold = measure(registry, inventory)
+    warm = sorted(measure(registry, inventory) for _ in range(runs))
+
+    print(f"cold: {cold:.1f} ms")
+    print(f"warm: min {warm[0]:.1f} ms, median {warm[len(warm) // 2]:.1f} ms, max {warm[-1]:.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
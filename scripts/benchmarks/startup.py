@@ -0,0 +1,69 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures startup time of `kubemarine version`, of loading of the static resources,
+# and of the unit tests collection, each in a separate process.
+# Loading of the static resources is measured without the cache, and with the cold and warm cache.
+# The 1st optional argv parameter defines the number of runs for each measurement.
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+from kubemarine.core import utils
+
+LOAD_STATIC = "from kubemarine.core import static; static.GLOBALS; static.DEFAULTS; static.KUBERNETES_VERSIONS"
+
+
+def measure(args: List[str], runs: int, env: Dict[str, str] = None, reset_cache: str = None) -> float:
+    measurements = []
+    for _ in range(runs):
+        if reset_cache is not None:
+            for filename in os.listdir(reset_cache):
+                os.remove(os.path.join(reset_cache, filename))
+
+        start = time.perf_counter()
+        subprocess.run(args, check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                       env={**os.environ, **(env or {})})
+        measurements.append((time.perf_counter() - start) * 1000)
+
+    return utils.percentile(measurements, 50)
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    python = sys.executable
+    no_cache = {utils.CACHE_DIR_ENV: ''}
+
+    print(f"kubemarine version: {measure([python, '-m', 'kubemarine', 'version'], runs, no_cache):.0f} ms")
+    print(f"load static without cache: {measure([python, '-c', LOAD_STATIC], runs, no_cache):.0f} ms")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = {utils.CACHE_DIR_ENV: cache_dir}
+        cold = measure([python, '-c', LOAD_STATIC], runs, cache, reset_cache=cache_dir)
+        warm = measure([python, '-c', LOAD_STATIC], runs, cache)
+        print(f"load static with cold cache: {cold:.0f} ms")
+        print(f"load static with warm cache: {warm:.0f} ms")
+
+        collect = [python, '-m', 'pytest', '--collect-only', '-q', 'test/unit']
+        print(f"tests collection without cache: {measure(collect, runs, no_cache):.0f} ms")
+        print(f"tests collection with warm cache: {measure(collect, runs, cache):.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+# The script measures parse time of the bundled configurations and of the original plugin manifests
+# by the round-trip ruamel loader, by the pure python safe loader, and by the loader of `utils.yaml_safe_load`.
+
+import glob
+import time
+from typing import Callable, List
+
+import yaml
+
+from kubemarine.core import utils
+
+
+def measure(contents: List[str], load_all: Callable[[str], object]) -> float:
+    start = time.perf_counter()
+    for content in contents:
+        load_all(content)
+    return (time.perf_counter() - start) * 1000
+
+
+def read(pattern: str) -> List[str]:
+    contents = []
+    for path in sorted(glob.glob(utils.get_internal_resource_path(pattern), recursive=True)):
+        with utils.open_utf8(path) as stream:
+            contents.append(stream.read())
+    return contents
+
+
+def main() -> None:
+    # pylint: disable=bad-builtin
+
+    loaders = {
+        'ruamel round-trip': lambda content: list(utils.yaml_structure_preserver().load_all(content)),
+        'pyyaml SafeLoader': lambda content: list(yaml.load_all(content, Loader=yaml.SafeLoader)),
+        f'utils.yaml_safe_load ({utils.SafeLoader.__name__})':
+            lambda content: list(yaml.load_all(content, Loader=utils.SafeLoader)),
+    }
+    for title, pattern in (('configurations', 'resources/configurations/**/*.yaml'),
+                           ('plugin manifests', 'plugins/yaml/*.yaml')):
+        contents = read(pattern)
+        print(f"{title} ({len(contents)} files):")
+        for loader, load_all in loaders.items():
+            print(f"  {loader}: {measure(contents, load_all):.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
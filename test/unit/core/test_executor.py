@@ -14,16 +14,21 @@
 import io
 import os
 import tempfile
+import threading
 import unittest
+from contextlib import contextmanager
+from unittest import mock
 
-from typing import Union, List
+from typing import Union, List, Callable, Iterator, Tuple
 
 import fabric
 import invoke
 
 from kubemarine import demo
-from kubemarine.core.executor import RunnersResult, UnexpectedExit, GenericResult, CommandTimedOut
-from kubemarine.core.group import GroupException, CollectorCallback
+from kubemarine.core.executor import (
+    RunnersResult, UnexpectedExit, GenericResult, CommandTimedOut, BatchPolicy, Callback, Token
+)
+from kubemarine.core.group import GroupException, CollectorCallback, NodeGroup
 
 
 class RemoteExecutorTest(unittest.TestCase):
@@ -364,6 +369,166 @@ class RemoteExecutorTest(unittest.TestCase):
                 self.assertEqual('a' * 100000, self.cluster.fake_fs.read(host, '/fake/path'))
 
 
+class OrderCallback(Callback):
+    def __init__(self, clock: demo.FakeClock, listener: Callable[[], None] = None):
+        self.clock = clock
+        self.listener = listener
+        self.order: List[Tuple[str, str]] = []
+        self.times: List[float] = []
+
+    def accept(self, host: str, token: Token, result: RunnersResult) -> None:
+        self.order.append((host, result.command))
+        self.times.append(self.clock.monotonic())
+        if self.listener is not None:
+            self.listener()
+
+    def finish_time(self, hosts: List[str]) -> float:
+        return max(at for (host, _), at in zip(self.order, self.times) if host in hosts)
+
+
+class BatchPolicyTest(unittest.TestCase):
+    DELAY = 0.5
+    TIMEOUT = 10
+
+    def setUp(self):
+        self.cluster = demo.new_cluster(demo.generate_inventory(**demo.MINIHA))
+        self.group = self.cluster.nodes['control-plane']
+        self.hosts = self.group.get_hosts()
+        self.slow_host = self.hosts[0]
+        self.clock = demo.FakeClock()
+
+    def _add_results(self, steps: int):
+        for i in range(steps):
+            do_type = 'run' if i % 2 == 0 else 'sudo'
+            self.cluster.fake_shell.add(demo.create_hosts_result(self.hosts, stdout=f'step{i}'),
+                                        do_type, [f'echo step{i}'])
+
+    @contextmanager
+    def _slow_first_action(self, hold: Callable[[], None]) -> Iterator[None]:
+        """
+        Emulate the slow host, whose first action does not finish until the `hold` function returns.
+        """
+        held = []
+
+        def round_trip(host: str, _: str) -> None:
+            if host == self.slow_host and not held:
+                held.append(host)
+                hold()
+
+        with mock.patch.object(self.cluster.fake_shell, 'round_trip', side_effect=round_trip):
+            yield
+
+    def _wait(self, event: threading.Event) -> None:
+        if not event.wait(timeout=self.TIMEOUT):
+            raise TimeoutError("The slow host was not released")
+
+    def _flush(self, steps: int, policy: BatchPolicy, callback: OrderCallback, group: NodeGroup = None) -> List[str]:
+        if group is None:
+            group = self.group
+        with group.new_executor(policy) as exe:
+            exe.clock = self.clock
+            for i in range(steps):
+                # Alternate run and sudo to prevent merging of the commands
+                if i % 2 == 0:
+                    exe.group.run(f'echo step{i}', callback=callback)
+                else:
+                    exe.group.sudo(f'echo step{i}', callback=callback)
+
+            exe.flush()
+            return exe.get_stragglers()
+
+    def _flush_independent_with_slow_host(self, steps: int) -> OrderCallback:
+        other_hosts = self.hosts[1:]
+        others_finished = threading.Event()
+
+        def listener() -> None:
+            if sum(host in other_hosts for host, _ in callback.order) == steps * len(other_hosts):
+                others_finished.set()
+
+        def hold() -> None:
+            # The slow host finishes its first action only after the other hosts finish all their actions
+            self._wait(others_finished)
+            self.clock.sleep(self.DELAY)
+
+        callback = OrderCallback(self.clock, listener)
+        with self._slow_first_action(hold):
+            self._flush(steps, BatchPolicy(independent=True), callback)
+
+        return callback
+
+    def test_independent_faster_than_lockstep(self):
+        steps = len(self.hosts)
+        self._add_results(steps)
+        other_hosts = self.hosts[1:]
+
+        lockstep = OrderCallback(self.clock)
+        with self._slow_first_action(lambda: self.clock.sleep(self.DELAY)):
+            self._flush(steps, BatchPolicy(), lockstep)
+
+        self.assertEqual(self.DELAY, lockstep.finish_time(other_hosts))
+
+        self.clock = demo.FakeClock()
+        independent = self._flush_independent_with_slow_host(steps)
+
+        self.assertEqual(0, independent.finish_time(other_hosts))
+        self.assertEqual(self.DELAY, independent.finish_time([self.slow_host]))
+
+    def test_order_on_each_host_preserved(self):
+        steps = len(self.hosts)
+        self._add_results(steps)
+        callback = self._flush_independent_with_slow_host(steps)
+
+        for host in self.hosts:
+            commands = [command for h, command in callback.order if h == host]
+            self.assertEqual([f'echo step{i}' for i in range(steps)], commands)
+
+    def test_straggler_deferred_to_tail(self):
+        # With the only other host, the time passes when that host does not have running actions.
+        group = self.cluster.make_group(self.hosts[:2])
+        other_host = self.hosts[1]
+        steps = 5
+        self._add_results(steps)
+        released = threading.Event()
+
+        def listener() -> None:
+            # The other host finishes its first action while the slow host still executes the first action
+            if not released.is_set() and (other_host, 'echo step0') in callback.order:
+                self.clock.sleep(self.DELAY)
+                released.set()
+
+        callback = OrderCallback(self.clock, listener)
+        with self._slow_first_action(lambda: self._wait(released)):
+            stragglers = self._flush(steps, BatchPolicy(independent=True, soft_deadline=self.DELAY * 0.6),
+                                     callback, group)
+
+        self.assertEqual([self.slow_host], stragglers)
+        self.assertEqual((self.slow_host, f'echo step{steps - 1}'), callback.order[-1])
+        self.assertEqual(steps * 2, len(callback.order))
+        other_results = [i for i, (host, _) in enumerate(callback.order) if host != self.slow_host]
+        slow_results = [i for i, (host, _) in enumerate(callback.order) if host == self.slow_host]
+        self.assertLess(max(other_results), slow_results[1], "Remaining actions of the straggler should be deferred")
+
+    def test_failed_host_does_not_stop_others(self):
+        failed_host = self.hosts[0]
+        self._add_results(2)
+        self.cluster.fake_shell.remove(failed_host, 'run', ['echo step0'])
+        self.cluster.fake_shell.remove(failed_host, 'sudo', ['echo step1'])
+        self.cluster.fake_shell.add({failed_host: demo.create_result(code=1)}, 'run', ['echo step0'])
+        self.cluster.fake_shell.add({failed_host: demo.create_result()}, 'sudo', ['echo step1'])
+
+        with self.assertRaises(GroupException) as exc:
+            self._flush(2, BatchPolicy(independent=True), OrderCallback(self.clock))
+
+        self.assertEqual([failed_host], exc.exception.get_excepted_hosts_list())
+        self.assertFalse(self.cluster.fake_shell.is_called(failed_host, 'sudo', ['echo step1']))
+        for host in self.hosts[1:]:
+            self.assertTrue(self.cluster.fake_shell.is_called(host, 'sudo', ['echo step1']))
+
+    def test_soft_deadline_requires_independent(self):
+        with self.assertRaises(ValueError):
+            BatchPolicy(soft_deadline=1)
+
+
 class ReparseFabricResultTest(unittest.TestCase):
     # pylint: disable=protected-access
 
@@ -18,12 +18,13 @@ import re
 import socket
 import unittest
 import ast
+import json
 from copy import deepcopy
 from test.unit import utils as test_utils
 
 import invoke
 
-from kubemarine.core import flow, static, utils
+from kubemarine.core import flow, static, utils, errors
 from kubemarine.core.cluster import EnrichmentStage
 from kubemarine.procedures import do
 from kubemarine import demo
@@ -574,5 +575,104 @@ class FlowTest(unittest.TestCase):
         self.light_fake_shell.add(results, do_type, command, usage_limit=1)
 
 
+class NodesCheckpointsTest(test_utils.CommonTest):
+    COMMAND = 'echo task'
+
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        self.hosts = [node['address'] for node in self.inventory['nodes']]
+        self.names = [node['name'] for node in self.inventory['nodes']]
+
+    def _new_cluster(self, args: list = None) -> demo.FakeKubernetesCluster:
+        context = demo.create_silent_context(['--dump-location', self.tmpdir] + (args or []))
+        context['execution_arguments']['disable_dump'] = False
+        utils.prepare_dump_directory(context)
+        cluster = demo.new_cluster(self.inventory, context=context)
+        flow.init_tasks_flow(cluster)
+        return cluster
+
+    def _run_task(self, cluster: demo.FakeKubernetesCluster, single_batch: bool = False) -> None:
+        def task(cluster_: demo.FakeKubernetesCluster) -> None:
+            flow.run_with_nodes_checkpoints(cluster_.nodes['all'], lambda group: group.sudo(self.COMMAND),
+                                            single_batch=single_batch)
+
+        flow.run_tasks_recursive({'prepare': {'task': task}}, ['prepare.task'], cluster, {}, [])
+
+    def _checkpoints(self) -> dict:
+        filepath = os.path.join(self.tmpdir, 'dump', flow.CHECKPOINTS_FILENAME)
+        if not os.path.isfile(filepath):
+            return {}
+
+        with utils.open_utf8(filepath) as stream:
+            return json.load(stream)['tasks']
+
+    def _called_times(self, cluster: demo.FakeKubernetesCluster) -> list:
+        return [cluster.fake_shell.called_times(host, 'sudo', [self.COMMAND]) for host in self.hosts]
+
+    def _fail_second_node(self, cluster: demo.FakeKubernetesCluster) -> None:
+        results = demo.create_hosts_result(self.hosts)
+        results[self.hosts[1]] = demo.create_result(stderr='failed', code=1)
+        cluster.fake_shell.add(results, 'sudo', [self.COMMAND])
+
+    @test_utils.temporary_directory
+    def test_failed_single_batch_records_succeeded_nodes(self):
+        cluster = self._new_cluster()
+        self._fail_second_node(cluster)
+
+        with self.assertRaises(errors.FailException):
+            self._run_task(cluster, single_batch=True)
+
+        self.assertEqual({'prepare.task': self.names[:1] + self.names[2:]}, self._checkpoints())
+        self.assertEqual([1] * len(self.hosts), self._called_times(cluster))
+        self.assertFalse(cluster.is_task_completed('prepare.task'))
+
+    @test_utils.temporary_directory
+    def test_failed_task_records_no_nodes(self):
+        cluster = self._new_cluster()
+        self._fail_second_node(cluster)
+
+        with self.assertRaises(errors.FailException):
+            self._run_task(cluster)
+
+        self.assertEqual({}, self._checkpoints())
+        self.assertEqual([1] * len(self.hosts), self._called_times(cluster))
+
+    @test_utils.temporary_directory
+    def test_resume_skips_completed_nodes(self):
+        cluster = self._new_cluster()
+        flow.add_nodes_checkpoints(cluster, 'prepare.task', cluster.make_group(self.hosts[1:]))
+
+        cluster = self._new_cluster(['--resume'])
+        cluster.fake_shell.add(demo.create_hosts_result(self.hosts), 'sudo', [self.COMMAND])
+        self._run_task(cluster)
+
+        self.assertEqual([1] + [0] * (len(self.hosts) - 1), self._called_times(cluster))
+        self.assertEqual(self.names[1:] + self.names[:1], self._checkpoints()['prepare.task'])
+        self.assertTrue(cluster.is_task_completed('prepare.task'))
+
+    @test_utils.temporary_directory
+    def test_resume_ignores_checkpoints_of_changed_inventory(self):
+        cluster = self._new_cluster()
+        flow.add_nodes_checkpoints(cluster, 'prepare.task', cluster.make_group(self.hosts))
+
+        self.inventory['services'] = {'sysctl': {'custom.parameter': 1}}
+        cluster = self._new_cluster(['--resume'])
+        cluster.fake_shell.add(demo.create_hosts_result(self.hosts), 'sudo', [self.COMMAND])
+        self._run_task(cluster)
+
+        self.assertEqual([1] * len(self.hosts), self._called_times(cluster))
+
+    @test_utils.temporary_directory
+    def test_checkpoints_ignored_without_resume(self):
+        cluster = self._new_cluster()
+        flow.add_nodes_checkpoints(cluster, 'prepare.task', cluster.make_group(self.hosts))
+
+        cluster = self._new_cluster()
+        cluster.fake_shell.add(demo.create_hosts_result(self.hosts), 'sudo', [self.COMMAND])
+        self._run_task(cluster)
+
+        self.assertEqual([1] * len(self.hosts), self._called_times(cluster))
+
+
 if __name__ == '__main__':
     unittest.main()
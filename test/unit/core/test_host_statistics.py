@@ -0,0 +1,117 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import io
+import os
+import unittest
+from unittest import mock
+from test.unit import utils as test_utils
+
+from kubemarine import demo
+from kubemarine.core import flow, utils
+from kubemarine.core.group import GroupResultException
+from kubemarine.core.host_statistics import HostStatistics, STATISTICS_FILENAME
+
+
+def run_commands(cluster: demo.FakeKubernetesCluster) -> None:
+    cluster.nodes['all'].sudo('whoami')
+    cluster.nodes['all'].put(io.StringIO('x' * 1024), '/tmp/file')
+
+
+class HostStatisticsTest(unittest.TestCase):
+    def test_record_batch(self):
+        statistics = HostStatistics()
+        self.assertTrue(statistics.is_empty())
+
+        statistics.record_batch({'10.0.0.1': 1.0, '10.0.0.2': 1.1, '10.0.0.3': 5.0}, {'10.0.0.3': 0.5}, {})
+        statistics.record_batch({'10.0.0.1': 3.0, '10.0.0.2': 1.0}, {}, {'10.0.0.1': 3 * 1024, '10.0.0.2': 1024})
+        self.assertFalse(statistics.is_empty())
+
+        self.assertEqual(['10.0.0.3', '10.0.0.1'], statistics.get_stragglers())
+        self.assertEqual(['10.0.0.3'], statistics.get_stragglers(top=1))
+
+        summary = statistics.summarize({'10.0.0.3': 'worker-3'}).split('\n')
+        self.assertTrue(summary[0].startswith('host'))
+        row = summary[3].split()
+        self.assertEqual(['worker-3', '1', '500/500/500', '4500/4500/4500', '-', '1', '3.9'], row)
+        row = summary[1].split()
+        self.assertEqual(['10.0.0.1', '2', '-', '1000/3000/3000', '1', '1', '2.0'], row)
+        self.assertIn('Top stragglers: worker-3, 10.0.0.1', summary)
+
+    def test_single_host_batch_not_gated(self):
+        statistics = HostStatistics()
+        statistics.record_batch({'10.0.0.1': 10.0}, {}, {})
+        self.assertEqual([], statistics.get_stragglers())
+        self.assertIn('Top stragglers: none', statistics.summarize())
+
+
+class ExecutorStatisticsTest(test_utils.CommonTest):
+    def test_executor_records_successful_actions(self):
+        inventory = demo.generate_inventory(**demo.MINIHA)
+        cluster = demo.new_cluster(inventory)
+        hosts = cluster.nodes['all'].get_hosts()
+        failed_host = hosts[0]
+        results = demo.create_hosts_result(hosts, stdout='root')
+        results[failed_host] = TimeoutError()
+        cluster.fake_shell.add(results, 'sudo', ['whoami'])
+
+        with self.assertRaises(GroupResultException):
+            cluster.nodes['all'].sudo('whoami')
+        cluster.nodes['all'].put(io.StringIO('x' * 1024), '/tmp/file')
+
+        summary = cluster.connection_pool.statistics.summarize().split('\n')
+        actions = {row.split()[0]: row.split()[1] for row in summary[1:len(hosts) + 1]}
+        self.assertEqual({host: '1' if host == failed_host else '2' for host in hosts}, actions)
+
+    def _new_resources(self) -> demo.FakeResources:
+        context = demo.create_silent_context()
+        args = context['execution_arguments']
+        args['disable_dump'] = False
+        args['dump_location'] = self.tmpdir
+
+        inventory = demo.generate_inventory(**demo.MINIHA)
+        resources = demo.FakeResources(context, inventory, nodes_context=demo.generate_nodes_context(inventory))
+        hosts = [node['address'] for node in inventory['nodes']]
+        resources.fake_shell.add(demo.create_hosts_result(hosts, stdout='root'), 'sudo', ['whoami'])
+        return resources
+
+    @test_utils.temporary_directory
+    def test_dump_statistics(self):
+        resources = self._new_resources()
+        inventory = resources.inventory()
+        flow.ActionsFlow([flow.TasksAction('test', {'commands': run_commands})]).run_flow(resources, print_summary=False)
+
+        with utils.open_utf8(os.path.join(self.tmpdir, 'dump', STATISTICS_FILENAME)) as stream:
+            summary = stream.read()
+        for node in inventory['nodes']:
+            self.assertIn(node['name'], summary)
+        self.assertIn('Top stragglers:', summary)
+
+    @test_utils.temporary_directory
+    def test_failed_dump_does_not_hide_error(self):
+        resources = self._new_resources()
+
+        def fail(cluster: demo.FakeKubernetesCluster) -> None:
+            run_commands(cluster)
+            raise Exception("original error")
+
+        with mock.patch.object(HostStatistics, 'dump', side_effect=OSError("no space left")), \
+                mock.patch.object(utils, 'do_fail') as do_fail:
+            flow.ActionsFlow([flow.TasksAction('test', {'fail': fail})]).run_flow(resources, print_summary=False)
+
+        do_fail.assert_called_once()
+        self.assertEqual("original error", str(do_fail.call_args[0][1]))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import re
+import unittest
+from typing import List
+
+from kubemarine import demo
+from kubemarine.core import journal
+from kubemarine.procedures import install
+
+READ_COMMAND = 'cat /etc/kubemarine/journal/sysctl'
+WRITE_COMMAND = re.compile(r"sh -c \"mkdir -p /etc/kubemarine/journal && echo '(\w+)' \| tee "
+                           r"/etc/kubemarine/journal/sysctl > /dev/null\"")
+
+
+class JournalTest(unittest.TestCase):
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        self.inventory['procedure_history'] = {'journal': True}
+        self.inventory['services'] = {'sysctl': {'custom.parameter': 1}}
+        self.applied: List[str] = []
+
+    def _new_cluster(self, args: list = None) -> demo.FakeKubernetesCluster:
+        context = demo.create_silent_context(args)
+        cluster = demo.new_cluster(self.inventory, context=context)
+        cluster.fake_shell.add(demo.create_hosts_result(cluster.nodes['all'].get_hosts()), 'sudo', [WRITE_COMMAND])
+        return cluster
+
+    def _record(self, cluster: demo.FakeKubernetesCluster, hosts: List[str],
+                recorded_cluster: demo.FakeKubernetesCluster = None) -> None:
+        if recorded_cluster is None:
+            recorded_cluster = cluster
+        inputs = journal.inventory_inputs(['services', 'sysctl'])
+        results = {}
+        for node in recorded_cluster.make_group(hosts).get_ordered_members_list():
+            results[node.get_host()] = demo.create_result(stdout=journal.fingerprint(node, inputs(node)) + '\n')
+        for host in cluster.nodes['all'].exclude_group(cluster.make_group(hosts)).get_hosts():
+            results[host] = demo.create_result(stderr='No such file or directory', code=1)
+
+        cluster.fake_shell.add(results, 'sudo', [READ_COMMAND])
+
+    def _run_task(self, cluster: demo.FakeKubernetesCluster) -> None:
+        def setup_sysctl(group):
+            self.applied.extend(group.get_hosts())
+
+        group = cluster.nodes['all']
+        journal.run_changed(group, 'sysctl', journal.inventory_inputs(['services', 'sysctl']), setup_sysctl)
+
+    def _recorded(self, cluster: demo.FakeKubernetesCluster) -> List[str]:
+        return [host for host in cluster.nodes['all'].get_hosts()
+                if cluster.fake_shell.called_times(host, 'sudo', [WRITE_COMMAND])]
+
+    def test_run_and_record_changed_nodes(self):
+        cluster = self._new_cluster()
+        hosts = cluster.nodes['all'].get_hosts()
+        self._record(cluster, hosts[:1])
+
+        self._run_task(cluster)
+
+        self.assertEqual(hosts[1:], self.applied)
+        self.assertEqual(hosts[1:], self._recorded(cluster))
+
+    def test_inputs_changed(self):
+        cluster = self._new_cluster()
+        hosts = cluster.nodes['all'].get_hosts()
+
+        self.inventory['services']['sysctl']['custom.parameter'] = 2
+        changed_cluster = self._new_cluster()
+        self._record(changed_cluster, hosts, cluster)
+        self._run_task(changed_cluster)
+
+        self.assertEqual(hosts, self.applied)
+
+    def test_patched_inputs(self):
+        cluster = self._new_cluster()
+        hosts = cluster.nodes['all'].get_hosts()
+
+        node_name = cluster.nodes['all'].get_first_member().get_node_name()
+        self.inventory['patches'] = [{'nodes': [node_name], 'services': {'sysctl': {'custom.parameter': 2}}}]
+        patched_cluster = self._new_cluster()
+        self._record(patched_cluster, hosts, cluster)
+        self._run_task(patched_cluster)
+
+        self.assertEqual(hosts[:1], self.applied)
+
+    def test_ignore_journal(self):
+        cluster = self._new_cluster(['--ignore-journal'])
+        hosts = cluster.nodes['all'].get_hosts()
+        self._record(cluster, hosts)
+
+        self._run_task(cluster)
+
+        self.assertEqual(hosts, self.applied)
+        self.assertEqual(hosts, self._recorded(cluster))
+        self.assertEqual(0, sum(cluster.fake_shell.called_times(host, 'sudo', [READ_COMMAND]) for host in hosts))
+
+    def test_journal_disabled(self):
+        self.inventory['procedure_history']['journal'] = False
+        cluster = self._new_cluster()
+        hosts = cluster.nodes['all'].get_hosts()
+
+        self._run_task(cluster)
+
+        self.assertEqual(hosts, self.applied)
+        self.assertEqual([], self._recorded(cluster))
+        self.assertEqual(0, sum(cluster.fake_shell.called_times(host, 'sudo', [READ_COMMAND]) for host in hosts))
+
+    def test_install_task_skipped(self):
+        cluster = self._new_cluster()
+        self._record(cluster, cluster.nodes['all'].get_hosts())
+
+        install.system_prepare_system_sysctl(cluster)
+
+        self.assertEqual([], self._recorded(cluster))
+
+
+if __name__ == '__main__':
+    unittest.main()
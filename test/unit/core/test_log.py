@@ -0,0 +1,156 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import logging
+import os
+import threading
+import unittest
+from typing import List
+from unittest import mock
+from test.unit import utils as test_utils
+
+from kubemarine import demo
+from kubemarine.core import log, utils
+
+
+class CollectingHandler(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: List[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+class QueuedLogTest(test_utils.CommonTest):
+    def _new_log(self, targets: List[log.LogHandler]) -> log.Log:
+        logger = log.Log('test_queued_log', targets, queued=True)
+        handler = logger.logger.handlers[0]
+        self.assertIsInstance(handler, log.QueuedHandler)
+        self.addCleanup(handler.close)
+        return logger
+
+    @test_utils.temporary_directory
+    def test_write_from_multiple_threads(self):
+        filepath = os.path.join(self.tmpdir, 'debug.log')
+        logger = self._new_log([log.LogHandler(filepath, 'verbose', format='%(message)s')]).logger
+
+        def log_lines(thread: int) -> None:
+            for i in range(100):
+                logger.debug("thread %d line %d", thread, i)
+
+        threads = [threading.Thread(target=log_lines, args=(t,)) for t in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.flush_handlers(logger)
+
+        with utils.open_utf8(filepath) as stream:
+            lines = stream.read().splitlines()
+        self.assertEqual(500, len(lines))
+        for t in range(5):
+            self.assertEqual([f"thread {t} line {i}" for i in range(100)],
+                             [line for line in lines if line.startswith(f"thread {t} ")])
+
+    @test_utils.temporary_directory
+    def test_levels_and_prefix(self):
+        filepath = os.path.join(self.tmpdir, 'debug.log')
+        logger = self._new_log([log.LogHandler(filepath, 'info', format='%(levelname)s %(message)s',
+                                               correct_newlines=True)]).logger
+
+        args = {'key': 'initial'}
+        logger.debug("hidden")
+        logger.info("%s", args)
+        args['key'] = 'changed'
+        logger.info("first\nsecond", extra={'prefix': '\t'})
+        log.flush_handlers(logger)
+
+        with utils.open_utf8(filepath) as stream:
+            self.assertEqual("INFO {'key': 'initial'}\nINFO \tfirst\nINFO \tsecond\n", stream.read())
+
+    def test_close_writes_remaining_records(self):
+        handler = log.QueuedHandler([CollectingHandler()])
+        logger = logging.getLogger('test_queued_log_close')
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        for i in range(10):
+            logger.warning("message %d", i)
+        handler.close()
+        logger.warning("after close")
+
+        target = handler.handlers[0]
+        self.assertEqual([f"message {i}" for i in range(10)] + ["after close"], target.messages)
+
+    def test_stdout_output_in_order(self):
+        logger = logging.getLogger('test_queued_log_stdout')
+        logger.setLevel(logging.DEBUG)
+        self.addCleanup(setattr, logger, 'handlers', [])
+
+        with mock.patch.object(log.LoggerWriter, 'stream', False), mock.patch('sys.stdout') as stdout:
+            target = log.StdoutHandler(log.LogFormatter(fmt='%(message)s'))
+            handler = log.QueuedHandler([target])
+            logger.addHandler(handler)
+            self.addCleanup(handler.close)
+
+            writer = log.LoggerWriter(logger, {}, '\t')
+            logger.info("before")
+            writer.write("remote output\n")
+            logger.info("after")
+            log.flush_handlers(logger)
+
+        self.assertEqual("before\nremote output\nafter\n",
+                         ''.join(call.args[0] for call in stdout.write.call_args_list))
+
+    @test_utils.temporary_directory
+    def test_queued_log_argument(self):
+        context = demo.create_silent_context(['--queued-log', '--dump-location', self.tmpdir])
+        context['execution_arguments']['disable_dump'] = False
+        utils.prepare_dump_directory(context)
+        logger = log.init_log_from_context_args({'logging': {'default_targets': {
+            'dump': {'level': 'verbose', 'format': '%(message)s'},
+            'stdout': {'level': 'info'}}}}, context, 'test_queued_log_argument').logger
+        handler = logger.handlers[0]
+        self.addCleanup(handler.close)
+
+        self.assertIsInstance(handler, log.QueuedHandler)
+        logger.debug("queued message")
+        log.flush_handlers(logger)
+        with utils.open_utf8(log.get_dump_debug_filepath(context)) as stream:
+            self.assertIn("queued message", stream.read())
+
+
+class LoggerWriterTest(unittest.TestCase):
+    def test_split_lines(self):
+        handler = CollectingHandler()
+        logger = logging.getLogger('test_logger_writer')
+        logger.setLevel(logging.DEBUG)
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+
+        with mock.patch.object(log.LoggerWriter, 'stream', False), mock.patch('sys.stdout') as stdout:
+            writer = log.LoggerWriter(logger, {}, '\t')
+            writer.write("fir")
+            writer.write("st\nsecond\r\nthi")
+            writer.write("rd")
+            writer.flush()
+            self.assertEqual(["\tfirst", "\tsecond"], handler.messages)
+            writer.flush(remainder=True)
+
+        self.assertEqual(["\tfirst", "\tsecond", "\tthird"], handler.messages)
+        self.assertEqual("first\nsecond\nthird\n", ''.join(call.args[0] for call in stdout.write.call_args_list))
+
+
+if __name__ == '__main__':
+    unittest.main()
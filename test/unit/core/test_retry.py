@@ -0,0 +1,159 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import unittest
+
+from kubemarine import demo
+from kubemarine.core.executor import RawExecutor, BatchPolicy, GroupException
+from kubemarine.core.retry import RetryPolicy, Backoff
+
+ETCD_LEADER_CHANGED_MESSAGE = 'Error from server: rpc error: code = Unavailable desc = etcdserver: leader changed'
+
+
+class RetryPolicyTest(unittest.TestCase):
+    def test_exponential_without_jitter(self):
+        policy = RetryPolicy(1, 10, jitter=False)
+        delays = [policy.next_delay(None)]
+        for _ in range(3):
+            delays.append(policy.next_delay(delays[-1]))
+
+        self.assertEqual([1, 3, 9, 10], delays)
+
+    def test_decorrelated_jitter(self):
+        delays = []
+        for _ in range(2):
+            policy = RetryPolicy(1, 30, seed=42)
+            delay = policy.next_delay(None)
+            current = [delay]
+            for _ in range(10):
+                previous, delay = delay, policy.next_delay(delay)
+                self.assertTrue(1 <= delay <= min(previous * 3, 30), f"Unexpected delay {delay} after {previous}")
+                current.append(delay)
+            delays.append(current)
+
+        self.assertEqual(delays[0], delays[1], "Delays should be deterministic for the same seed")
+        self.assertGreater(len(set(delays[0])), 2, "Delays should be randomized")
+
+    def test_invalid_delays(self):
+        with self.assertRaises(ValueError):
+            RetryPolicy(10, 5)
+
+    def test_backoff_timers_per_host(self):
+        clock = demo.FakeClock()
+        backoff = Backoff(RetryPolicy(1, 10, jitter=False), clock)
+        self.assertEqual(['host1', 'host2'], backoff.ready(['host1', 'host2']))
+
+        self.assertEqual(1, backoff.schedule('host1'))
+        self.assertEqual(3, backoff.schedule('host1'))
+        self.assertEqual(1, backoff.schedule('host2'))
+        self.assertEqual([], backoff.ready(['host1', 'host2']))
+
+        backoff.wait(['host1', 'host2'])
+        self.assertEqual(['host2'], backoff.ready(['host1', 'host2']))
+        backoff.wait(['host1'], timeout=1)
+        self.assertEqual(1, backoff.remaining('host1'))
+
+        backoff.reset('host1')
+        self.assertEqual(['host1', 'host2'], backoff.ready(['host1', 'host2']))
+        self.assertEqual([1, 1], clock.sleeps)
+
+
+class ExecutorRetryTest(unittest.TestCase):
+    COMMAND = 'kubectl describe nodes'
+
+    def setUp(self):
+        self.cluster = demo.new_cluster(demo.generate_inventory(**demo.FULLHA))
+        self.hosts = self.cluster.nodes['control-plane'].get_hosts()
+        self.clock = demo.FakeClock()
+
+    def _add_failures(self, failures: int, host: str) -> None:
+        self.cluster.fake_shell.add(demo.create_hosts_result([host], code=-1, stderr=ETCD_LEADER_CHANGED_MESSAGE),
+                                    'sudo', [self.COMMAND], usage_limit=failures)
+
+    def _flush(self, policy: BatchPolicy) -> RawExecutor:
+        self.cluster.fake_shell.add(demo.create_hosts_result(self.hosts, stdout='ok'), 'sudo', [self.COMMAND])
+        executor = RawExecutor(self.cluster, policy=policy, retry_policy=RetryPolicy(1, 10, jitter=False),
+                               clock=self.clock)
+        executor.queue(self.hosts, ('sudo', (self.COMMAND,), {'hide': True}))
+        executor.flush()
+        return executor
+
+    def _called_times(self) -> list:
+        return [self.cluster.fake_shell.called_times(host, 'sudo', [self.COMMAND]) for host in self.hosts]
+
+    def test_lockstep_retries_each_host_on_own_timer(self):
+        self._add_failures(1, self.hosts[0])
+        self._add_failures(3, self.hosts[1])
+
+        executor = self._flush(BatchPolicy())
+
+        self.assertEqual([2, 4, 1], self._called_times())
+        self.assertEqual([1, 3, 9], self.clock.sleeps)
+        for results in executor.get_flat_result().values():
+            self.assertEqual('ok', results[0].stdout)
+
+    def test_independent_retries(self):
+        self._add_failures(2, self.hosts[0])
+
+        executor = self._flush(BatchPolicy(independent=True))
+
+        self.assertEqual([3, 1, 1], self._called_times())
+        self.assertEqual(4, self.clock.time)
+        for results in executor.get_flat_result().values():
+            self.assertEqual('ok', results[0].stdout)
+
+    def test_unavoidable_error_does_not_prevent_retries_of_other_hosts(self):
+        self._add_failures(1, self.hosts[0])
+        self.cluster.fake_shell.add(demo.create_hosts_result([self.hosts[1]], code=1, stderr='unknown error'),
+                                    'sudo', [self.COMMAND], usage_limit=1)
+
+        with self.assertRaises(GroupException) as exc:
+            self._flush(BatchPolicy())
+
+        self.assertEqual([2, 1, 1], self._called_times())
+        self.assertEqual('ok', exc.exception.results[self.hosts[0]][0].stdout)
+        self.assertIsInstance(exc.exception.results[self.hosts[1]][0], Exception)
+
+    def test_wait_for_boot_polls_each_host_on_own_timer(self):
+        command = "sudo -S -p '[sudo] password: ' last reboot"
+        old_boot = demo.create_result(stdout='old boot')
+        initial_boot_history = {host: old_boot for host in self.hosts}
+        self.cluster.fake_shell.add({self.hosts[0]: old_boot}, 'run', [command], usage_limit=2)
+        self.cluster.fake_shell.add(demo.create_hosts_result(self.hosts, stdout='new boot'), 'run', [command])
+
+        results = RawExecutor(self.cluster, clock=self.clock).wait_for_boot(self.hosts, 100, initial_boot_history)
+
+        self.assertEqual({host: 'new boot' for host in self.hosts},
+                         {host: result.stdout for host, result in results.items()})
+        self.assertEqual([3, 1, 1], [self.cluster.fake_shell.called_times(host, 'run', [command])
+                                     for host in self.hosts])
+        self.assertEqual(2, len(self.clock.sleeps))
+        self.assertEqual(5, self.clock.sleeps[0])
+        self.assertTrue(5 <= self.clock.sleeps[1] <= 15)
+
+    def test_wait_for_boot_timeout(self):
+        command = "sudo -S -p '[sudo] password: ' last reboot"
+        old_boot = demo.create_result(stdout='old boot')
+        self.cluster.fake_shell.add(demo.create_hosts_result(self.hosts, stdout='old boot'), 'run', [command])
+
+        results = RawExecutor(self.cluster, clock=self.clock).wait_for_boot(
+            self.hosts, 60, {host: old_boot for host in self.hosts})
+
+        self.assertEqual({host: 'old boot' for host in self.hosts},
+                         {host: result.stdout for host, result in results.items()})
+        self.assertEqual(60, self.clock.time)
+        self.assertTrue(all(sleep <= 15 for sleep in self.clock.sleeps))
+
+
+if __name__ == '__main__':
+    unittest.main()
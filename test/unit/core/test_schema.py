@@ -13,6 +13,7 @@
 # limitations under the License.
 import glob
 import os
+import pathlib
 import unittest
 from unittest import mock
 from test.unit import utils as test_utils
@@ -20,7 +21,7 @@ from test.unit import utils as test_utils
 import yaml
 
 from kubemarine import demo, coredns, __main__, plugins
-from kubemarine.core import errors
+from kubemarine.core import errors, schema, utils
 from kubemarine.procedures import install
 
 
@@ -292,5 +293,47 @@ class TestErrorHeuristics(unittest.TestCase):
             demo.new_cluster(inventory)
 
 
+class TestValidatorRegistry(test_utils.CommonTest):
+    def setUp(self):
+        self.registry = schema._ValidatorRegistry()  # pylint: disable=protected-access
+
+    def test_validator_reused(self):
+        uri, validator = self.registry.get('cluster')
+        self.assertIs(validator, self.registry.get('cluster')[1])
+        self.assertTrue(uri.endswith('/resources/schemas/cluster.json'))
+
+        inventory = demo.generate_inventory(**demo.ALLINONE)
+        self.assertEqual([], list(validator.iter_errors(inventory)))
+
+        inventory['vrrp_ips'][0] = 123
+        self.assertNotEqual([], list(validator.iter_errors(inventory)))
+
+    def test_registry_shared_between_schemas(self):
+        self.registry.get('cluster')
+        registry = self.registry._registry  # pylint: disable=protected-access
+        self.registry.get('add_node')
+        self.assertIs(registry, self.registry._registry)  # pylint: disable=protected-access
+
+    def test_schema_not_found(self):
+        with self.assertRaisesRegex(Exception, "Failed to find schema to validate the inventory file"):
+            self.registry.get('not_existing')
+
+    @test_utils.temporary_directory
+    def test_persisted_bundle(self):
+        with mock.patch.dict(os.environ, {utils.CACHE_DIR_ENV: self.tmpdir}):
+            self.registry.get('cluster')
+
+            bundle_path = os.path.join(self.tmpdir, f'schemas-{utils.get_version()}.json')
+            self.assertTrue(os.path.isfile(bundle_path))
+
+            with mock.patch.object(pathlib.Path, 'rglob') as rglob:
+                registry = schema._ValidatorRegistry()  # pylint: disable=protected-access
+                _, validator = registry.get('cluster')
+                rglob.assert_not_called()
+
+        inventory = demo.generate_inventory(**demo.ALLINONE)
+        self.assertEqual([], list(validator.iter_errors(inventory)))
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,76 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import re
+import unittest
+from unittest import mock
+from test.unit import utils as test_utils
+
+from kubemarine.core import static, utils
+
+
+class StaticCacheTest(test_utils.CommonTest):
+    # pylint: disable=protected-access
+
+    def test_load_without_cache(self):
+        with mock.patch.dict(os.environ), \
+                test_utils.mock_call(static._load_defaults, return_value={'key': 'value'}) as run:
+            os.environ.pop(utils.CACHE_DIR_ENV, None)
+            self.assertEqual({'key': 'value'}, static._load('DEFAULTS'))
+            self.assertEqual({'key': 'value'}, static._load('DEFAULTS'))
+            self.assertEqual(2, run.call_count)
+
+    @test_utils.temporary_directory
+    def test_load_cached(self):
+        with mock.patch.dict(os.environ, {utils.CACHE_DIR_ENV: self.tmpdir}):
+            expected = static._load('DEFAULTS')
+            with test_utils.mock_call(static._load_defaults) as run:
+                self.assertEqual(expected, static._load('DEFAULTS'))
+                run.assert_not_called()
+
+    @test_utils.temporary_directory
+    def test_cache_invalidated_if_resource_changed(self):
+        with mock.patch.dict(os.environ, {utils.CACHE_DIR_ENV: self.tmpdir}):
+            static._load('DEFAULTS')
+            with test_utils.mock_call(static._load_defaults, return_value={'key': 'value'}) as run, \
+                    test_utils.mock_call(static._get_sources_stamp, return_value=[]):
+                self.assertEqual({'key': 'value'}, static._load('DEFAULTS'))
+                run.assert_called_once()
+
+    @test_utils.temporary_directory
+    def test_cache_invalidated_if_resolvers_patched(self):
+        with mock.patch.dict(os.environ, {utils.CACHE_DIR_ENV: self.tmpdir}):
+            static._load('DEFAULTS')
+            resolvers = dict(utils.SafeLoader.yaml_implicit_resolvers)
+            resolvers['-'] = resolvers.get('-', []) + [('tag:yaml.org,2002:float', re.compile('-custom'))]
+            with test_utils.mock_call(static._load_defaults, return_value={'key': 'value'}) as run, \
+                    mock.patch.object(utils.SafeLoader, 'yaml_implicit_resolvers', resolvers):
+                self.assertEqual({'key': 'value'}, static._load('DEFAULTS'))
+                run.assert_called_once()
+
+    def test_reload_in_place(self):
+        globals_ = static.GLOBALS
+        with test_utils.backup_globals():
+            globals_['nodes'] = {}
+            static.reload()
+            self.assertIs(globals_, static.GLOBALS)
+            self.assertIn('max_time_difference', globals_['nodes'])
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            _ = static.UNKNOWN
+
+
+if __name__ == '__main__':
+    unittest.main()
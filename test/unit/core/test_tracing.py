@@ -0,0 +1,104 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import json
+import os
+import unittest
+from test.unit import utils as test_utils
+
+from kubemarine import demo
+from kubemarine.core import flow, tracing, utils
+
+
+@tracing.traced('kubernetes wait')
+def wait_for_something(cluster: demo.FakeKubernetesCluster) -> None:
+    cluster.nodes['control-plane'].get_first_member().sudo('kubectl get pods')
+
+
+def run_commands(cluster: demo.FakeKubernetesCluster) -> None:
+    cluster.nodes['all'].sudo('whoami')
+    wait_for_something(cluster)
+
+
+class TracingTest(test_utils.CommonTest):
+    def test_disabled(self):
+        self.assertFalse(tracing.enabled())
+        with tracing.span('name', 'category', key='value') as span:
+            span.set_attribute('other', 'value')
+        self.assertIsNone(tracing.current_span())
+
+        func = lambda: None  # pylint: disable=unnecessary-lambda-assignment
+        self.assertIs(func, tracing.wrap(func, 'name', 'category', parent=None))
+
+    def test_nested_spans(self):
+        tracer = tracing.start()
+        try:
+            with tracing.span('outer', 'test') as outer:
+                with tracing.span('inner', 'test', key='value') as inner:
+                    self.assertIs(inner, tracing.current_span())
+                with self.assertRaises(ValueError), tracing.span('failed', 'test'):
+                    raise ValueError()
+        finally:
+            self.assertIs(tracer, tracing.stop())
+
+        spans = {span.name: span for span in tracer.spans}
+        self.assertIsNone(spans['outer'].parent_id)
+        self.assertEqual(outer.span_id, spans['inner'].parent_id)
+        self.assertEqual({'key': 'value'}, spans['inner'].attributes)
+        self.assertEqual('ValueError', spans['failed'].error)
+        self.assertIsNone(tracing.current_span())
+
+    @test_utils.temporary_directory
+    def test_trace_procedure(self):
+        context = demo.create_silent_context(['--trace'])
+        args = context['execution_arguments']
+        args['disable_dump'] = False
+        args['dump_location'] = self.tmpdir
+
+        inventory = demo.generate_inventory(**demo.MINIHA)
+        resources = demo.FakeResources(context, inventory, nodes_context=demo.generate_nodes_context(inventory))
+        hosts = [node['address'] for node in inventory['nodes']]
+        resources.fake_shell.add(demo.create_hosts_result(hosts, stdout='root'), 'sudo', ['whoami'])
+        resources.fake_shell.add(demo.create_hosts_result(hosts), 'sudo', ['kubectl get pods'])
+
+        flow.ActionsFlow([flow.TasksAction('test', {'commands': run_commands})]).run_flow(resources, print_summary=False)
+        self.assertFalse(tracing.enabled())
+
+        with utils.open_utf8(os.path.join(self.tmpdir, 'dump', tracing.OTLP_TRACE_FILENAME)) as stream:
+            otlp = json.load(stream)
+        spans = otlp['resourceSpans'][0]['scopeSpans'][0]['spans']
+        by_id = {span['spanId']: span for span in spans}
+
+        def parent_name(span: dict) -> str:
+            return by_id[span['parentSpanId']]['name']
+
+        task = next(span for span in spans if span['name'] == 'commands')
+        self.assertEqual('test', parent_name(task))
+        self.assertEqual('install', parent_name(by_id[task['parentSpanId']]))
+
+        remote_spans = [span for span in spans if span['name'] == 'sudo']
+        self.assertEqual(len(hosts) + 1, len(remote_spans))
+        for span in remote_spans:
+            self.assertEqual('batch', parent_name(span))
+
+        wait = next(span for span in spans if span['name'] == f'{__name__}.wait_for_something')
+        self.assertEqual('commands', parent_name(wait))
+
+        with utils.open_utf8(os.path.join(self.tmpdir, 'dump', tracing.CHROME_TRACE_FILENAME)) as stream:
+            chrome_trace = json.load(stream)
+        lanes = {event['args']['name'] for event in chrome_trace['traceEvents'] if event['ph'] == 'M'}
+        self.assertTrue(set(hosts) <= lanes, "Each host should have its own row")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,39 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import unittest
+
+import yaml
+
+from kubemarine.core import utils
+
+
+class YamlSafeLoadTest(unittest.TestCase):
+    def test_same_as_pure_python_loader(self):
+        resources = glob.glob(utils.get_internal_resource_path('resources/configurations/**/*.yaml'), recursive=True)
+        self.assertTrue(resources)
+        for resource in resources:
+            with self.subTest(resource), utils.open_utf8(resource) as stream:
+                content = stream.read()
+                self.assertEqual(list(yaml.load_all(content, Loader=yaml.SafeLoader)),
+                                 list(yaml.load_all(content, Loader=utils.SafeLoader)))
+
+    def test_parse_remote_output(self):
+        self.assertEqual({'items': [{'metadata': {'name': 'pod'}}]},
+                         utils.yaml_safe_load('{"items": [{"metadata": {"name": "pod"}}]}'))
+        self.assertEqual({'key': 'value'}, utils.yaml_safe_load('key: value\n'))
+
+
+if __name__ == '__main__':
+    unittest.main()
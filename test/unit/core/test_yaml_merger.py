@@ -0,0 +1,118 @@
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import glob
+import os
+import unittest
+from copy import deepcopy
+
+from deepmerge import Merger  # type: ignore[import-untyped]
+
+from kubemarine import demo
+from kubemarine.core import utils, static
+from kubemarine.core.yaml_merger import default_merger, override_merger, get_strategy_position
+
+
+def _reference_list_merger(_: Merger, path: list, base: list, nxt: list) -> list:
+    strategy, strategy_definition_position = get_strategy_position(nxt, path)
+    if strategy is None:
+        return nxt
+
+    merged = nxt[:strategy_definition_position]
+    if strategy == 'merge':
+        merged.extend(base)
+    merged.extend(nxt[(strategy_definition_position + 1):])
+    return merged
+
+EXAMPLES_DIR = os.path.join(os.path.dirname(__file__), os.pardir, os.pardir, os.pardir, 'examples')
+
+# The merger based on the deepmerge library, that was used before
+REFERENCE_DEFAULT_MERGER = Merger([(list, [_reference_list_merger]), (dict, ["merge"])], ["override"], ["override"])
+REFERENCE_OVERRIDE_MERGER = Merger([(list, ["override"]), (dict, ["merge"])], ["override"], ["override"])
+
+
+class YamlMergerTest(unittest.TestCase):
+    def _test_same_as_reference(self, base, nxt):
+        for merger, reference in ((default_merger, REFERENCE_DEFAULT_MERGER),
+                                  (override_merger, REFERENCE_OVERRIDE_MERGER)):
+            expected = reference.merge(deepcopy(base), deepcopy(nxt))
+
+            base_copy = deepcopy(base)
+            self.assertEqual(expected, merger.merge(base_copy, deepcopy(nxt)))
+            if isinstance(base, dict) and isinstance(nxt, dict):
+                self.assertEqual(expected, base_copy, "Dictionary should be merged in place")
+
+            self.assertEqual(expected, merger.merge_copy(base, deepcopy(nxt)))
+
+    def test_list_strategies(self):
+        base = {'list': [1, 2], 'dict': {'list': [{'a': 1}], 'value': 1}}
+        for nxt in (
+            {'list': [3, {'<<': 'merge'}, 4]},
+            {'list': [{'<<': 'merge'}]},
+            {'list': [3, {'<<': 'replace'}]},
+            {'list': [3]},
+            {'dict': {'list': [{'<<': 'merge'}, {'b': 2}], 'value': [1]}},
+            {'dict': {'list': {'a': 1}, 'new': [{'<<': 'merge'}]}},
+            {'list': None, 'dict': 'value'},
+        ):
+            with self.subTest(nxt=nxt):
+                self._test_same_as_reference(base, nxt)
+
+    def test_type_conflicts(self):
+        for base, nxt in (({'a': 1}, [1]), ([1], {'a': 1}), ({'a': 1}, None), ('value', {'a': 1}), (1, True)):
+            with self.subTest(base=base, nxt=nxt):
+                self._test_same_as_reference(base, nxt)
+
+    def test_invalid_strategy(self):
+        for nxt, message in (
+            ([{'<<': 'merge'}, {'<<': 'replace'}], "Found more than one merge strategy definitions at path ['a', 'b']."),
+            ([{'<<': 'unknown'}], "Unexpected merge strategy definition {'<<': 'unknown'} at path ['a', 'b']."),
+            ([{'<<': 'merge', 'key': 'value'}], "Unexpected merge strategy definition"),
+        ):
+            for merge in (default_merger.merge, default_merger.merge_copy):
+                with self.subTest(nxt=nxt), self.assertRaisesRegex(Exception, message.replace('[', '\\[')):
+                    merge({'a': {'b': [1]}}, {'a': {'b': nxt}})
+
+    def test_merge_defaults_same_as_reference(self):
+        inventories = [demo.generate_inventory(**demo.ALLINONE), demo.generate_inventory(**demo.FULLHA)]
+        for filepath in glob.glob(os.path.join(EXAMPLES_DIR, 'cluster.yaml', '*.yaml')):
+            inventories.append(utils.load_yaml(filepath))
+
+        self.assertTrue(len(inventories) > 2)
+        for inventory in inventories:
+            inventory.setdefault('services', {})['modprobe'] = {'rhel9': [{'<<': 'merge'}, {'modulename': 'custom'}]}
+            self._test_same_as_reference(static.DEFAULTS, inventory)
+
+    def test_merge_copy_does_not_change_base(self):
+        base = deepcopy(static.DEFAULTS)
+        inventory = demo.generate_inventory(**demo.MINIHA)
+        inventory['services'] = {'kubeadm': {'apiServer': {'extraArgs': {'key': 'value'}}},
+                                 'modprobe': {'rhel': [{'<<': 'merge'}]}}
+
+        merged = default_merger.merge_copy(base, inventory)
+        merged['services']['kubeadm']['apiServer']['extraArgs']['other'] = 'value'
+        merged['services']['modprobe']['rhel'][0]['modulename'] = 'changed'
+        merged['services']['ntp']['chrony']['servers'] = ['changed']
+
+        self.assertEqual(static.DEFAULTS, base)
+        self.assertIs(inventory['nodes'], merged['nodes'], "Values of the inventory should be shared")
+
+    def test_merge_copy_preserves_shared_references(self):
+        shared = [{'modulename': 'module'}]
+        merged = default_merger.merge_copy({'rhel8': shared, 'rhel9': shared}, {})
+        self.assertIsNot(shared, merged['rhel8'])
+        self.assertIs(merged['rhel8'], merged['rhel9'])
+
+
+if __name__ == '__main__':
+    unittest.main()
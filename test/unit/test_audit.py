@@ -15,8 +15,9 @@
 
 
 import unittest
+from test.unit import utils as test_utils
 
-from kubemarine import demo, audit, packages, apt, yum
+from kubemarine import demo, audit, apt, yum
 from kubemarine.demo import FakeKubernetesCluster
 
 
@@ -30,9 +31,6 @@ class TestAuditInstallation(unittest.TestCase):
         nodes_context = demo.generate_nodes_context(self.inventory, os_name='ubuntu', os_version='20.04')
         return demo.new_cluster(self.inventory, context=context, nodes_context=nodes_context)
 
-    def get_detect_package_version_cmd(self, os_family: str, package_name: str):
-        return packages.get_detect_package_version_cmd(os_family, package_name)
-
     def test_audit_installation_for_centos(self):
         context = demo.create_silent_context()
         nodes_context = demo.generate_nodes_context(self.inventory, os_name='centos', os_version='7.9')
@@ -44,9 +42,7 @@ class TestAuditInstallation(unittest.TestCase):
         service_name = package_associations['service_name']
 
         # simulate package detection command
-        exp_results1 = demo.create_nodegroup_result(cluster.nodes['control-plane'], code=1,
-                                                    stderr='package %s is not installed' % package_name)
-        cluster.fake_shell.add(exp_results1, 'sudo', [self.get_detect_package_version_cmd('rhel', package_name)])
+        test_utils.stub_detect_packages(cluster, {package_name: {}})
 
         # simulate package installation command
         installation_command = [yum.get_install_cmd(cluster, package_name)]
@@ -68,9 +64,7 @@ class TestAuditInstallation(unittest.TestCase):
         service_name = package_associations['service_name']
 
         # simulate package detection command
-        exp_results1 = demo.create_nodegroup_result(cluster.nodes['control-plane'], code=1,
-                                                    stderr='dpkg-query: no packages found matching %s' % package_name)
-        cluster.fake_shell.add(exp_results1, 'sudo', [self.get_detect_package_version_cmd('debian', package_name)])
+        test_utils.stub_detect_packages(cluster, {package_name: {}})
 
         # simulate package installation command
         installation_command = [apt.get_install_cmd(cluster, package_name)]
@@ -92,9 +86,9 @@ class TestAuditInstallation(unittest.TestCase):
         package_name = package_associations['package_name']
 
         # simulate package detection command
-        exp_results = demo.create_nodegroup_result(cluster.nodes['control-plane'], code=0,
-                                                   stdout='%s=1:2.8.5-2ubuntu6' % package_name)
-        cluster.fake_shell.add(exp_results, 'sudo', [self.get_detect_package_version_cmd('debian', package_name)])
+        test_utils.stub_detect_packages(cluster, {
+            package_name: {host: '%s=1:2.8.5-2ubuntu6' % package_name for host in cluster.nodes['all'].get_hosts()}
+        })
 
         # run task
         audit.install(cluster.nodes['control-plane'])
@@ -107,16 +101,10 @@ class TestAuditInstallation(unittest.TestCase):
         service_name = package_associations['service_name']
 
         # simulate package detection command with partly installed audit
-        host_to_result = {
-            '10.101.1.2': demo.create_result(stdout='%s=1:2.8.5-2ubuntu6' % package_name,
-                                             code=0),
-            '10.101.1.3': demo.create_result(stderr='dpkg-query: no packages found matching %s' % package_name,
-                                             code=1),
-            '10.101.1.4': demo.create_result(stdout='%s=1:2.8.5-2ubuntu6' % package_name,
-                                             code=0)
-        }
-        exp_results1 = demo.create_nodegroup_result_by_hosts(cluster, host_to_result)
-        cluster.fake_shell.add(exp_results1, 'sudo', [self.get_detect_package_version_cmd('debian', package_name)])
+        test_utils.stub_detect_packages(cluster, {package_name: {
+            '10.101.1.2': '%s=1:2.8.5-2ubuntu6' % package_name,
+            '10.101.1.4': '%s=1:2.8.5-2ubuntu6' % package_name,
+        }})
 
         # simulate package installation command
         installation_command = [apt.get_install_cmd(cluster, package_name)]
@@ -0,0 +1,206 @@
+#!/usr/bin/env python3
+# Copyright 2021-2023 NetCracker Technology Corporation
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#      http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+import unittest
+from test.unit import utils as test_utils
+
+from jinja2 import Template
+
+from kubemarine import demo, system
+from kubemarine.core import static, utils
+from kubemarine.procedures import check_iaas
+from kubemarine.testsuite import TestSuite
+
+
+class MeshPortClientTest(test_utils.CommonTest):
+    def _render(self, parallelism: int = 4, failures_limit: int = 10) -> str:
+        return Template(utils.read_internal('resources/scripts/mesh_port_client.py')).render({
+            'proto': 'tcp', 'timeout': 2, 'mtu': 100, 'parallelism': parallelism, 'failures_limit': failures_limit,
+        })
+
+    def _echo_server(self) -> socket.socket:
+        server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        server.bind(('127.0.0.1', 0))
+        server.listen(16)
+
+        def serve():
+            while True:
+                try:
+                    client, _ = server.accept()
+                except OSError:
+                    return
+                with client:
+                    data = client.recv(100)
+                    while data:
+                        client.sendall(data)
+                        data = client.recv(100)
+
+        threading.Thread(target=serve, daemon=True).start()
+        return server
+
+    def _free_port(self) -> int:
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.bind(('127.0.0.1', 0))
+            return s.getsockname()[1]
+
+    @test_utils.temporary_directory
+    def test_probe_targets(self):
+        script = os.path.join(self.tmpdir, 'client.py')
+        targets = os.path.join(self.tmpdir, 'targets.txt')
+
+        server = self._echo_server()
+        try:
+            open_port = server.getsockname()[1]
+            closed_port = self._free_port()
+            with utils.open_external(script, 'w') as f:
+                f.write(self._render())
+            with utils.open_external(targets, 'w') as f:
+                f.write(f"send {open_port} 127.0.0.1 4\n"
+                        f"connect {open_port} 127.0.0.1 4\n"
+                        f"connect {closed_port} 127.0.0.1 4\n")
+
+            output = subprocess.run([sys.executable, script, targets],
+                                    capture_output=True, text=True, check=True).stdout
+        finally:
+            server.close()
+
+        lines = output.strip().split('\n')
+        self.assertEqual('DONE', lines[-1])
+        self.assertEqual(1, len(lines[:-1]), "Only one probe should fail")
+        self.assertTrue(lines[0].startswith(f"FAIL 127.0.0.1 {closed_port} "))
+
+    @test_utils.temporary_directory
+    def test_failures_limit(self):
+        script = os.path.join(self.tmpdir, 'client.py')
+        targets = os.path.join(self.tmpdir, 'targets.txt')
+
+        closed_port = self._free_port()
+        with utils.open_external(script, 'w') as f:
+            f.write(self._render(parallelism=1, failures_limit=2))
+        with utils.open_external(targets, 'w') as f:
+            f.write(f"connect {closed_port} 127.0.0.1 4\n" * 5)
+
+        output = subprocess.run([sys.executable, script, targets],
+                                capture_output=True, text=True, check=True).stdout
+
+        lines = output.strip().split('\n')
+        self.assertEqual(['SKIPPED 3', 'DONE'], lines[-2:])
+        self.assertEqual(2, len([line for line in lines if line.startswith('FAIL ')]))
+
+
+class ConnectBetweenAllNodesTest(unittest.TestCase):
+    def test_single_round_trip(self):
+        inventory = demo.generate_inventory(**demo.MINIHA)
+        context = demo.create_silent_context(procedure='check_iaas')
+        cluster = demo.new_cluster(inventory, context=context)
+        for host in cluster.nodes['all'].get_hosts():
+            cluster.nodes_context[host]['python'] = {'executable': 'python3'}
+
+        hosts = cluster.nodes['all'].get_hosts()
+        host_to_ip = {host: cluster.get_node(host)['internal_address'] for host in hosts}
+        listened_ports = {host: [('6443', False)] for host in hosts}
+
+        failed_target = hosts[2]
+        for host in hosts:
+            stdout = 'DONE\n'
+            if host == hosts[0]:
+                stdout = f"FAIL {host_to_ip[failed_target]} 6443 timed out\n" + stdout
+            results = demo.create_hosts_result([host], stdout=stdout)
+            cluster.fake_shell.add(results, 'run', [
+                f"python3 /tmp/client.py /tmp/targets.txt; rm -f /tmp/client.py /tmp/targets.txt"])
+
+        with test_utils.mock_remote_tmp_paths(['client', 'targets']):
+            failed = check_iaas.check_connect_between_all_nodes(
+                cluster, listened_ports, host_to_ip, 'internal', 'tcp', 1410)
+
+        self.assertEqual({failed_target: ['6443']}, failed)
+        for host in hosts:
+            targets = cluster.fake_fs.read(host, '/tmp/targets.txt').strip().split('\n')
+            self.assertEqual(len(hosts) - 1, len(targets), "Each node should probe all peers")
+
+
+class SSHLatencyTest(unittest.TestCase):
+    def setUp(self):
+        inventory = demo.generate_inventory(**demo.FULLHA)
+        context = demo.create_silent_context(procedure='check_iaas')
+        self.cluster = demo.new_cluster(inventory, context=context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+        self.hosts = self.cluster.nodes['all'].get_hosts()
+
+    def test_percentile(self):
+        values = [5, 1, 4, 2, 3]
+        self.assertEqual(3, utils.percentile(values, 50))
+        self.assertEqual(5, utils.percentile(values, 95))
+        self.assertEqual(1, utils.percentile(values, 1))
+        self.assertEqual(5, utils.percentile(values, 100))
+
+    def test_sample_all_nodes(self):
+        self.cluster.fake_shell.add(demo.create_nodegroup_result(self.cluster.nodes['all'], stdout='1'),
+                                    'run', ['echo 1'])
+        check_iaas.connection_ssh_latency_single(self.cluster)
+
+        self.assertTrue(self.ts.tcs[0].is_succeeded())
+        for host in self.hosts:
+            self.assertEqual(5, self.cluster.fake_shell.called_times(host, 'run', ['echo 1']))
+
+    def test_sampling_parallelism(self):
+        lock = threading.Lock()
+        running = []
+        max_running = []
+
+        def sample(node):
+            with lock:
+                running.append(node.get_host())
+                max_running.append(len(running))
+            time.sleep(0.05)
+            with lock:
+                running.remove(node.get_host())
+            return node.get_host()
+
+        with test_utils.backup_globals():
+            static.GLOBALS['connection']['sampling_parallelism'] = 2
+            results = system.sample_nodes_concurrently(self.cluster.nodes['all'], sample)
+
+        self.assertEqual({host: host for host in self.hosts}, results)
+        self.assertEqual(2, max(max_running))
+
+    def test_outlier(self):
+        host_measurements = {host: [10.0] * 5 for host in self.hosts}
+        host_measurements[self.hosts[-1]] = [500.0] * 5
+        with test_utils.mock_call(check_iaas.sample_ssh_latency, return_value=host_measurements):
+            check_iaas.connection_ssh_latency_single(self.cluster)
+
+        tc = self.ts.tcs[0]
+        self.assertTrue(tc.is_warned())
+        self.assertIn(self.cluster.get_node_name(self.hosts[-1]), tc.results.hint)
+
+    def test_upload_throughput(self):
+        self.cluster.fake_shell.add(demo.create_nodegroup_result(self.cluster.nodes['all']),
+                                    'run', ['rm -f /tmp/throughput'])
+        with test_utils.mock_remote_tmp_paths(['throughput']):
+            check_iaas.connection_ssh_throughput(self.cluster)
+
+        self.assertFalse(self.ts.tcs[0].is_failed())
+        for host in self.hosts:
+            self.assertEqual(1024 * 1024, len(self.cluster.fake_fs.read(host, '/tmp/throughput')))
+
+
+if __name__ == '__main__':
+    unittest.main()
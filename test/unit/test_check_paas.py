@@ -12,10 +12,20 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
+import time
+import re
 import unittest
+from unittest import mock
+from typing import List, Dict
 
-from kubemarine import demo
+import toml
+
+from kubemarine import demo, thirdparties, kubernetes, sysctl, system, modprobe, selinux, audit
+from kubemarine.cri import containerd
 from kubemarine.core import errors
+from kubemarine.procedures import check_paas
+from kubemarine.testsuite import TestSuite
 
 
 class EnrichmentValidation(unittest.TestCase):
@@ -44,5 +54,334 @@ class EnrichmentValidation(unittest.TestCase):
         self._new_cluster()
 
 
+class ThirdpartiesHashes(unittest.TestCase):
+    destination = '/usr/bin/custom.tar.gz'
+
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.ALLINONE)
+        self.inventory['services']['thirdparties'] = {
+            self.destination: {
+                'source': 'https://example.com/custom.tar.gz',
+                'sha1': 'archive-sha',
+                'unpack': '/usr/bin/custom'
+            }
+        }
+        self.context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+
+    def _run_check(self, lookup_stdout: str, cluster: demo.FakeKubernetesCluster = None) -> TestSuite:
+        if cluster is None:
+            cluster = demo.new_cluster(self.inventory, context=self.context)
+        cluster.context['testsuite'] = ts = TestSuite()
+        # leave only the custom thirdparty to check
+        thirdparties_ = cluster.inventory['services']['thirdparties']
+        cluster.inventory['services']['thirdparties'] = {self.destination: thirdparties_[self.destination]}
+        all_nodes = cluster.nodes['all']
+        cluster.fake_shell.add(demo.create_nodegroup_result(all_nodes), 'sudo', [f'ls {self.destination}'])
+        cluster.fake_shell.add(demo.create_nodegroup_result(all_nodes, stdout=lookup_stdout),
+                               'sudo', [thirdparties.get_registry_lookup_command(self.destination)])
+
+        check_paas.thirdparties_hashes(cluster)
+        return ts
+
+    def test_registry_cached(self):
+        ts = self._run_check('archive-sha cached /usr/bin/custom.tar.gz\n'
+                             'file-sha cached /usr/bin/custom/./bin\n')
+        self.assertTrue(ts.tcs[0].is_succeeded())
+
+    def test_registry_sha_mismatch(self):
+        ts = self._run_check('other-sha hashed /usr/bin/custom.tar.gz\n')
+        self.assertTrue(ts.tcs[0].is_failed())
+
+    def test_registry_archive_deleted(self):
+        ts = self._run_check('- missing /usr/bin/custom.tar.gz\n')
+        self.assertTrue(ts.tcs[0].is_failed())
+        self.assertIn('/usr/bin/custom.tar.gz is missing', ts.tcs[0].results.hint)
+
+    def test_registry_unpacked_file_deleted(self):
+        ts = self._run_check('archive-sha cached /usr/bin/custom.tar.gz\n'
+                             '- missing /usr/bin/custom/./bin\n')
+        self.assertTrue(ts.tcs[0].is_failed())
+        self.assertIn('file /usr/bin/custom/./bin unpacked from archive /usr/bin/custom.tar.gz is missing',
+                      ts.tcs[0].results.hint)
+
+    def test_registry_unpacked_file_modified(self):
+        cluster = demo.new_cluster(self.inventory, context=self.context)
+        verify_command = re.compile(r'tar tf /usr/bin/custom\.tar\.gz .*')
+        cluster.fake_shell.add(demo.create_nodegroup_result(cluster.nodes['all'], stdout='./bin file-sha other-sha'),
+                               'sudo', [verify_command])
+        ts = self._run_check('archive-sha cached /usr/bin/custom.tar.gz\n'
+                             'other-sha hashed /usr/bin/custom/./bin\n', cluster)
+        self.assertTrue(ts.tcs[0].is_failed())
+        self.assertIn('hash for file ./bin from archive /usr/bin/custom.tar.gz', ts.tcs[0].results.hint)
+        host = cluster.nodes['all'].get_any_member().get_host()
+        self.assertEqual(1, cluster.fake_shell.called_times(host, 'sudo', [verify_command]))
+
+
+class NodesPidMax(unittest.TestCase):
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        self.context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+        self.cluster = demo.new_cluster(self.inventory, context=self.context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+        self.group = self.cluster.make_group_from_roles(['control-plane', 'worker'])
+
+        nodes_description = {'items': [{'metadata': {'name': node['name']}, 'status': {'capacity': {'pods': '110'}}}
+                                       for node in self.cluster.inventory['nodes']]}
+        self.cluster.fake_shell.add(demo.create_nodegroup_result(self.cluster.nodes['control-plane'],
+                                                                 stdout=json.dumps(nodes_description)),
+                                    'sudo', [kubernetes.get_nodes_description_cmd()])
+
+    def _stub_node(self, host: str, pid_max: int, pod_pids_limit: int):
+        results = {host: demo.create_result(stdout=str(pid_max))}
+        self.cluster.fake_shell.add(results, 'sudo', ['cat /proc/sys/kernel/pid_max'])
+        results = {host: demo.create_result(stdout=f'podPidsLimit: {pod_pids_limit}\n')}
+        self.cluster.fake_shell.add(results, 'sudo', ['cat /var/lib/kubelet/config.yaml'])
+
+    def test_success(self):
+        for node in self.group.get_ordered_members_list():
+            self._stub_node(node.get_host(), sysctl.get_parameter(self.cluster, node, 'kernel.pid_max'), 4096)
+
+        check_paas.nodes_pid_max(self.cluster)
+        self.assertTrue(self.ts.tcs[0].is_succeeded())
+        self.assertEqual(1, sum(self.cluster.fake_shell.called_times(host, 'sudo', [kubernetes.get_nodes_description_cmd()])
+                                for host in self.cluster.nodes['control-plane'].get_hosts()),
+                         "Nodes should be described once")
+
+    def test_failed_and_warned(self):
+        nodes = self.group.get_ordered_members_list()
+        for node in nodes:
+            pid_max = sysctl.get_parameter(self.cluster, node, 'kernel.pid_max')
+            if node is nodes[0]:
+                pid_max = 1000
+            elif node is nodes[-1]:
+                pid_max += 1
+            self._stub_node(node.get_host(), pid_max, 4096)
+
+        check_paas.nodes_pid_max(self.cluster)
+        tc = self.ts.tcs[0]
+        self.assertTrue(tc.is_failed())
+        self.assertIn(f"For node {nodes[0].get_node_name()} pid_max value = '1000'", tc.results.hint)
+        self.assertNotIn(nodes[-1].get_node_name(), tc.results.hint)
+
+
+class ControlPlaneHealthStatus(unittest.TestCase):
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        self.context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+        self.cluster = demo.new_cluster(self.inventory, context=self.context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+
+    def _pod(self, name: str, running: bool = True) -> dict:
+        state = {'running': {'startedAt': '2024-01-01T00:00:00Z'}} if running else {'waiting': {'reason': 'Error'}}
+        return {'metadata': {'name': name}, 'status': {'containerStatuses': [{'state': state}]}}
+
+    def _run(self, pods: list) -> None:
+        first_control_plane = self.cluster.nodes['control-plane'].get_first_member()
+        results = demo.create_nodegroup_result(first_control_plane, stdout=json.dumps({'items': pods}))
+        self.cluster.fake_shell.add(results, 'sudo', ['kubectl get pods -n kube-system -l tier=control-plane -o json'])
+        check_paas.control_plane_health_status(self.cluster)
+
+    def _pod_names(self) -> list:
+        return [f'{pod}-{node.get_node_name()}'
+                for node in self.cluster.nodes['control-plane'].get_ordered_members_list()
+                for pod in ('kube-apiserver', 'kube-controller-manager', 'kube-scheduler', 'etcd')]
+
+    def test_all_running(self):
+        self._run([self._pod(name) for name in self._pod_names()])
+        self.assertTrue(self.ts.tcs[0].is_succeeded())
+
+    def test_report_all_unhealthy(self):
+        names = self._pod_names()
+        pods = [self._pod(name, running=i != 0) for i, name in enumerate(names[:-1])]
+        self._run(pods)
+
+        tc = self.ts.tcs[0]
+        self.assertTrue(tc.is_failed())
+        self.assertIn(names[0], tc.results.hint)
+        self.assertIn(names[-1], tc.results.hint)
+        self.assertNotIn(names[1], tc.results.hint)
+
+
+class ContainerdConfigurationCheck(unittest.TestCase):
+    registry = 'some-registry:8080'
+
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.FULLHA)
+        self.inventory['services']['cri'] = {
+            'containerdRegistriesConfig': {
+                self.registry: {
+                    'host."https://some-registry:8080"': {'capabilities': ['pull', 'resolve']}
+                }
+            }
+        }
+        context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+        self.cluster = demo.new_cluster(self.inventory, context=context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+        self.hosts = self.cluster.make_group_from_roles(['control-plane', 'worker']).get_hosts()
+
+        cri = self.cluster.inventory['services']['cri']
+        self.config = containerd.get_config_as_toml(cri['containerdConfig'])
+        self.config_path = containerd._get_registries_config_path(self.config)  # pylint: disable=protected-access
+        self.registry_config = containerd.get_config_as_toml(cri['containerdRegistriesConfig'][self.registry])
+
+    def _stub(self, changed_host: str):
+        config_location = '/etc/containerd/config.toml'
+        hosts_toml = f'{self.config_path}/{self.registry}/hosts.toml'
+        for host in self.hosts:
+            config = self.config
+            if host == changed_host:
+                config = {**config, 'version': 3}
+
+            hash_ = 'changed' if host == changed_host else 'same'
+            self.cluster.fake_shell.add(demo.create_hosts_result([host], stdout=f'{hash_}  {config_location}\n'),
+                                        'sudo', [f'sha256sum {config_location}'])
+            self.cluster.fake_shell.add(demo.create_hosts_result([host], stdout=toml.dumps(config)),
+                                        'sudo', [f'cat {config_location}'])
+            self.cluster.fake_shell.add(
+                demo.create_hosts_result([host], stdout=f'registry  {hosts_toml}\n'),
+                'sudo', [f'find {self.config_path} -mindepth 2 -maxdepth 2 -name hosts.toml -exec sha256sum {{}} +'])
+            self.cluster.fake_shell.add(demo.create_hosts_result([host], stdout=toml.dumps(self.registry_config)),
+                                        'sudo', [f'cat {hosts_toml}'])
+
+    def _called_times(self, cmd: str) -> int:
+        return sum(self.cluster.fake_shell.called_times(host, 'sudo', [cmd]) for host in self.hosts)
+
+    def test_fetch_distinct_configurations(self):
+        self._stub(self.hosts[-1])
+        check_paas.container_runtime_configuration_check(self.cluster)
+
+        self.assertTrue(self.ts.tcs[0].is_failed())
+        self.assertEqual(2, self._called_times('cat /etc/containerd/config.toml'))
+        self.assertEqual(1, self._called_times(f'cat {self.config_path}/{self.registry}/hosts.toml'))
+
+    def test_fetch_shared_objects(self):
+        self._stub(self.hosts[-1])
+        configs, registries = containerd.fetch_containerd_config(
+            self.cluster.make_group_from_roles(['control-plane', 'worker']))
+
+        self.assertIs(configs[self.hosts[0]], configs[self.hosts[1]])
+        self.assertIsNot(configs[self.hosts[0]], configs[self.hosts[-1]])
+        self.assertEqual(3, configs[self.hosts[-1]]['version'])
+        for host in self.hosts:
+            self.assertIs(registries[self.hosts[0]], registries[host])
+            self.assertEqual({self.registry: self.registry_config}, registries[host])
+
+    def test_valid(self):
+        self._stub('')
+        check_paas.container_runtime_configuration_check(self.cluster)
+
+        self.assertTrue(self.ts.tcs[0].is_succeeded())
+        self.assertEqual(1, self._called_times('cat /etc/containerd/config.toml'))
+
+
+class TimeSync(unittest.TestCase):
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+        self.cluster = demo.new_cluster(self.inventory, context=context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+        self.hosts = self.cluster.nodes['all'].get_hosts()
+
+    def _stub(self, offsets_ms: Dict[str, int]):
+        now_ns = int(time.time() * 1000) * 1000000
+        for host in self.hosts:
+            self.cluster.fake_shell.add(
+                demo.create_hosts_result([host], stdout=str(now_ns + offsets_ms.get(host, 0) * 1000000)),
+                'run', ['date +%s%N'])
+
+    def test_measure_offset(self):
+        self._stub({self.hosts[0]: 5000, self.hosts[1]: -3000})
+        offsets = system.measure_nodes_clock_offset(self.cluster.nodes['all'], samples=3)
+
+        skew, uncertainty = system.get_clock_skew(offsets)
+        self.assertAlmostEqual(8000, skew, delta=uncertainty + 1000)
+        for host in self.hosts:
+            self.assertEqual(3, self.cluster.fake_shell.called_times(host, 'run', ['date +%s%N']))
+
+    def test_time_synced(self):
+        self._stub({})
+        check_paas.verify_time_sync(self.cluster)
+        self.assertTrue(self.ts.tcs[0].is_succeeded())
+        self.assertIn('±', self.ts.tcs[0].results)
+
+    def test_time_not_synced(self):
+        self._stub({self.hosts[-1]: 60000})
+        check_paas.verify_time_sync(self.cluster)
+        self.assertTrue(self.ts.tcs[0].is_warned())
+
+    def test_clock_skew_exceeded(self):
+        self._stub({self.hosts[-1]: 60000})
+        self.assertTrue(system.is_clock_skew_exceeded(self.cluster.nodes['all']))
+
+    def test_clock_skew_within_uncertainty(self):
+        offsets = {host: (0.0, 1.0) for host in self.hosts}
+        offsets[self.hosts[-1]] = (15500.0, 1000.0)
+        with mock.patch.object(system, 'measure_nodes_clock_offset', return_value=offsets):
+            self.assertFalse(system.is_clock_skew_exceeded(self.cluster.nodes['all']))
+
+        offsets[self.hosts[-1]] = (17500.0, 1000.0)
+        with mock.patch.object(system, 'measure_nodes_clock_offset', return_value=offsets):
+            self.assertTrue(system.is_clock_skew_exceeded(self.cluster.nodes['all']))
+
+
+class SystemSnapshot(unittest.TestCase):
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.MINIHA)
+        self.context = demo.create_silent_context(['fake.yaml'], procedure='check_paas')
+        self.cluster = demo.new_cluster(self.inventory, context=self.context)
+        self.cluster.context['testsuite'] = self.ts = TestSuite()
+        self.hosts = self.cluster.nodes['all'].get_hosts()
+
+    def _stub(self, swap_enabled_host: str = None) -> List[str]:
+        swaps_header = 'Filename\tType\tSize\tUsed\tPriority\n'
+        commands = {
+            system.get_swap_status_cmd(): {
+                host: demo.create_result(stdout=swaps_header + ('/swap.img\tfile\t2097148\t0\t-2'
+                                                                if host == swap_enabled_host else ''))
+                for host in self.hosts},
+            system.get_firewalld_status_cmd(): {host: demo.create_result(code=4) for host in self.hosts},
+            'lsmod': {host: demo.create_result(stdout='Module\tSize\tUsed by') for host in self.hosts},
+            f'cat {modprobe.predefined_file_path}': {host: demo.create_result() for host in self.hosts},
+            'sysctl -a': {host: demo.create_result() for host in self.hosts},
+            selinux.get_selinux_status_cmd(): {host: demo.create_result() for host in self.hosts},
+        }
+        audit_hosts = self.cluster.make_group_from_roles(['control-plane', 'worker']).get_hosts()
+        commands[audit.get_audit_rules_cmd(self.cluster, audit_hosts[0])] = \
+            {host: demo.create_result() for host in audit_hosts}
+
+        for cmd, results in commands.items():
+            self.cluster.fake_shell.add(results, 'sudo', [cmd])
+
+        return list(commands)
+
+    def test_single_round_trip(self):
+        commands = self._stub()
+        check_paas.verify_swap_state(self.cluster)
+        check_paas.verify_firewalld_status(self.cluster)
+
+        for tc in self.ts.tcs:
+            self.assertTrue(tc.is_succeeded())
+        for host in self.hosts:
+            self.assertEqual(1, self.cluster.fake_shell.called_times(host, 'sudo', [commands[0]]),
+                             "System state should be collected once")
+
+    def test_snapshot_not_shared_between_clusters(self):
+        self._stub()
+        snapshot = check_paas.get_system_snapshot(self.cluster)
+
+        # The cluster can be re-created from the same context, for example, by DynamicResources
+        self.cluster = demo.new_cluster(self.inventory, context=self.context)
+        commands = self._stub()
+        self.assertIsNot(snapshot, check_paas.get_system_snapshot(self.cluster))
+        for host in self.hosts:
+            self.assertEqual(1, self.cluster.fake_shell.called_times(host, 'sudo', [commands[0]]),
+                             "System state should be collected for the new cluster")
+
+    def test_swap_enabled(self):
+        self._stub(swap_enabled_host=self.hosts[0])
+        check_paas.verify_swap_state(self.cluster)
+        self.assertTrue(self.ts.tcs[0].is_failed())
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -15,8 +15,10 @@
 
 
 import io
+import ipaddress
 import os.path
 import tempfile
+import re
 import unittest
 
 from kubemarine import demo, system
@@ -28,6 +30,17 @@ class TestInventoryGenerator(unittest.TestCase):
         inventory = demo.generate_inventory(balancer=1, control_plane=3, worker=3)
         self.assertEqual(7, len(inventory['nodes']), msg="The received number of nodes does not match the expected")
 
+    def test_large_inventory_addresses(self):
+        inventory = demo.generate_inventory(balancer=1, control_plane=3, worker=996)
+        for address_key in ('address', 'internal_address'):
+            addresses = [node[address_key] for node in inventory['nodes']]
+            self.assertEqual(len(addresses), len(set(addresses)), "Addresses should be unique")
+            for address in addresses:
+                ipaddress.ip_address(address)
+
+        self.assertEqual('10.101.1.1', inventory['nodes'][0]['address'])
+        self.assertEqual('192.168.0.254', inventory['nodes'][253]['internal_address'])
+
 
 class TestNewCluster(unittest.TestCase):
 
@@ -73,6 +86,61 @@ class TestFakeShell(unittest.TestCase):
                              msg="Wrong number of reboots in history")
 
 
+    def test_usage_limit_order(self):
+        host = self.cluster.nodes['all'].get_hosts()[0]
+        shell = self.cluster.fake_shell
+        shell.add({host: demo.create_result(stdout='first')}, 'run', ['whoami'], usage_limit=1)
+        shell.add({host: demo.create_result(stdout='second')}, 'run', ['whoami'])
+
+        self.assertEqual('first', shell.find(host, 'run', ['whoami']).stdout)
+        self.assertEqual('second', shell.find(host, 'run', ['whoami']).stdout)
+        self.assertEqual('second', shell.find(host, 'run', ['whoami']).stdout)
+        self.assertEqual(3, shell.called_times(host, 'run', ['whoami']))
+        self.assertIsNone(shell.find(host, 'sudo', ['whoami']))
+
+    def test_pattern_fallback(self):
+        host = self.cluster.nodes['all'].get_hosts()[0]
+        shell = self.cluster.fake_shell
+        shell.add({host: demo.create_result(stdout='pattern')}, 'sudo', [re.compile(r'cat /etc/.*')], usage_limit=1)
+        shell.add({host: demo.create_result(stdout='exact')}, 'sudo', ['cat /etc/hosts'])
+
+        self.assertEqual('pattern', shell.find(host, 'sudo', ['cat /etc/hosts']).stdout,
+                         msg="Pattern added earlier should take precedence")
+        self.assertEqual('exact', shell.find(host, 'sudo', ['cat /etc/hosts']).stdout)
+        self.assertIsNone(shell.find(host, 'sudo', ['cat /etc/resolv.conf']),
+                          msg="Exhausted pattern should not match")
+
+    def test_remove(self):
+        host = self.cluster.nodes['all'].get_hosts()[0]
+        shell = self.cluster.fake_shell
+        shell.add({host: demo.create_result(stdout='root')}, 'sudo', ['whoami'])
+
+        self.assertEqual(['root'], [result.stdout for result in shell.remove(host, 'sudo', ['whoami'])])
+        self.assertEqual([], shell.remove(host, 'sudo', ['whoami']))
+        self.assertIsNone(shell.find(host, 'sudo', ['whoami']))
+
+    def test_emulation_hooks(self):
+        round_trips = []
+
+        class EmulatingShell(demo.FakeShell):
+            def round_trip(self, host: str, do_type: str) -> None:
+                round_trips.append((host, do_type))
+
+            def default_result(self, host: str, do_type: str, command: str, hide: bool):
+                return demo.create_result(stdout=f'{do_type} {command}', hide=hide)
+
+        inventory = demo.generate_inventory(**demo.FULLHA)
+        resources = demo.FakeResources(demo.create_silent_context(), inventory,
+                                       nodes_context=demo.generate_nodes_context(inventory),
+                                       fake_shell=EmulatingShell())
+        cluster = resources.cluster()
+
+        results = cluster.nodes['all'].sudo('whoami')
+        for result in results.values():
+            self.assertEqual('sudo whoami', result.stdout)
+        self.assertEqual({(host, 'sudo') for host in cluster.nodes['all'].get_hosts()}, set(round_trips))
+
+
 class TestFakeFS(unittest.TestCase):
 
     def setUp(self):
@@ -12,9 +12,12 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+import json
 import unittest
 from textwrap import dedent
 
+import yaml
+
 from kubemarine import demo, kubernetes
 from kubemarine.core import summary
 
@@ -59,7 +62,7 @@ class TestInventoryValidation(unittest.TestCase):
                   type: NetworkUnavailable
             """.rstrip()
         )
-        get_nodes = demo.create_nodegroup_result(cluster.nodes['control-plane'], stdout=stdout)
+        get_nodes = demo.create_nodegroup_result(cluster.nodes['control-plane'], stdout=json.dumps(yaml.safe_load(stdout)))
         cluster.fake_shell.add(get_nodes, 'sudo', [kubernetes.get_nodes_description_cmd()])
         kubernetes.exec_running_nodes_report(cluster)
         summary_report = cluster.context.get('summary_report')
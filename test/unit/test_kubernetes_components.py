@@ -18,7 +18,8 @@ import re
 import unittest
 from contextlib import contextmanager
 from copy import deepcopy
-from typing import List
+from typing import List, Dict
+from unittest import mock
 from test.unit import utils as test_utils
 
 import yaml
@@ -159,22 +160,37 @@ class WaitForPodsTest(unittest.TestCase):
         self.inventory.setdefault('globals', {}).setdefault('expect', {}).setdefault('pods', {})['kubernetes'] = {
             'timeout': 0, 'retries': 3
         }
+        self.get_pods_cmd = 'kubectl get pods -n kube-system -o=wide'
 
     def _new_cluster(self) -> demo.FakeKubernetesCluster:
         return demo.new_cluster(self.inventory)
 
-    def _stub_get_pods(self, cluster: demo.FakeKubernetesCluster, hosts: List[str], pods: List[str], node_name: str,
-                       *, ready: bool = True):
-        internal_address = cluster.get_node_by_name(node_name)['internal_address']
-        ready_string = '1/1' if ready else '0/1'
-        output = '\n'.join((
-            # pylint: disable-next=line-too-long
-            f'{pod}            {ready_string}     Running   0          1s   {internal_address}   {node_name}   <none>           <none>'
-            for pod in pods
-        ))
-        results = demo.create_hosts_result(hosts, stdout=output)
-        cmd = f'kubectl get pods -n kube-system -o=wide | grep {node_name}'
-        cluster.fake_shell.add(results, 'sudo', [cmd])
+    def _stub_get_pods(self, cluster: demo.FakeKubernetesCluster, nodes_pods: Dict[str, List[str]],
+                       *, ready: bool = True, usage_limit: int = 0):
+        lines = []
+        for node_name, pods in nodes_pods.items():
+            internal_address = cluster.get_node_by_name(node_name)['internal_address']
+            ready_string = '1/1' if ready else '0/1'
+            lines.extend(
+                # pylint: disable-next=line-too-long
+                f'{pod}            {ready_string}     Running   0          1s   {internal_address}   {node_name}   <none>           <none>'
+                for pod in pods
+            )
+        results = demo.create_nodegroup_result(cluster.nodes['control-plane'], stdout='\n'.join(lines))
+        cluster.fake_shell.add(results, 'sudo', [self.get_pods_cmd], usage_limit=usage_limit)
+
+    def _control_plane_pods(self, node_name: str) -> List[str]:
+        return ["calico-node-abc12", f"etcd-{node_name}",
+                f"kube-apiserver-{node_name}", f"kube-controller-manager-{node_name}",
+                "kube-proxy-34xyz", f"kube-scheduler-{node_name}"]
+
+    def _workers_pods(self) -> Dict[str, List[str]]:
+        return {node['name']: ['calico-node-abc12', 'kube-proxy-34xyz']
+                for node in self.inventory['nodes'] if 'worker' in node['roles']}
+
+    def _control_planes_pods(self) -> Dict[str, List[str]]:
+        return {node['name']: self._control_plane_pods(node['name'])
+                for node in self.inventory['nodes'] if 'control-plane' in node['roles']}
 
     def test_wait_empty(self):
         cluster = self._new_cluster()
@@ -188,69 +204,78 @@ class WaitForPodsTest(unittest.TestCase):
 
     def test_wait_workers_successful(self):
         cluster = self._new_cluster()
-        first_control_plane = next(node for node in self.inventory['nodes'] if 'control-plane' in node['roles'])['address']
-        for node in self.inventory['nodes']:
-            if 'worker' in node['roles']:
-                self._stub_get_pods(cluster, [first_control_plane], ['calico-node-abc12', 'kube-proxy-34xyz'], node['name'])
+        self._stub_get_pods(cluster, self._workers_pods())
 
         components.wait_for_pods(cluster.nodes['worker'])
 
+        first_control_plane = cluster.nodes['control-plane'].get_first_member().get_host()
+        self.assertEqual(1, cluster.fake_shell.called_times(first_control_plane, 'sudo', [self.get_pods_cmd]),
+                         "Pods of all workers should be checked using single snapshot")
+
     def test_wait_worker_failed(self):
         cluster = self._new_cluster()
-        first_control_plane = next(node for node in self.inventory['nodes'] if 'control-plane' in node['roles'])['address']
-        for node in self.inventory['nodes']:
-            if 'worker' in node['roles']:
-                self._stub_get_pods(cluster, [first_control_plane], ['calico-node-abc12', 'kube-proxy-34xyz'],
-                                    node['name'], ready=False)
+        self._stub_get_pods(cluster, self._workers_pods(), ready=False)
 
         with self.assertRaisesRegex(Exception, re.escape(plugins.ERROR_PODS_NOT_READY)):
             components.wait_for_pods(cluster.nodes['worker'].get_any_member())
 
     def test_wait_control_planes_successful(self):
         cluster = self._new_cluster()
-        for node in self.inventory['nodes']:
-            if 'control-plane' in node['roles']:
-                self._stub_get_pods(cluster, [node['address']], [
-                    "calico-node-abc12", f"etcd-{node['name']}",
-                    f"kube-apiserver-{node['name']}", f"kube-controller-manager-{node['name']}",
-                    "kube-proxy-34xyz", f"kube-scheduler-{node['name']}",
-                ], node['name'])
+        self._stub_get_pods(cluster, self._control_planes_pods())
 
         components.wait_for_pods(cluster.nodes['control-plane'])
 
     def test_wait_control_plane_failed(self):
         cluster = self._new_cluster()
-        for node in self.inventory['nodes']:
-            if 'control-plane' in node['roles']:
-                self._stub_get_pods(cluster, [node['address']], [
-                    "calico-node-abc12",  # f"etcd-{node['name']}",
-                    f"kube-apiserver-{node['name']}", f"kube-controller-manager-{node['name']}",
-                    "kube-proxy-34xyz", f"kube-scheduler-{node['name']}",
-                ], node['name'])
+        nodes_pods = self._control_planes_pods()
+        for node_name, pods in nodes_pods.items():
+            pods.remove(f"etcd-{node_name}")
+        self._stub_get_pods(cluster, nodes_pods)
 
         with self.assertRaisesRegex(Exception, re.escape(plugins.ERROR_PODS_NOT_READY)):
             components.wait_for_pods(cluster.nodes['control-plane'].get_any_member())
 
+    def test_wait_reports_lagging_nodes(self):
+        cluster = self._new_cluster()
+        nodes_pods = {**self._control_planes_pods(), **self._workers_pods()}
+        lagging_control_plane = cluster.nodes['control-plane'].get_ordered_members_list()[1].get_node_name()
+        lagging_worker = cluster.nodes['worker'].get_ordered_members_list()[2].get_node_name()
+        nodes_pods[lagging_control_plane].remove(f"kube-scheduler-{lagging_control_plane}")
+        nodes_pods[lagging_worker].remove('kube-proxy-34xyz')
+        self._stub_get_pods(cluster, nodes_pods)
+
+        with self.assertRaises(Exception) as context:
+            components.wait_for_pods(cluster.nodes['all'])
+
+        lagging = {lagging_control_plane: 'kube-scheduler', lagging_worker: 'kube-proxy'}
+        expected_pods = '; '.join(f"{node.get_node_name()}: {lagging[node.get_node_name()]}"
+                                  for node in cluster.nodes['all'].get_ordered_members_list()
+                                  if node.get_node_name() in lagging)
+        self.assertEqual(components.ERROR_PODS_NOT_READY_ON_NODES.format(pods=expected_pods), str(context.exception))
+
+        first_control_plane = cluster.nodes['control-plane'].get_first_member().get_host()
+        self.assertEqual(3, cluster.fake_shell.called_times(first_control_plane, 'sudo', [self.get_pods_cmd]),
+                         "Single snapshot of pods should be taken per retry")
+
+    def test_wait_until_all_nodes_ready(self):
+        cluster = self._new_cluster()
+        self._stub_get_pods(cluster, self._workers_pods(), ready=False, usage_limit=1)
+        self._stub_get_pods(cluster, self._workers_pods(), usage_limit=1)
+
+        components.wait_for_pods(cluster.nodes['worker'])
+
     def test_wait_specific(self):
         cluster = self._new_cluster()
-        for node in self.inventory['nodes']:
-            if 'control-plane' in node['roles']:
-                self._stub_get_pods(cluster, [node['address']], [
-                    "calico-node-abc12", f"etcd-{node['name']}",
-                    f"kube-apiserver-{node['name']}", f"kube-controller-manager-{node['name']}",
-                    "kube-proxy-34xyz", f"kube-scheduler-{node['name']}",
-                ], node['name'])
-
-        with test_utils.mock_call(plugins.expect_pods) as run:
+        with test_utils.mock_call(components._expect_pods_on_nodes) as run:  # pylint: disable=protected-access
             components.wait_for_pods(cluster.nodes['all'], ['kube-apiserver'])
-            node_names = {call[1]['node_name'] for call in run.call_args_list}
-            self.assertEqual({'control-plane-1', 'control-plane-2', 'control-plane-3'}, node_names)
+            self.assertEqual(1, run.call_count)
+            self.assertEqual({'control-plane-1', 'control-plane-2', 'control-plane-3'}, set(run.call_args[0][2]))
 
-        with test_utils.mock_call(plugins.expect_pods) as run:
+        with test_utils.mock_call(components._expect_pods_on_nodes) as run:  # pylint: disable=protected-access
             components.wait_for_pods(cluster.nodes['all'], ['kube-proxy'])
-            node_names = {call[1]['node_name'] for call in run.call_args_list}
+            self.assertEqual(1, run.call_count)
             self.assertEqual({'control-plane-1', 'control-plane-2', 'control-plane-3', 'worker-1', 'worker-2', 'worker-3'},
-                             node_names)
+                             set(run.call_args[0][2]))
 
 
 class RestartComponentsTest(unittest.TestCase):
@@ -277,7 +302,7 @@ class RestartComponentsTest(unittest.TestCase):
     def test_restart_all_supported(self):
         cluster = self._new_cluster()
         with test_utils.mock_call(components._restart_containers) as restart_containers, \
-                test_utils.mock_call(plugins.expect_pods) as expect_pods:
+                test_utils.mock_call(components._expect_pods_on_nodes) as expect_pods:
 
             all_components = ['kube-apiserver', 'kube-scheduler', 'kube-controller-manager', 'etcd']
             components.restart_components(cluster.nodes['all'], all_components)
@@ -291,16 +316,13 @@ class RestartComponentsTest(unittest.TestCase):
                                                if call[0][2]]
             self.assertEqual(restart_containers_expected_calls, restart_containers_actual_calls)
 
-            actual_called_nodes = [call[1]['node_name'] for call in expect_pods.call_args_list]
-            self.assertEqual(expected_control_planes, actual_called_nodes)
-
-            for call in expect_pods.call_args_list:
-                self.assertEqual(control_plane_components, call[0][1])
+            actual_calls = [list(call[0][2].items()) for call in expect_pods.call_args_list]
+            self.assertEqual([[(node, control_plane_components)] for node in expected_control_planes], actual_calls)
 
     def test_restart_specific(self):
         cluster = self._new_cluster()
         with test_utils.mock_call(components._restart_containers) as restart_containers, \
-                test_utils.mock_call(plugins.expect_pods) as expect_pods:
+                test_utils.mock_call(components._expect_pods_on_nodes) as expect_pods:
 
             components.restart_components(cluster.nodes['control-plane'].get_first_member(), [
                 'kube-apiserver'
@@ -313,8 +335,7 @@ class RestartComponentsTest(unittest.TestCase):
             self.assertEqual(['kube-apiserver'], list(restart_containers.call_args[0][2]))
 
             self.assertEqual(1, expect_pods.call_count)
-            self.assertEqual(first_control_plane['name'], expect_pods.call_args[1]['node_name'])
-            self.assertEqual(['kube-apiserver'], expect_pods.call_args[0][1])
+            self.assertEqual({first_control_plane['name']: ['kube-apiserver']}, expect_pods.call_args[0][2])
 
 
 class ReconfigureComponentsTest(unittest.TestCase):
@@ -511,7 +532,7 @@ class ReconfigureComponentsTest(unittest.TestCase):
     @contextmanager
     def _test_wait_for_pods(self, control_plane_components: List[str],
                             reconfigure_kubelet: bool, reconfigure_kube_proxy):
-        with test_utils.mock_call(plugins.expect_pods) as mock:
+        with test_utils.mock_call(components._expect_pods_on_nodes) as mock:
             yield
 
         expected_calls = []
@@ -524,9 +545,82 @@ class ReconfigureComponentsTest(unittest.TestCase):
                 expected_calls.append((node, ['kube-proxy']))
 
         expected_calls.extend((node, ['kube-proxy']) for node in self.workers if reconfigure_kubelet or reconfigure_kube_proxy)
-        actual_calls = [(call[1]['node_name'], call[0][1]) for call in mock.call_args_list]
+        actual_calls = [item for call in mock.call_args_list for item in call[0][2].items()]
         self.assertEqual(expected_calls, actual_calls)
 
 
+class CompareManifestsTest(unittest.TestCase):
+    # pylint: disable=protected-access
+
+    def setUp(self):
+        self.inventory = demo.generate_inventory(**demo.FULLHA)
+        self.cluster = demo.new_cluster(self.inventory)
+        self.control_planes = self.cluster.nodes['control-plane'].get_hosts()
+        self.components = components.CONTROL_PLANE_COMPONENTS
+        self.tmp_dirs_cmd = "sh -c 'sudo ls /etc/kubernetes/tmp/ | grep dryrun 2>/dev/null || true'"
+
+    def _stub(self, changed_host: str, sources: List[bool]):
+        fake_shell = self.cluster.fake_shell
+        temp_configs = {False: '/tmp/config-cm', True: '/tmp/config-inventory'}
+        fake_shell.add(demo.create_nodegroup_result(self.cluster.nodes['control-plane']),
+                       'sudo', ['mkdir -p /tmp/patches'])
+        for host in self.control_planes:
+            dryrun_dirs: List[str] = []
+            fake_shell.add(demo.create_hosts_result([host], stdout=''), 'sudo', [self.tmp_dirs_cmd], usage_limit=1)
+            for with_inventory in sources:
+                for component in self.components:
+                    init_phase = components.COMPONENTS_CONSTANTS[component]['init_phase']
+                    fake_shell.add(demo.create_hosts_result([host]), 'sudo', [
+                        f'kubeadm init phase {init_phase} --dry-run --config {temp_configs[with_inventory]}'])
+
+                    dryrun_dirs.append(f'kubeadm-init-dryrun{len(dryrun_dirs)}')
+                    fake_shell.add(demo.create_hosts_result([host], stdout='\n'.join(dryrun_dirs)),
+                                   'sudo', [self.tmp_dirs_cmd], usage_limit=1)
+
+                    manifest = f'metadata: {{name: {component}}}'
+                    fake_shell.add(demo.create_hosts_result([host], stdout=manifest),
+                                   'sudo', [f'cat /etc/kubernetes/manifests/{component}.yaml'])
+
+                    if with_inventory and host == changed_host and component == 'kube-apiserver':
+                        manifest = 'metadata: {name: changed}'
+                    fake_shell.add(demo.create_hosts_result([host], stdout=manifest),
+                                   'sudo', [f'cat /etc/kubernetes/tmp/{dryrun_dirs[-1]}/{component}.yaml'])
+
+    def test_compare_all_manifests(self):
+        changed_host = self.control_planes[1]
+        self._stub(changed_host, [False, True])
+        with mock.patch.object(components.KubeadmConfig, 'load'), \
+                test_utils.mock_call(components._upload_config), \
+                test_utils.mock_call(components._create_kubeadm_patches_for_component_on_node), \
+                test_utils.mock_remote_tmp_paths(['config-cm', 'config-inventory', 'patches']):
+            result = components.compare_all_manifests(self.cluster)
+
+        for host in self.control_planes:
+            self.assertEqual({c: None for c in self.components}, result[False][host])
+
+            for component in self.components:
+                diff = result[True][host][component]
+                if host == changed_host and component == 'kube-apiserver':
+                    self.assertIn("kube-apiserver.yaml generated from 'services.kubeadm' section", diff)
+                else:
+                    self.assertIsNone(diff)
+
+                self.assertEqual(1, self.cluster.fake_shell.called_times(
+                    host, 'sudo', [f'cat /etc/kubernetes/manifests/{component}.yaml']))
+
+            self.assertEqual(len(self.components) * 2 + 1,
+                             self.cluster.fake_shell.called_times(host, 'sudo', [self.tmp_dirs_cmd]))
+
+    def test_compare_manifests_single_source(self):
+        self._stub(self.control_planes[0], [True])
+        with test_utils.mock_call(components._upload_config), \
+                test_utils.mock_call(components._create_kubeadm_patches_for_component_on_node), \
+                test_utils.mock_remote_tmp_paths(['config-inventory', 'patches']):
+            result = components.compare_manifests(self.cluster, with_inventory=True)
+
+        self.assertIsNotNone(result[self.control_planes[0]]['kube-apiserver'])
+        self.assertIsNone(result[self.control_planes[1]]['kube-apiserver'])
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -16,7 +16,7 @@ import unittest
 from copy import deepcopy
 from test.unit import utils
 
-from kubemarine import demo, admission, plugins
+from kubemarine import demo, admission
 from kubemarine.core import errors, flow
 from kubemarine.kubernetes import components
 from kubemarine.procedures import manage_pss
@@ -244,7 +244,7 @@ class RunTasks(unittest.TestCase):
                 utils.mock_call(components._reconfigure_control_plane_component, return_value=False) as cfg_ctrl_plane, \
                 utils.mock_call(components._update_configmap, return_value=True), \
                 utils.mock_call(components._restart_containers) as restart_containers, \
-                utils.mock_call(plugins.expect_pods) as expect_pods:
+                utils.mock_call(components._expect_pods_on_nodes) as expect_pods:
             self._run_tasks('manage_pss')
 
             self.assertTrue(cfg_ctrl_plane.called,
@@ -255,7 +255,7 @@ class RunTasks(unittest.TestCase):
                              "kube-apiserver should be restarted")
 
             self.assertTrue(expect_pods.called)
-            self.assertEqual(['kube-apiserver'], expect_pods.call_args[0][1],
+            self.assertEqual({'kube-apiserver'}, {c for cs in expect_pods.call_args[0][2].values() for c in cs},
                              "kube-apiserver pods should be waited for")
 
 
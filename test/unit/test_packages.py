@@ -17,7 +17,7 @@ from copy import deepcopy
 from typing import Optional
 from test.unit import utils
 
-from kubemarine import demo, packages
+from kubemarine import demo, packages, apt
 from kubemarine.core import static, errors
 from kubemarine.core.yaml_merger import default_merger
 from kubemarine.demo import FakeKubernetesCluster
@@ -288,8 +288,9 @@ class PackagesUtilities(unittest.TestCase):
         expected_pkg = 'containerd=1.5.9-0ubuntu1~20.04.4'
         queried_pkg = 'containerd=1.5.*'
         group = cluster.nodes['all']
-        results = demo.create_nodegroup_result(group, stdout=expected_pkg)
-        cluster.fake_shell.add(results, 'sudo', [packages.get_detect_package_version_cmd('debian', 'containerd')])
+        results = demo.create_nodegroup_result(group, stdout=f'containerd\t{expected_pkg}\n'
+                                                             f'containerd-cli\tcontainerd-cli=1.5.9-0ubuntu1~20.04.4\n')
+        cluster.fake_shell.add(results, 'sudo', [packages.get_detect_installed_packages_cmd('debian')])
 
         hosts_to_packages = {host: queried_pkg for host in group.get_hosts()}
         detected_packages = packages.detect_installed_packages_version_hosts(cluster, hosts_to_packages)
@@ -311,8 +312,9 @@ class PackagesUtilities(unittest.TestCase):
         expected_pkg = 'docker-ce-19.03.15-3.el7.x86_64'
         queried_pkg = 'docker-ce-19.03*'
         group = cluster.nodes['all']
-        results = demo.create_nodegroup_result(group, stdout=expected_pkg)
-        cluster.fake_shell.add(results, 'sudo', [packages.get_detect_package_version_cmd('rhel', 'docker-ce')])
+        results = demo.create_nodegroup_result(group, stdout=f'docker-ce\t{expected_pkg}\n'
+                                                             f'docker-ce-cli\tdocker-ce-cli-19.03.15-3.el7.x86_64\n')
+        cluster.fake_shell.add(results, 'sudo', [packages.get_detect_installed_packages_cmd('rhel')])
 
         hosts_to_packages = {host: [queried_pkg] for host in group.get_hosts()}
         detected_packages = packages.detect_installed_packages_version_hosts(cluster, hosts_to_packages)
@@ -325,6 +327,38 @@ class PackagesUtilities(unittest.TestCase):
         self.assertEqual(set(group.get_hosts()), set(package_versions[expected_pkg]),
                          "Incorrect set of hosts with detected package version")
 
+    def test_detect_versions_single_query_cached(self):
+        inventory = demo.generate_inventory(**demo.MINIHA_KEEPALIVED)
+        context = demo.create_silent_context()
+        nodes_context = demo.generate_nodes_context(inventory, os_name='ubuntu', os_version='20.04')
+        cluster = demo.new_cluster(inventory, context=context, nodes_context=nodes_context)
+
+        group = cluster.nodes['all']
+        cmd = packages.get_detect_installed_packages_cmd('debian')
+        results = demo.create_nodegroup_result(group, stdout='docker-ce\tdocker-ce=5:20.10.9\n'
+                                                             'docker-ce-cli\tdocker-ce-cli=5:20.10.9\n'
+                                                             'containerd\tcontainerd=\n'
+                                                             'curl\tcurl=7.68.0-1ubuntu2.14\n')
+        cluster.fake_shell.add(results, 'sudo', [cmd])
+
+        hosts_to_packages = {host: ['docker-ce*', 'containerd', 'curl', 'curl'] for host in group.get_hosts()}
+        for _ in range(2):
+            detected_packages = packages.detect_installed_packages_version_hosts(cluster, hosts_to_packages)
+            self.assertEqual({'docker-ce=5:20.10.9\ndocker-ce-cli=5:20.10.9'}, detected_packages['docker-ce*'].keys())
+            self.assertEqual({'not installed containerd'}, detected_packages['containerd'].keys())
+            self.assertEqual(set(group.get_hosts()), set(detected_packages['curl']['curl=7.68.0-1ubuntu2.14']))
+
+        for host in group.get_hosts():
+            self.assertEqual(1, cluster.fake_shell.called_times(host, 'sudo', [cmd]),
+                             "Installed packages should be detected once for the whole lifetime of the cluster")
+
+        cluster.fake_shell.add(demo.create_nodegroup_result(group), 'sudo', [apt.get_install_cmd(cluster, 'containerd')])
+        packages.install(group, include='containerd')
+        packages.detect_installed_packages_version_hosts(cluster, hosts_to_packages)
+        for host in group.get_hosts():
+            self.assertEqual(2, cluster.fake_shell.called_times(host, 'sudo', [cmd]),
+                             "Installed packages should be detected again after installation")
+
 
 class CacheVersions(unittest.TestCase):
     def setUp(self) -> None:
@@ -14,12 +14,12 @@
 
 import os
 import unittest
-from typing import List
+from typing import List, Tuple
 from test.unit import utils as test_utils
 
 import yaml
 
-from kubemarine import demo, thirdparties
+from kubemarine import demo, thirdparties, etcd
 from kubemarine.core import utils, static
 from kubemarine.procedures import restore, backup
 
@@ -142,5 +142,52 @@ class RestoreEnrichmentTest(test_utils.CommonTest):
         self.assertIsNone(thirdparties_section['/usr/bin/kubelet'].get('sha1'))
 
 
+class ImportEtcdTest(test_utils.CommonTest):
+    def setUp(self):
+        self.commands: List[Tuple[str, str]] = []
+        commands = self.commands
+
+        class RecordingShell(demo.FakeShell):
+            def default_result(self, host: str, do_type: str, command: str, hide: bool):
+                commands.append((host, command))
+                return demo.create_result(hide=hide)
+
+        self.inventory = demo.generate_inventory(**demo.FULLHA)
+        resources = demo.FakeResources(demo.create_silent_context(), self.inventory,
+                                       nodes_context=demo.generate_nodes_context(self.inventory),
+                                       fake_shell=RecordingShell())
+        self.cluster = resources.cluster()
+
+    def run(self, *args, **kwargs):
+        with test_utils.temporary_directory(self):
+            return super().run(*args, **kwargs)
+
+    def _called_hosts(self, substring: str) -> List[str]:
+        return [host for host, command in self.commands if substring in command]
+
+    def test_restore_and_start_members_in_batches(self):
+        with utils.open_external(os.path.join(self.tmpdir, 'etcd.db'), 'w') as output:
+            output.write('snapshot')
+        self.cluster.context['backup_tmpdir'] = self.tmpdir
+        self.cluster.context['backup_descriptor'] = {'etcd': {'image': 'etcd-image'}}
+
+        with test_utils.mock_call(etcd.wait_for_health, return_value=[]):
+            restore.import_etcd(self.cluster)
+
+        control_planes = self.cluster.nodes['control-plane'].get_hosts()
+        restored = self._called_hosts('snapshot restore')
+        started = self._called_hosts('ctr run')
+        self.assertEqual(set(control_planes), set(restored))
+        self.assertEqual(set(control_planes), set(started))
+        self.assertEqual(len(control_planes), len(restored))
+        self.assertEqual(len(control_planes), len(started))
+
+        # All members are restored before any member is started.
+        commands = [command for _, command in self.commands]
+        last_restore = max(i for i, command in enumerate(commands) if 'snapshot restore' in command)
+        first_start = min(i for i, command in enumerate(commands) if 'ctr run' in command)
+        self.assertLess(last_restore, first_start)
+
+
 if __name__ == '__main__':
     unittest.main()
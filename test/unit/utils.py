@@ -11,6 +11,7 @@
 # WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
 # See the License for the specific language governing permissions and
 # limitations under the License.
+import fnmatch
 import functools
 import inspect
 import logging
@@ -109,16 +110,34 @@ def make_finalized_inventory(cluster: demo.FakeKubernetesCluster,
 
 
 def stub_detect_packages(cluster: demo.FakeKubernetesCluster, packages_hosts_stub: Dict[str, Dict[str, str]]):
-    for package, hosts_stub in packages_hosts_stub.items():
-        results = {}
-        for host in cluster.nodes['all'].get_hosts():
+    """
+    Stub detection of installed packages.
+    Packages stubbed by the previous calls are preserved unless they are stubbed again.
+
+    :param cluster: fake cluster
+    :param packages_hosts_stub: Package names pointing to the hosts with the detected package, e.g.
+                                {'containerd': {'10.101.1.2': 'containerd=1.5.9-0ubuntu1~20.04.4'}}.
+                                The package is considered as not installed on the missing hosts.
+    """
+    os_family = cluster.get_os_family()
+    cmd = packages.get_detect_installed_packages_cmd(os_family)
+    stubbed_names = [packages.get_package_name(os_family, package) for package in packages_hosts_stub]
+
+    results = {}
+    for host in cluster.nodes['all'].get_hosts():
+        lines = []
+        for result in cluster.fake_shell.remove(host, 'sudo', [cmd]):
+            lines.extend(line for line in result.stdout.splitlines()
+                         if not any(fnmatch.fnmatchcase(line.split('\t')[0], name) for name in stubbed_names))
+
+        for package, hosts_stub in packages_hosts_stub.items():
             if host in hosts_stub:
-                results[host] = demo.create_result(stdout=hosts_stub[host])
-            else:
-                results[host] = demo.create_result(stdout='not installed', code=1)
+                for detected in hosts_stub[host].splitlines():
+                    lines.append(f"{packages.get_package_name(os_family, detected)}\t{detected}")
+
+        results[host] = demo.create_result(stdout=''.join(line + '\n' for line in lines))
 
-        cmd = packages.get_detect_package_version_cmd(cluster.get_os_family(), package)
-        cluster.fake_shell.add(results, 'sudo', [cmd])
+    cluster.fake_shell.add(results, 'sudo', [cmd])
 
 
 def stub_associations_packages(cluster: demo.FakeKubernetesCluster, packages_hosts_stub: Dict[str, Dict[str, str]]):